@@ -0,0 +1 @@
+# benchmarks - Standalone performance measurements, run with python -m benchmarks.<name>
@@ -0,0 +1,107 @@
+# benchmarks/prepared_statements.py - Text Protocol vs Prepared Statements on the Top Ten Queries
+#
+# Builds the query plan check database (same schema and seed data), then runs
+# each of the ten hottest DatabaseManager methods ITERATIONS times, first with
+# DB_PREPARED_STATEMENTS off and then on, on the same pooled connection.
+# Reports mean and p95 latency per method and the server's statement counters,
+# which show how many times MySQL had to parse SQL text in each mode.
+#
+#     python -m benchmarks.prepared_statements [iterations]
+
+import sys
+import time
+from mysql.connector import Error
+import config
+from database_manager import DatabaseManager
+from query_stats import MethodStats, query_stats
+import query_plan_check
+
+ITERATIONS = 2000
+
+# (method, args for iteration i); user ids rotate so rows come from all over the tables
+TOP_QUERIES = [
+    ('authenticate_user', lambda i: (f"user{1 + i % 100}", 'Password1!')),
+    ('get_wallet_balance', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_user_rides', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('validate_voucher', lambda i: ('PLAN1', 1, 500.0)),
+    ('get_transaction_history', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_user_vouchers', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_user_info', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_user_notifications', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_unread_notification_count', lambda i: (1 + i % query_plan_check.SEED_USERS,)),
+    ('get_available_drivers', lambda i: ('sedan' if i % 2 else 'suv',)),
+]
+
+STATUS_COUNTERS = ('Com_select', 'Com_update', 'Com_stmt_prepare', 'Com_stmt_execute')
+
+def session_counters(manager):
+    """Current values of STATUS_COUNTERS for the manager's session"""
+    cursor = manager.connection.cursor()
+    cursor.execute("SHOW SESSION STATUS WHERE Variable_name IN (%s, %s, %s, %s)", STATUS_COUNTERS)
+    counters = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    return counters
+
+def run_mode(manager, prepared, iterations):
+    """Time every TOP_QUERIES method, return ({method: MethodStats}, counter deltas)"""
+    config.DB_PREPARED_STATEMENTS = prepared
+    results = {}
+    
+    before = session_counters(manager)
+    for method, make_args in TOP_QUERIES:
+        stats = results[method] = MethodStats()
+        call = getattr(manager, method)
+        
+        # Warm up, so the one-off prepare is not part of the timings
+        call(*make_args(0))
+        
+        for i in range(iterations):
+            args = make_args(i)
+            start = time.perf_counter()
+            call(*args)
+            stats.add((time.perf_counter() - start) * 1000, 0, False)
+    
+    after = session_counters(manager)
+    return results, {name: after[name] - before[name] for name in STATUS_COUNTERS}
+
+def main(iterations=ITERATIONS):
+    query_stats.enabled = False
+    
+    try:
+        connection = query_plan_check.create_check_database()
+        query_plan_check.seed(connection)
+        connection.close()
+        
+        config.DB_NAME = query_plan_check.CHECK_DB_NAME
+        manager = DatabaseManager()
+        if not manager.connect():
+            raise RuntimeError(f"Could not connect to {config.DB_NAME}")
+        
+        text_results, text_counters = run_mode(manager, False, iterations)
+        prepared_results, prepared_counters = run_mode(manager, True, iterations)
+        manager.disconnect()
+    except (Error, RuntimeError) as e:
+        print(f"Benchmark could not run: {e}")
+        return 2
+    
+    print(f"{iterations} calls per method\n")
+    print(f"{'method':<32}{'text mean':>11}{'prep mean':>11}{'text p95':>10}{'prep p95':>10}{'saved':>8}")
+    text_total = prepared_total = 0.0
+    for method, _ in TOP_QUERIES:
+        text, prepared = text_results[method], prepared_results[method]
+        text_mean, prepared_mean = text.total_ms / text.calls, prepared.total_ms / prepared.calls
+        text_total += text.total_ms
+        prepared_total += prepared.total_ms
+        print(f"{method:<32}{text_mean * 1000:>9.0f}us{prepared_mean * 1000:>9.0f}us"
+              f"{text.percentile(95) * 1000:>8.0f}us{prepared.percentile(95) * 1000:>8.0f}us"
+              f"{(1 - prepared_mean / text_mean) * 100:>7.1f}%")
+    
+    print(f"\nTotal: text {text_total:.0f} ms, prepared {prepared_total:.0f} ms "
+          f"({(1 - prepared_total / text_total) * 100:.1f}% saved)")
+    print("\nServer statement counters (each text query is parsed; a prepared one only on Com_stmt_prepare):")
+    for name in STATUS_COUNTERS:
+        print(f"  {name:<18} text {text_counters[name]:>8}   prepared {prepared_counters[name]:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS))
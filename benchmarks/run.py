@@ -0,0 +1,233 @@
+# benchmarks/run.py - Micro-Benchmark Suite with Baseline Comparison
+#
+# Times the pure helpers (distance, fare, password and voucher checks, shape
+# math, screen reshaping) and the DatabaseManager methods against an
+# in-memory SQLite stand-in, then compares every result with a saved baseline.
+#
+#     python -m benchmarks.run --save-baseline     # record benchmarks/baseline.json
+#     python -m benchmarks.run                     # compare, exit 1 on a regression
+#     python -m benchmarks.run --json results.json --threshold 0.15 --filter db.
+#
+# A benchmark regresses when its median time per call is more than
+# --threshold (a fraction) slower than in the baseline. Baselines are
+# machine specific: record one on the machine that runs the comparison.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import config
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+SEED_USERS = 200
+SEED_RIDES_PER_USER = 20
+
+def measure(func, repeats=7, min_repeat_time=0.02):
+    """Median and best seconds per call of func over `repeats` timed batches"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_repeat_time:
+            break
+        loops *= 2
+    
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    
+    return {'median_us': statistics.median(samples) * 1e6, 'min_us': min(samples) * 1e6, 'loops': loops}
+
+def pure_benchmarks():
+    """{name: zero-argument callable} for the pure helpers"""
+    import functions
+    from database_manager import calculate_voucher_discount
+    
+    percentage = {'voucher_type': 'percentage', 'discount_value': 15, 'max_discount': 50}
+    fixed = {'voucher_type': 'fixed', 'discount_value': 25, 'max_discount': None}
+    ride_rows = [{
+        'ride_code': f"QC-{i:06d}", 'date': '10/19/2026', 'time': '08:30 AM',
+        'pickup_address': 'SM Lanang Premier', 'destination_address': 'Abreeza Mall',
+        'pickup_latitude': 7.0984, 'pickup_longitude': 125.6310,
+        'destination_latitude': 7.0910, 'destination_longitude': 125.6105,
+        'distance_km': 5.4, 'final_fare': 121.0, 'ride_type': 'sedan', 'ride_status': 'completed'
+    } for i in range(20)]
+    voucher_rows = [{
+        'voucher_code': f"SAVE{i}", 'voucher_type': 'percentage' if i % 2 else 'fixed',
+        'description': 'Weekend promo', 'discount_value': 10 + i, 'min_fare': 100,
+        'expiry': '31/12/2026', 'status': 'Active'
+    } for i in range(10)]
+    
+    return {
+        'pure.calculate_distance': lambda: functions.calculate_distance(7.0731, 125.6128, 7.0907, 125.6120),
+        'pure.calculate_fare': lambda: functions.calculate_fare(5.4, 'suv'),
+        'pure.validate_password_strength': lambda: functions.validate_password_strength('Quickcab2026!'),
+        'pure.voucher_discount_percentage': lambda: calculate_voucher_discount(percentage, 420.0),
+        'pure.voucher_discount_fixed': lambda: calculate_voucher_discount(fixed, 420.0),
+        'pure.create_rounded_rect_points': lambda: functions.create_rounded_rect_points(10, 10, 390, 90, 20),
+        'pure.format_rides_20': lambda: functions.format_rides(ride_rows),
+        'pure.format_vouchers_10': lambda: functions.format_vouchers(voucher_rows),
+    }
+
+def seed_stand_in(manager):
+    """Riders, rides, transactions and notifications for the DB benchmarks"""
+    import load_generator
+    
+    load_generator.seed_riders(manager, SEED_USERS)
+    manager.connect()
+    for user_id in range(1, SEED_USERS + 1):
+        for i in range(SEED_RIDES_PER_USER):
+            manager.create_ride(user_id, 'sedan', 7.07, 125.61, 'Pickup', 7.09, 125.62, 'Destination', 2.5, 77.5, 'wallet')
+        manager.add_wallet_funds(user_id, 100)
+        manager.create_notification(user_id, 'system', 'Welcome', 'Thanks for riding with QuickCab')
+    manager.disconnect()
+
+def stand_in():
+    """A connected, freshly seeded in-memory SQLite manager"""
+    from sqlite_backend import SQLiteDatabaseManager
+    
+    manager = SQLiteDatabaseManager(':memory:')
+    seed_stand_in(manager)
+    manager.connect()
+    return manager
+
+def db_read_benchmarks(manager):
+    """{name: zero-argument callable} for DatabaseManager methods that only read"""
+    import load_generator
+    
+    counter = iter(range(10 ** 9))
+    user = lambda: 1 + next(counter) % SEED_USERS
+    password = load_generator.RIDER_PASSWORD
+    
+    return {
+        'db.authenticate_user': lambda: manager.authenticate_user(f"loadrider{user()}", password),
+        'db.get_user_info': lambda: manager.get_user_info(user()),
+        'db.get_wallet_balance': lambda: manager.get_wallet_balance(user()),
+        'db.get_transaction_history': lambda: manager.get_transaction_history(user()),
+        'db.get_user_rides': lambda: manager.get_user_rides(user()),
+        'db.get_user_vouchers': lambda: manager.get_user_vouchers(user()),
+        'db.validate_voucher': lambda: manager.validate_voucher(load_generator.VOUCHER_CODE, user(), 250.0),
+        'db.get_user_notifications': lambda: manager.get_user_notifications(user()),
+        'db.get_unread_notification_count': lambda: manager.get_unread_notification_count(user()),
+    }
+
+def db_write_benchmarks():
+    """{name: factory(manager) -> zero-argument callable} for DatabaseManager methods that write"""
+    def writer(write):
+        def factory(manager):
+            counter = iter(range(10 ** 9))
+            return lambda: write(manager, 1 + next(counter) % SEED_USERS)
+        return factory
+    
+    return {
+        'db.add_wallet_funds': writer(lambda manager, user_id: manager.add_wallet_funds(user_id, 10)),
+        'db.deduct_wallet_funds': writer(lambda manager, user_id: manager.deduct_wallet_funds(user_id, 10)),
+        'db.create_ride': writer(lambda manager, user_id: manager.create_ride(
+            user_id, 'suv', 7.07, 125.61, 'Pickup', 7.09, 125.62, 'Destination', 2.5, 97.5, 'cash')),
+    }
+
+def run(name_filter=None):
+    """Run every benchmark whose name contains name_filter, returns {name: result}
+    
+    The read benchmarks share one seeded stand-in. Each write benchmark gets
+    its own, so the rows it adds never reach the reads or the other writes.
+    """
+    # database_manager first: it builds db (an SQLite manager here) on import
+    import database_manager
+    
+    selected = lambda name: not name_filter or name_filter in name
+    results = {}
+    
+    def record(name, func):
+        results[name] = measure(func)
+        print(f"{name:<40}{results[name]['median_us']:>12.2f} us")
+    
+    for name, func in pure_benchmarks().items():
+        if selected(name):
+            record(name, func)
+    
+    if not (name_filter and name_filter.startswith('pure')):
+        manager = stand_in()
+        for name, func in db_read_benchmarks(manager).items():
+            if selected(name):
+                record(name, func)
+        manager.close()
+    
+    for name, factory in db_write_benchmarks().items():
+        if selected(name):
+            manager = stand_in()
+            record(name, factory(manager))
+            manager.close()
+    
+    return results
+
+def compare(results, baseline, threshold):
+    """[(name, baseline_us, current_us, change)] for benchmarks slower than threshold"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        
+        change = result['median_us'] / before['median_us'] - 1
+        if change > threshold:
+            regressions.append((name, before['median_us'], result['median_us'], change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the QuickCab micro-benchmarks")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline file to compare with or save to")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as regressed (0.25 = 25%%)")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+    
+    # The stand-in database is embedded; nothing here talks to a server
+    config.DB_BACKEND = 'sqlite'
+    config.SQLITE_PATH = ':memory:'
+    
+    results = run(args.filter)
+    report = {
+        'written_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION  {name}: {before:.2f} us -> {after:.2f} us (+{change * 100:.0f}%)")
+    if not regressions:
+        print(f"\nNo regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 # config.py - Configuration Settings
 
+import os
+
 # Window Settings
 WINDOW_WIDTH = 428
 WINDOW_HEIGHT = 926
@@ -76,6 +78,121 @@ DB_NAME = "quickcab_db"
 DB_USER = "root"
 DB_PASSWORD = ""
 DB_PORT = 3306
+DB_POOL_SIZE = 8  # Tk thread, background workers, notification outbox
+DB_PREPARED_STATEMENTS = True  # server-side prepared statements, cached per connection by query id
+
+# Read replicas for history/list reads, e.g. [{"host": "10.0.0.12"}]; port/user/password default to the primary's.
+# Empty means every read goes to the primary.
+DB_REPLICAS = []
+DB_REPLICA_POOL_SIZE = 8
+DB_REPLICA_CONNECT_TIMEOUT = 3  # seconds
+DB_REPLICA_RETRY_SECONDS = 30  # an unreachable replica is skipped this long
+DB_READ_YOUR_WRITES = True  # after a user's own write, their reads stay on the primary...
+DB_READ_YOUR_WRITES_WINDOW = 5.0  # ...for this many seconds (longer than the usual replica lag)
+
+# Storage backend: "mysql" (server) or "sqlite" (embedded file, no server needed)
+DB_BACKEND = "mysql"
+SQLITE_PATH = os.path.join(os.path.expanduser("~"), ".quickcab", "quickcab.db")  # ":memory:" for a throwaway store
+SQLITE_CACHED_STATEMENTS = 256  # compiled statements kept per connection
+SQLITE_BUSY_TIMEOUT = 5.0  # seconds a writer waits for the database lock
+
+# Query instrumentation (see query_stats.py)
+QUERY_STATS_ENABLED = True
+SLOW_QUERY_MS = 250  # statements at least this slow are logged with their SQL and params
+QUERY_STATS_PATH = os.path.join(os.path.expanduser("~"), ".quickcab", "query_stats.json")  # written on exit, None to skip
+
+# Wallet ledger: balance is the latest wallet_snapshots row plus the postings after it, and top-ups and
+# payments only append postings. Run "python wallet_snapshotter.py --rebase" once when switching it on.
+WALLET_LEDGER_MODE = False
+WALLET_SNAPSHOT_INTERVAL = 30  # seconds between snapshotter passes
+WALLET_SNAPSHOT_MIN_POSTINGS = 20  # postings since a wallet's snapshot before it is moved up
+WALLET_SNAPSHOT_MAX_AGE = 600  # seconds a wallet with fewer postings waits for its snapshot
+WALLET_SNAPSHOT_CHUNK_SIZE = 5000  # transaction ids (or wallets, for --rebase) per scan
+
+# Data exports (export_data.py)
+EXPORT_CHUNK_SIZE = 5000  # rows per keyset page and per CSV flush / Parquet row group
+EXPORT_PATH = os.path.join(os.path.expanduser("~"), ".quickcab", "exports")
+
+# Ride statistics rollup
+USER_STATS_CHUNK_SIZE = 5000  # users per transaction in rebuild_user_stats
+
+# Driver GPS ingestion (gps_ingest.py)
+GPS_UDP_HOST = "127.0.0.1"
+GPS_UDP_PORT = 9099
+GPS_FLUSH_INTERVAL = 1.0  # seconds between batched driver_locations writes
+GPS_FLUSH_BATCH_SIZE = 1000  # rows per executemany
+GPS_TRACK_LENGTH = 120  # recent points kept in memory per driver
+
+# Trip ETAs (eta_model.py)
+ETA_ZONE_SIZE_DEG = 0.02  # grid cell size, about 2.2 km
+ETA_MIN_TRIPS = 5  # trips a bucket needs before its speed is trusted over a wider one
+ETA_DEFAULT_SPEED_KMH = 22.0  # used until enough rides have completed
+ETA_PICKUP_DISTANCE_KM = 2.0  # typical distance of the assigned driver from the pickup
+ETA_REBUILD_CHUNK_SIZE = 5000
+ETA_CACHE_TTL_SECONDS = 300  # a bucket's speed is looked up again after this
+
+# Map tile cache (tile_cache.py)
+TILE_SERVER = "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".quickcab", "tiles.db")
+TILE_CACHE_MAX_MB = 200  # least recently shown tiles are dropped past this
+TILE_PREFETCH_BBOX = (7.03, 125.55, 7.13, 125.65)  # south, west, north, east: the Davao service area
+TILE_PREFETCH_ZOOMS = (11, 16)
+TILE_PREFETCH_MAX_TILES = 5000
+TILE_DOWNLOAD_THREADS = 2  # the OSM tile policy asks bulk clients to keep connections low
+
+# Live driver overlay on the map (driver_overlay.py), shown to admin users
+DRIVER_OVERLAY_ENABLED = True
+DRIVER_OVERLAY_POLL_MS = 1000
+DRIVER_OVERLAY_FRAME_MS = 33  # about 30 redraws a second
+DRIVER_OVERLAY_BUDGET_MS = 8  # dot updates per frame stop after this; the rest wait a frame
+DRIVER_OVERLAY_STALE_SECONDS = 120  # drivers silent this long are removed
+DRIVER_OVERLAY_DOT_RADIUS = 4
+
+# Pickup demand heatmap on the map (demand_heatmap.py), shown to admin users; needs numpy
+HEATMAP_ENABLED = True
+HEATMAP_BBOX = (7.03, 125.55, 7.13, 125.65)  # south, west, north, east
+HEATMAP_CELL_DEG = 0.001  # about 110 m
+HEATMAP_WINDOW_DAYS = 30
+HEATMAP_CHUNK_SIZE = 20000  # pickups per get_pickups page
+HEATMAP_REFRESH_MS = 30000
+HEATMAP_FRAME_MS = 33
+
+# Destination autocomplete (place_search.py)
+PLACES_PATH = "places.csv"  # name, latitude, longitude, category, popularity
+PLACE_SEARCH_LIMIT = 6
+PLACE_SEARCH_DEBOUNCE_MS = 120  # typing pause before suggestions are looked up
+
+# Saved places and frequent destinations (user_places.py)
+FREQUENT_PLACES_LIMIT = 10  # most booked destinations read per session
+FREQUENT_PLACES_MIN_TRIPS = 2  # bookings before a destination is offered
+USER_PLACES_SHOWN = 5  # place buttons on the map screen
+
+# Scheduled rides (ride_scheduler.py)
+RIDE_SCHEDULER_ENABLED = False  # ride_scheduler.py is the one releaser; True releases from the app instead (one app only)
+RESERVATION_LEAD_MINUTES = 15  # a reservation goes to dispatch this long before its pickup time
+RESERVATION_MIN_AHEAD_MINUTES = 30  # earliest pickup time a rider can reserve
+RESERVATION_MAX_AHEAD_DAYS = 30
+RIDE_SCHEDULER_HORIZON_HOURS = 24  # reservations kept in memory; later ones stay in the database
+RIDE_SCHEDULER_RESCAN_INTERVAL = 60  # seconds between checks for reservations booked by other clients
+RIDE_SCHEDULER_CHUNK_SIZE = 5000  # reservations per load page and rides per release
+
+# Voucher campaigns
+VOUCHER_CAMPAIGN_CHUNK_SIZE = 5000
+
+# Notification outbox
+NOTIFICATION_BATCH_SIZE = 200
+NOTIFICATION_FLUSH_INTERVAL = 0.5  # seconds a queued notification may wait
+NOTIFICATION_QUEUE_LIMIT = 10000  # queued while the database is down; further notifications are dropped
+NOTIFICATION_FEED_LIMIT = 20
+NOTIFICATION_POLL_INTERVAL_MS = 15000
+
+# Background tasks
+TASK_WORKERS = 4
+TASK_POLL_INTERVAL_MS = 16  # about one check per frame at 60 fps
+SCREEN_LOAD_TIMEOUT_MS = 10000
+
+# Local cache
+LOCAL_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".quickcab", "cache.db")
 
 # Session management
 CURRENT_USER_ID = None
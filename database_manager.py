@@ -2,39 +2,263 @@
 
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
 import hashlib
+import itertools
+import logging
+import threading
+import time
 from datetime import datetime
 import config
+from storage_backend import StorageBackend
+from query_stats import instrument_cursor, instrument_methods
+from eta_model import ANY_ZONE, bucket_keys, trip_sample
+from user_places import place_cell
 
-class DatabaseManager:
+logger = logging.getLogger("quickcab.db")
+
+def calculate_voucher_discount(voucher, fare_amount):
+    """Discount a valid voucher row (type, value, max_discount) gives on a fare"""
+    if voucher['voucher_type'] == 'percentage':
+        discount = fare_amount * (float(voucher['discount_value']) / 100)
+        if voucher['max_discount'] and discount > voucher['max_discount']:
+            discount = float(voucher['max_discount'])
+    else:
+        discount = float(voucher['discount_value'])
+    
+    return discount
+
+def pad_to_size_class(values):
+    """values padded to the next power of two by repeating the last one
+    
+    Variable-length IN and OR lists are padded before they are spliced into a
+    query, so each query has one statement text (and one cached prepared
+    statement per connection) per size class rather than per list length.
+    Repeated values do not change what the list matches.
+    """
+    size = 1
+    while size < len(values):
+        size *= 2
+    return list(values) + [values[-1]] * (size - len(values))
+
+# user_id -> time.monotonic() of that user's last committed write. Shared by
+# every DatabaseManager in the process, since the notification outbox writes
+# through its own instance.
+_recent_writes = {}
+_recent_writes_lock = threading.Lock()
+
+# Replica index -> time.monotonic() before which it is not tried again
+_replica_down_until = {}
+_replica_turn = itertools.count()
+
+@instrument_methods
+class DatabaseManager(StorageBackend):
+    """MySQL storage backend"""
+    
     def __init__(self):
-        self.connection = None
-        self.cursor = None
+        # Each thread gets its own connection so background workers never
+        # share a cursor with the Tk main thread
+        self._local = threading.local()
+    
+    @property
+    def connection(self):
+        return getattr(self._local, 'connection', None)
+    
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+    
+    @property
+    def cursor(self):
+        return getattr(self._local, 'cursor', None)
+    
+    @cursor.setter
+    def cursor(self, value):
+        self._local.cursor = value
+    
+    @property
+    def replica(self):
+        return getattr(self._local, 'replica', None)
+    
+    @replica.setter
+    def replica(self, value):
+        self._local.replica = value
+    
+    @property
+    def replica_cursor(self):
+        return getattr(self._local, 'replica_cursor', None)
+    
+    @replica_cursor.setter
+    def replica_cursor(self, value):
+        self._local.replica_cursor = value
+    
+    @property
+    def replica_index(self):
+        return getattr(self._local, 'replica_index', None)
+    
+    @replica_index.setter
+    def replica_index(self, value):
+        self._local.replica_index = value
     
     def connect(self):
-        """Establish database connection"""
+        """Take a connection from the pool (or open one if the pool is exhausted)"""
+        settings = dict(
+            host=config.DB_HOST,
+            database=config.DB_NAME,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            port=config.DB_PORT,
+            consume_results=True
+        )
+        
         try:
-            self.connection = mysql.connector.connect(
-                host=config.DB_HOST,
-                database=config.DB_NAME,
-                user=config.DB_USER,
-                password=config.DB_PASSWORD,
-                port=config.DB_PORT
-            )
+            try:
+                # Sessions are not reset on return, so prepared statements
+                # survive from one connect() to the next
+                self.connection = mysql.connector.connect(
+                    pool_name=f"quickcab_{config.DB_NAME}",
+                    pool_size=config.DB_POOL_SIZE,
+                    pool_reset_session=False,
+                    **settings
+                )
+            except PoolError:
+                self.connection = mysql.connector.connect(**settings)
             
             if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
+                self.cursor = instrument_cursor(self.connection.cursor(dictionary=True))
                 return True
-                
+        
         except Error:
             return False
     
     def disconnect(self):
-        """Close database connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Close the cursors and hand the connections back to their pools"""
+        for cursor, connection in ((self.cursor, self.connection), (self.replica_cursor, self.replica)):
+            if cursor:
+                cursor.close()
+            if connection and connection.is_connected():
+                # End any open read snapshot before the next user gets the connection
+                connection.rollback()
+                connection.close()
+        self.cursor = None
+        self.connection = None
+        self.replica_cursor = None
+        self.replica = None
+        self.replica_index = None
+    
+    def _connect_replica(self):
+        """Open this thread's replica connection, returns False if none is reachable"""
+        replicas = config.DB_REPLICAS
+        first = next(_replica_turn)
+        
+        for offset in range(len(replicas)):
+            index = (first + offset) % len(replicas)
+            if _replica_down_until.get(index, 0) > time.monotonic():
+                continue
+            
+            replica = replicas[index]
+            try:
+                self.replica = mysql.connector.connect(
+                    pool_name=f"quickcab_{config.DB_NAME}_replica{index}",
+                    pool_size=config.DB_REPLICA_POOL_SIZE,
+                    pool_reset_session=False,
+                    host=replica['host'],
+                    port=replica.get('port', config.DB_PORT),
+                    user=replica.get('user', config.DB_USER),
+                    password=replica.get('password', config.DB_PASSWORD),
+                    database=config.DB_NAME,
+                    connection_timeout=config.DB_REPLICA_CONNECT_TIMEOUT,
+                    consume_results=True
+                )
+                self.replica_cursor = instrument_cursor(self.replica.cursor(dictionary=True))
+                self.replica_index = index
+                return True
+            except PoolError:
+                # Replica is fine, just busy; this read goes to the primary
+                return False
+            except Error:
+                _replica_down_until[index] = time.monotonic() + config.DB_REPLICA_RETRY_SECONDS
+        
+        return False
+    
+    def _use_replica(self, user_id=None):
+        """Whether a read for user_id may go to a replica"""
+        if not config.DB_REPLICAS:
+            return False
+        
+        if user_id is not None and config.DB_READ_YOUR_WRITES:
+            last_write = _recent_writes.get(user_id)
+            if last_write and time.monotonic() - last_write < config.DB_READ_YOUR_WRITES_WINDOW:
+                return False
+        
+        # Not pinged here: a replica that went away fails its next read,
+        # which _read answers from the primary and _replica_failed records
+        if self.replica:
+            return True
+        return self._connect_replica()
+    
+    def _replica_failed(self):
+        """Drop this thread's replica connection and skip that replica for a while"""
+        _replica_down_until[self.replica_index] = time.monotonic() + config.DB_REPLICA_RETRY_SECONDS
+        try:
+            self.replica.close()
+        except Error:
+            pass
+        self.replica_cursor = None
+        self.replica = None
+    
+    def _note_write(self, *user_ids):
+        """Remember that these users just committed a write"""
+        if not config.DB_REPLICAS:
+            return
+        
+        now = time.monotonic()
+        with _recent_writes_lock:
+            for user_id in user_ids:
+                _recent_writes[user_id] = now
+            
+            if len(_recent_writes) > 10000:
+                cutoff = now - config.DB_READ_YOUR_WRITES_WINDOW
+                for user_id in [u for u, written in _recent_writes.items() if written < cutoff]:
+                    del _recent_writes[user_id]
+    
+    def _statement_cursor(self, query_id, replica=False):
+        """Prepared cursor for query_id, cached on this thread's connection"""
+        connection = self.replica if replica else self.connection
+        if not config.DB_PREPARED_STATEMENTS:
+            return self.replica_cursor if replica else self.cursor
+        
+        # A pooled connection wraps the real one, which outlives the wrapper
+        raw = getattr(connection, '_cnx', connection)
+        statements = getattr(raw, 'quickcab_statements', None)
+        if statements is None or statements['connection_id'] != raw.connection_id:
+            # New or reconnected session: earlier statement handles are gone
+            statements = {'connection_id': raw.connection_id, 'cursors': {}}
+            raw.quickcab_statements = statements
+        
+        cursor = statements['cursors'].get(query_id)
+        if cursor is None:
+            cursor = instrument_cursor(connection.cursor(prepared=True, dictionary=True))
+            statements['cursors'][query_id] = cursor
+        return cursor
+    
+    def _execute(self, query_id, query, params=(), replica=False):
+        """Execute a fixed query on its prepared cursor and return the cursor"""
+        cursor = self._statement_cursor(query_id, replica)
+        cursor.execute(query, params)
+        return cursor
+    
+    def _read(self, query_id, query, params=(), user_id=None):
+        """Execute a read-only query, on a replica unless user_id wrote recently"""
+        if self._use_replica(user_id):
+            try:
+                return self._execute(query_id, query, params, replica=True)
+            except Error:
+                # A failing query fails on the primary too; only a lost replica is retried there
+                if self.replica.is_connected():
+                    raise
+                self._replica_failed()
+        return self._execute(query_id, query, params)
     
     def _hash_password(self, password):
         """Hash password using SHA-256"""
@@ -53,18 +277,17 @@ class DatabaseManager:
                 WHERE username = %s AND password_hash = %s AND account_status = 'active'
             """
             
-            self.cursor.execute(query, (username, hashed_password))
-            user = self.cursor.fetchone()
+            user = self._execute('authenticate_user', query, (username, hashed_password)).fetchone()
             
             if user:
                 update_query = "UPDATE users SET last_login = NOW() WHERE user_id = %s"
-                self.cursor.execute(update_query, (user['user_id'],))
+                self._execute('touch_last_login', update_query, (user['user_id'],))
                 self.connection.commit()
                 
                 return user
             
             return None
-            
+        
         except Error:
             return None
     
@@ -81,11 +304,11 @@ class DatabaseManager:
                 VALUES (%s, %s, %s, %s, %s)
             """
             
-            self.cursor.execute(query, (username, email, hashed_password, full_name, user_type))
+            self._execute('create_user', query, (username, email, hashed_password, full_name, user_type))
             self.connection.commit()
             
             return True
-            
+        
         except Error:
             return False
     
@@ -99,32 +322,36 @@ class DatabaseManager:
                 WHERE user_id = %s AND account_status = 'active'
             """
             
-            self.cursor.execute(query, (user_id,))
-            return self.cursor.fetchone()
-            
+            return self._execute('get_user_info', query, (user_id,)).fetchone()
+        
         except Error:
             return None
     
     # WALLET MANAGEMENT
     
     def get_wallet_balance(self, user_id):
-        """Get user's wallet balance"""
+        """Get user's wallet balance, None if it could not be read"""
         try:
+            if config.WALLET_LEDGER_MODE:
+                wallet = self._ledger_balance(user_id)
+                return wallet['balance'] if wallet else 0.00
+            
             query = "SELECT balance FROM wallet WHERE user_id = %s"
-            self.cursor.execute(query, (user_id,))
-            result = self.cursor.fetchone()
+            result = self._execute('get_wallet_balance', query, (user_id,)).fetchone()
             
             return result['balance'] if result else 0.00
-            
+        
         except Error:
-            return 0.00
+            return None
     
     def add_wallet_funds(self, user_id, amount, description="Wallet top-up"):
         """Add funds to user's wallet"""
         try:
+            if config.WALLET_LEDGER_MODE:
+                return self._post_to_ledger(user_id, 'deposit', amount, description)
+            
             query = "SELECT wallet_id, balance FROM wallet WHERE user_id = %s"
-            self.cursor.execute(query, (user_id,))
-            wallet = self.cursor.fetchone()
+            wallet = self._execute('get_wallet', query, (user_id,)).fetchone()
             
             if not wallet:
                 return None
@@ -134,18 +361,19 @@ class DatabaseManager:
             new_balance = old_balance + float(amount)
             
             update_query = "UPDATE wallet SET balance = %s WHERE wallet_id = %s"
-            self.cursor.execute(update_query, (new_balance, wallet_id))
+            self._execute('set_wallet_balance', update_query, (new_balance, wallet_id))
             
             trans_query = """
                 INSERT INTO wallet_transactions 
                 (wallet_id, user_id, transaction_type, amount, balance_before, balance_after, description)
                 VALUES (%s, %s, 'deposit', %s, %s, %s, %s)
             """
-            self.cursor.execute(trans_query, (wallet_id, user_id, amount, old_balance, new_balance, description))
+            self._execute('insert_deposit', trans_query, (wallet_id, user_id, amount, old_balance, new_balance, description))
             
             self.connection.commit()
+            self._note_write(user_id)
             return new_balance
-            
+        
         except Error:
             self.connection.rollback()
             return None
@@ -153,9 +381,11 @@ class DatabaseManager:
     def deduct_wallet_funds(self, user_id, amount, description="Payment"):
         """Deduct funds from user's wallet"""
         try:
+            if config.WALLET_LEDGER_MODE:
+                return self._post_to_ledger(user_id, 'withdrawal', amount, description)
+            
             query = "SELECT wallet_id, balance FROM wallet WHERE user_id = %s"
-            self.cursor.execute(query, (user_id,))
-            wallet = self.cursor.fetchone()
+            wallet = self._execute('get_wallet', query, (user_id,)).fetchone()
             
             if not wallet:
                 return None
@@ -169,24 +399,174 @@ class DatabaseManager:
             new_balance = old_balance - float(amount)
             
             update_query = "UPDATE wallet SET balance = %s WHERE wallet_id = %s"
-            self.cursor.execute(update_query, (new_balance, wallet_id))
+            self._execute('set_wallet_balance', update_query, (new_balance, wallet_id))
             
             trans_query = """
                 INSERT INTO wallet_transactions 
                 (wallet_id, user_id, transaction_type, amount, balance_before, balance_after, description)
                 VALUES (%s, %s, 'withdrawal', %s, %s, %s, %s)
             """
-            self.cursor.execute(trans_query, (wallet_id, user_id, amount, old_balance, new_balance, description))
+            self._execute('insert_withdrawal', trans_query, (wallet_id, user_id, amount, old_balance, new_balance, description))
             
             self.connection.commit()
+            self._note_write(user_id)
             return new_balance
+        
+        except Error:
+            self.connection.rollback()
+            return None
+    
+    def _ledger_balance(self, user_id, for_update=False):
+        """{wallet_id, balance, last_transaction_id} from the wallet's snapshot plus the postings after it
+        
+        Both reads are index lookups: the snapshot by primary key and the
+        postings as a range on idx_wallet_tx_wallet, bounded by how often the
+        snapshotter runs. With for_update the wallet row is locked and the
+        latest committed postings are read, which serializes writers of one
+        wallet without ever rewriting its row. A wallet created after the
+        rebase has no snapshot yet and starts from its opening wallet.balance.
+        """
+        lock = " FOR UPDATE" if for_update else ""
+        suffix = "_for_update" if for_update else ""
+        
+        snapshot_query = f"""
+            SELECT w.wallet_id, COALESCE(s.balance, w.balance) AS balance,
+                   COALESCE(s.last_transaction_id, 0) AS last_transaction_id
+            FROM wallet w
+            LEFT JOIN wallet_snapshots s ON s.wallet_id = w.wallet_id
+            WHERE w.user_id = %s{lock}
+        """
+        wallet = self._execute('ledger_snapshot' + suffix, snapshot_query, (user_id,)).fetchone()
+        
+        if not wallet:
+            return None
+        
+        postings_query = f"""
+            SELECT COALESCE(SUM(CASE WHEN transaction_type = 'deposit' THEN amount ELSE -amount END), 0) AS delta,
+                   MAX(transaction_id) AS last_transaction_id
+            FROM wallet_transactions
+            WHERE wallet_id = %s AND transaction_id > %s{lock}
+        """
+        postings = self._execute('ledger_postings' + suffix, postings_query,
+                                 (wallet['wallet_id'], wallet['last_transaction_id'])).fetchone()
+        
+        return {
+            'wallet_id': wallet['wallet_id'],
+            'balance': round(float(wallet['balance']) + float(postings['delta']), 2),
+            'last_transaction_id': postings['last_transaction_id'] or wallet['last_transaction_id']
+        }
+    
+    def _post_to_ledger(self, user_id, transaction_type, amount, description):
+        """Append a deposit or withdrawal posting, returns the new balance or None"""
+        wallet = self._ledger_balance(user_id, for_update=True)
+        
+        if not wallet:
+            return None
+        
+        old_balance = wallet['balance']
+        if transaction_type == 'withdrawal':
+            if old_balance < float(amount):
+                # Release the wallet lock
+                self.connection.rollback()
+                return None
+            new_balance = round(old_balance - float(amount), 2)
+        else:
+            new_balance = round(old_balance + float(amount), 2)
+        
+        trans_query = f"""
+            INSERT INTO wallet_transactions 
+            (wallet_id, user_id, transaction_type, amount, balance_before, balance_after, description)
+            VALUES (%s, %s, '{transaction_type}', %s, %s, %s, %s)
+        """
+        self._execute(f'insert_{transaction_type}', trans_query,
+                      (wallet['wallet_id'], user_id, amount, old_balance, new_balance, description))
+        
+        self.connection.commit()
+        self._note_write(user_id)
+        return new_balance
+    
+    def get_last_transaction_id(self):
+        """Highest wallet_transactions id, 0 when there are none"""
+        try:
+            query = "SELECT COALESCE(MAX(transaction_id), 0) AS last_id FROM wallet_transactions"
+            return self._execute('last_transaction_id', query).fetchone()['last_id']
+        
+        except Error:
+            return None
+    
+    def get_wallet_activity(self, after_id, up_to_id):
+        """Postings per user with transaction_id in (after_id, up_to_id]"""
+        try:
+            query = """
+                SELECT user_id, COUNT(*) AS postings
+                FROM wallet_transactions
+                WHERE transaction_id > %s AND transaction_id <= %s
+                GROUP BY user_id
+            """
+            return self._execute('wallet_activity', query, (after_id, up_to_id)).fetchall()
+        
+        except Error:
+            return None
+    
+    def snapshot_wallet(self, user_id):
+        """Move a wallet's ledger snapshot up to its latest posting, returns the balance"""
+        try:
+            wallet = self._ledger_balance(user_id, for_update=True)
+            
+            if not wallet:
+                return None
             
+            query = """
+                INSERT INTO wallet_snapshots (wallet_id, balance, last_transaction_id, created_at)
+                VALUES (%s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE balance = VALUES(balance),
+                    last_transaction_id = VALUES(last_transaction_id), created_at = VALUES(created_at)
+            """
+            self._execute('upsert_wallet_snapshot', query,
+                          (wallet['wallet_id'], wallet['balance'], wallet['last_transaction_id']))
+            
+            self.connection.commit()
+            return wallet['balance']
+        
+        except Error:
+            self.connection.rollback()
+            return None
+    
+    def rebase_wallet_snapshots(self, chunk_size=None):
+        """Snapshot every wallet at its wallet.balance, chunk by chunk
+        
+        Run once when switching config.WALLET_LEDGER_MODE on, while nothing
+        else writes to wallets: from then on wallet.balance is no longer
+        updated. Returns the number of wallets snapshotted, or None on failure.
+        """
+        try:
+            chunk_size = chunk_size or config.WALLET_SNAPSHOT_CHUNK_SIZE
+            query = "SELECT COUNT(*) AS wallets, COALESCE(MAX(wallet_id), 0) AS last_id FROM wallet"
+            wallets = self._execute('count_wallets', query).fetchone()
+            
+            rebase_query = """
+                INSERT INTO wallet_snapshots (wallet_id, balance, last_transaction_id, created_at)
+                SELECT w.wallet_id, w.balance, COALESCE(MAX(t.transaction_id), 0), NOW()
+                FROM wallet w
+                LEFT JOIN wallet_transactions t ON t.wallet_id = w.wallet_id
+                WHERE w.wallet_id > %s AND w.wallet_id <= %s
+                GROUP BY w.wallet_id, w.balance
+                ON DUPLICATE KEY UPDATE balance = VALUES(balance),
+                    last_transaction_id = VALUES(last_transaction_id), created_at = VALUES(created_at)
+            """
+            
+            for start in range(0, wallets['last_id'], chunk_size):
+                self._execute('rebase_wallet_snapshots', rebase_query, (start, start + chunk_size))
+                self.connection.commit()
+            
+            return wallets['wallets']
+        
         except Error:
             self.connection.rollback()
             return None
     
     def get_transaction_history(self, user_id, limit=10):
-        """Get user's transaction history"""
+        """Get user's transaction history, None if it could not be read"""
         try:
             query = """
                 SELECT transaction_type, amount, balance_after, description,
@@ -197,17 +577,16 @@ class DatabaseManager:
                 LIMIT %s
             """
             
-            self.cursor.execute(query, (user_id, limit))
-            return self.cursor.fetchall()
-            
+            return self._read('get_transaction_history', query, (user_id, limit), user_id).fetchall()
+        
         except Error:
-            return []
+            return None
     
     # RIDE MANAGEMENT
     
     def create_ride(self, passenger_id, ride_type, pickup_lat, pickup_lon, pickup_addr,
-                   dest_lat, dest_lon, dest_addr, distance_km, fare, payment_method):
-        """Create a new ride booking"""
+                   dest_lat, dest_lon, dest_addr, distance_km, fare, payment_method, pickup_time=None):
+        """Create a new ride booking, a reservation when pickup_time is given"""
         try:
             timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
             ride_code = f"QC-{timestamp[-6:]}"
@@ -219,58 +598,71 @@ class DatabaseManager:
                 INSERT INTO rides 
                 (ride_code, passenger_id, ride_type, pickup_latitude, pickup_longitude, 
                  pickup_address, destination_latitude, destination_longitude, destination_address,
-                 distance_km, base_fare, distance_fare, final_fare, payment_method, ride_status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'pending')
+                 distance_km, base_fare, distance_fare, final_fare, payment_method, ride_status, pickup_time)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             
-            self.cursor.execute(query, (ride_code, passenger_id, ride_type, pickup_lat, pickup_lon,
-                                       pickup_addr, dest_lat, dest_lon, dest_addr, distance_km,
-                                       base_fare, distance_fare, fare, payment_method))
+            status = 'scheduled' if pickup_time else 'pending'
+            self._execute('create_ride', query, (ride_code, passenger_id, ride_type, pickup_lat, pickup_lon,
+                                                 pickup_addr, dest_lat, dest_lon, dest_addr, distance_km,
+                                                 base_fare, distance_fare, fare, payment_method, status, pickup_time))
+            
+            stats_query = """
+                INSERT INTO user_stats (user_id, rides_booked, last_ride_at)
+                VALUES (%s, 1, NOW())
+                ON DUPLICATE KEY UPDATE rides_booked = rides_booked + 1, last_ride_at = VALUES(last_ride_at)
+            """
+            self._execute('user_stats_booked', stats_query, (passenger_id,))
+            self._add_frequent_place(passenger_id, dest_lat, dest_lon, dest_addr)
             
             self.connection.commit()
+            self._note_write(passenger_id)
             return ride_code
-            
+        
         except Error:
             self.connection.rollback()
             return None
     
     def get_user_rides(self, user_id, limit=20):
-        """Get user's ride history"""
+        """Get user's ride history, None if it could not be read"""
         try:
             query = """
                 SELECT ride_id, ride_code, ride_type, pickup_address, destination_address,
-                       distance_km, final_fare, ride_status, payment_method,
-                       DATE_FORMAT(booking_time, '%m/%d/%Y') as date,
-                       DATE_FORMAT(booking_time, '%h:%i %p') as time
+                       pickup_latitude, pickup_longitude, destination_latitude, destination_longitude,
+                       distance_km, final_fare, ride_status, payment_method, booking_time, pickup_time, end_time,
+                       DATE_FORMAT(COALESCE(pickup_time, booking_time), '%m/%d/%Y') as date,
+                       DATE_FORMAT(COALESCE(pickup_time, booking_time), '%h:%i %p') as time
                 FROM rides
                 WHERE passenger_id = %s
                 ORDER BY booking_time DESC
                 LIMIT %s
             """
             
-            self.cursor.execute(query, (user_id, limit))
-            return self.cursor.fetchall()
-            
+            return self._read('get_user_rides', query, (user_id, limit), user_id).fetchall()
+        
         except Error:
-            return []
+            return None
     
     def update_ride_status(self, ride_id, new_status):
         """Update ride status"""
         try:
             query = "UPDATE rides SET ride_status = %s WHERE ride_id = %s"
-            self.cursor.execute(query, (new_status, ride_id))
+            self._execute('update_ride_status', query, (new_status, ride_id))
             self.connection.commit()
             return True
-            
+        
         except Error:
             return False
     
     def complete_ride(self, ride_id, rating=None, review=None):
         """Complete a ride and process payment"""
         try:
-            query = "SELECT passenger_id, final_fare, payment_method FROM rides WHERE ride_id = %s"
-            self.cursor.execute(query, (ride_id,))
-            ride = self.cursor.fetchone()
+            query = """
+                SELECT passenger_id, final_fare, distance_km, payment_method, ride_status, booking_time, pickup_time,
+                       pickup_latitude, pickup_longitude, destination_latitude, destination_longitude
+                FROM rides WHERE ride_id = %s
+            """
+            ride = self._execute('get_ride_payment', query, (ride_id,)).fetchone()
             
             if not ride:
                 return False
@@ -289,11 +681,306 @@ class DatabaseManager:
                 SET ride_status = 'completed', end_time = NOW(), rating = %s, review_comment = %s
                 WHERE ride_id = %s
             """
-            self.cursor.execute(update_query, (rating, review, ride_id))
+            self._execute('complete_ride', update_query, (rating, review, ride_id))
+            
+            # Rating an already completed ride again does not count it twice
+            if ride['ride_status'] != 'completed':
+                stats_query = """
+                    INSERT INTO user_stats (user_id, rides_completed, total_spent, total_km)
+                    VALUES (%s, 1, %s, %s)
+                    ON DUPLICATE KEY UPDATE rides_completed = rides_completed + 1,
+                        total_spent = total_spent + VALUES(total_spent), total_km = total_km + VALUES(total_km)
+                """
+                self._execute('user_stats_completed', stats_query,
+                              (ride['passenger_id'], ride['final_fare'], ride['distance_km']))
+                
+                sample = trip_sample(ride, datetime.now())
+                if sample:
+                    self._add_eta_sample(*sample)
+            
             self.connection.commit()
+            self._note_write(ride['passenger_id'])
+            
+            return True
+        
+        except Error:
+            self.connection.rollback()
+            return False
+    
+    def get_user_stats(self, user_id):
+        """Ride totals of a user from the user_stats rollup"""
+        try:
+            query = """
+                SELECT rides_booked, rides_completed, total_spent, total_km, last_ride_at
+                FROM user_stats WHERE user_id = %s
+            """
+            result = self._read('get_user_stats', query, (user_id,), user_id=user_id).fetchone()
+            
+            return result or {'rides_booked': 0, 'rides_completed': 0, 'total_spent': 0,
+                              'total_km': 0, 'last_ride_at': None}
+        
+        except Error:
+            return None
+    
+    def rebuild_user_stats(self, chunk_size=None):
+        """Recompute user_stats from rides, chunk_size users per transaction
+        
+        Each chunk replaces the rows of a user_id range with aggregates over
+        their rides (an idx_rides_passenger_booking range), so it can run on a
+        live database; a ride booked in a chunk while it is being rebuilt may
+        be missed until the next rebuild. Returns the number of users covered,
+        or None on failure.
+        """
+        try:
+            chunk_size = chunk_size or config.USER_STATS_CHUNK_SIZE
+            query = "SELECT COALESCE(MAX(user_id), 0) AS last_id FROM users"
+            last_user_id = self._execute('last_user_id', query).fetchone()['last_id']
+            
+            delete_query = "DELETE FROM user_stats WHERE user_id > %s AND user_id <= %s"
+            insert_query = """
+                INSERT INTO user_stats (user_id, rides_booked, rides_completed, total_spent, total_km, last_ride_at)
+                SELECT passenger_id, COUNT(*),
+                       SUM(CASE WHEN ride_status = 'completed' THEN 1 ELSE 0 END),
+                       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN final_fare END), 0),
+                       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN distance_km END), 0),
+                       MAX(booking_time)
+                FROM rides
+                WHERE passenger_id > %s AND passenger_id <= %s
+                GROUP BY passenger_id
+            """
+            
+            for start in range(0, last_user_id, chunk_size):
+                self._execute('clear_user_stats', delete_query, (start, start + chunk_size))
+                self._execute('rebuild_user_stats', insert_query, (start, start + chunk_size))
+                self.connection.commit()
+            
+            return last_user_id
+        
+        except Error:
+            self.connection.rollback()
+            return None
+    
+    def _add_eta_sample(self, key, km, minutes):
+        """Add one completed trip to its eta_speeds buckets"""
+        query = """
+            INSERT INTO eta_speeds (origin_zone, dest_zone, hour_of_week, trips, total_km, total_minutes)
+            VALUES (%s, %s, %s, 1, %s, %s), (%s, %s, %s, 1, %s, %s), (%s, %s, %s, 1, %s, %s), (%s, %s, %s, 1, %s, %s)
+            ON DUPLICATE KEY UPDATE trips = trips + 1, total_km = total_km + VALUES(total_km),
+                total_minutes = total_minutes + VALUES(total_minutes)
+        """
+        params = []
+        for bucket in bucket_keys(key):
+            params.extend(bucket + (round(km, 2), round(minutes, 1)))
+        self._execute('add_eta_sample', query, params)
+    
+    def get_eta_speeds(self, keys):
+        """eta_speeds rows for a list of (origin_zone, dest_zone, hour_of_week) keys"""
+        try:
+            if not keys:
+                return []
+            
+            keys = pad_to_size_class(keys)
+            conditions = " OR ".join(["(origin_zone = %s AND dest_zone = %s AND hour_of_week = %s)"] * len(keys))
+            query = f"""
+                SELECT origin_zone, dest_zone, hour_of_week, trips, total_km, total_minutes
+                FROM eta_speeds
+                WHERE {conditions}
+            """
+            params = [value for key in keys for value in key]
+            return self._read(f'get_eta_speeds_{len(keys)}', query, params).fetchall()
+        
+        except Error:
+            return None
+    
+    def get_completed_trips(self, after_id=0, limit=5000):
+        """Completed rides after ride_id after_id, with what eta_model learns from"""
+        try:
+            query = """
+                SELECT ride_id, pickup_latitude, pickup_longitude, destination_latitude, destination_longitude,
+                       distance_km, booking_time, pickup_time, end_time
+                FROM rides
+                WHERE ride_id > %s AND ride_status = 'completed'
+                ORDER BY ride_id
+                LIMIT %s
+            """
+            return self._read('get_completed_trips', query, (after_id, limit)).fetchall()
+        
+        except Error:
+            return None
+    
+    def replace_eta_speeds(self, rows):
+        """Replace eta_speeds with (origin_zone, dest_zone, hour_of_week, trips, total_km, total_minutes) rows"""
+        try:
+            self._execute('clear_eta_speeds', "DELETE FROM eta_speeds WHERE origin_zone >= %s", (ANY_ZONE,))
             
+            query = """
+                INSERT INTO eta_speeds (origin_zone, dest_zone, hour_of_week, trips, total_km, total_minutes)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            for start in range(0, len(rows), config.ETA_REBUILD_CHUNK_SIZE):
+                self.cursor.executemany(query, rows[start:start + config.ETA_REBUILD_CHUNK_SIZE])
+            
+            self.connection.commit()
             return True
+        
+        except Error:
+            self.connection.rollback()
+            return False
+    
+    def get_pickups(self, after=None, start=None, limit=None):
+        """Pickup points of rides booked since start, after the (booking_time, ride_id) key `after`"""
+        try:
+            query = """
+                SELECT ride_id, pickup_latitude, pickup_longitude, booking_time
+                FROM rides
+                WHERE booking_time >= %s AND booking_time < %s AND (booking_time > %s OR ride_id > %s)
+                ORDER BY booking_time, ride_id
+                LIMIT %s
+            """
+            return self._export_page('get_pickups', query, after, start, None, limit)
+        
+        except Error:
+            return None
+    
+    # SCHEDULED RIDES
+    
+    def get_scheduled_rides(self, after=None, until=None, limit=None):
+        """Reservations picked up before until, after the (pickup_time, ride_id) key `after`"""
+        try:
+            query = """
+                SELECT ride_id, pickup_time
+                FROM rides
+                WHERE ride_status = 'scheduled' AND pickup_time >= %s AND pickup_time < %s
+                  AND (pickup_time > %s OR ride_id > %s)
+                ORDER BY pickup_time, ride_id
+                LIMIT %s
+            """
+            after_time, after_id = after or (datetime(1970, 1, 1), 0)
+            params = (after_time, until or datetime(9999, 12, 31), after_time, after_id,
+                      limit or config.RIDE_SCHEDULER_CHUNK_SIZE)
+            return self._execute('get_scheduled_rides', query, params).fetchall()
+        
+        except Error:
+            return None
+    
+    def get_recent_reservations(self, booked_since):
+        """Reservations still scheduled that were booked at or after booked_since"""
+        try:
+            # Left to itself the planner may take the ride_status equality on
+            # idx_rides_status_pickup and walk every reservation; the hint keeps
+            # it on the short booking_time range
+            query = """
+                SELECT ride_id, pickup_time
+                FROM rides FORCE INDEX (idx_rides_booking_status)
+                WHERE booking_time >= %s AND ride_status = 'scheduled'
+            """
+            return self._execute('get_recent_reservations', query, (booked_since,)).fetchall()
+        
+        except Error:
+            return None
+    
+    def release_scheduled_rides(self, ride_ids, due_by):
+        """Move reservations picked up by due_by to dispatch ('pending'), returns the rides moved
+        
+        Rides that were cancelled or already released in the meantime are
+        skipped, so running more than one scheduler releases each ride once.
+        """
+        try:
+            if not ride_ids:
+                return []
             
+            ride_ids = pad_to_size_class(ride_ids)
+            placeholders = ", ".join(["%s"] * len(ride_ids))
+            query = f"""
+                SELECT ride_id, ride_code, passenger_id, ride_type, pickup_time
+                FROM rides
+                WHERE ride_id IN ({placeholders}) AND ride_status = 'scheduled' AND pickup_time <= %s
+                FOR UPDATE
+            """
+            rides = self._execute(f'get_due_rides_{len(ride_ids)}', query, (*ride_ids, due_by)).fetchall()
+            if rides:
+                released_ids = pad_to_size_class([ride['ride_id'] for ride in rides])
+                placeholders = ", ".join(["%s"] * len(released_ids))
+                update_query = f"UPDATE rides SET ride_status = 'pending' WHERE ride_id IN ({placeholders})"
+                self._execute(f'release_rides_{len(released_ids)}', update_query, released_ids)
+            
+            self.connection.commit()
+            self._note_write(*{ride['passenger_id'] for ride in rides})
+            return rides
+        
+        except Error:
+            self.connection.rollback()
+            return None
+    
+    # SAVED PLACES
+    
+    def _add_frequent_place(self, user_id, latitude, longitude, address):
+        """Count a destination of user_id in frequent_places"""
+        query = """
+            INSERT INTO frequent_places (user_id, cell_lat, cell_lon, latitude, longitude, address, trips, last_used_at)
+            VALUES (%s, %s, %s, %s, %s, %s, 1, NOW())
+            ON DUPLICATE KEY UPDATE trips = trips + 1, latitude = VALUES(latitude), longitude = VALUES(longitude),
+                address = COALESCE(VALUES(address), address), last_used_at = VALUES(last_used_at)
+        """
+        self._execute('add_frequent_place', query, (user_id, place_cell(latitude), place_cell(longitude),
+                                                    latitude, longitude, address))
+    
+    def get_saved_places(self, user_id):
+        """Places a user saved under a label"""
+        try:
+            query = """
+                SELECT label, address, latitude, longitude
+                FROM saved_places
+                WHERE user_id = %s
+                ORDER BY place_id
+            """
+            return self._read('get_saved_places', query, (user_id,), user_id=user_id).fetchall()
+        
+        except Error:
+            return None
+    
+    def get_frequent_places(self, user_id, limit=None):
+        """A user's most booked destinations"""
+        try:
+            query = """
+                SELECT address, latitude, longitude, trips, last_used_at
+                FROM frequent_places
+                WHERE user_id = %s
+                ORDER BY trips DESC, last_used_at DESC
+                LIMIT %s
+            """
+            limit = limit or config.FREQUENT_PLACES_LIMIT
+            return self._read('get_frequent_places', query, (user_id, limit), user_id=user_id).fetchall()
+        
+        except Error:
+            return None
+    
+    def save_place(self, user_id, label, address, latitude, longitude):
+        """Save a place under a label, replacing the user's place of the same label"""
+        try:
+            query = """
+                INSERT INTO saved_places (user_id, label, address, latitude, longitude)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE address = VALUES(address), latitude = VALUES(latitude),
+                    longitude = VALUES(longitude)
+            """
+            self._execute('save_place', query, (user_id, label, address, latitude, longitude))
+            self.connection.commit()
+            self._note_write(user_id)
+            return True
+        
+        except Error:
+            self.connection.rollback()
+            return False
+    
+    def delete_saved_place(self, user_id, label):
+        try:
+            query = "DELETE FROM saved_places WHERE user_id = %s AND label = %s"
+            self._execute('delete_saved_place', query, (user_id, label))
+            self.connection.commit()
+            self._note_write(user_id)
+            return True
+        
         except Error:
             self.connection.rollback()
             return False
@@ -301,7 +988,7 @@ class DatabaseManager:
     # VOUCHER MANAGEMENT
     
     def get_user_vouchers(self, user_id):
-        """Get user's available vouchers"""
+        """Get user's available vouchers, None if they could not be read"""
         try:
             query = """
                 SELECT v.voucher_id, v.voucher_code, v.voucher_type, v.discount_value,
@@ -318,11 +1005,10 @@ class DatabaseManager:
                 ORDER BY v.expiry_date DESC
             """
             
-            self.cursor.execute(query, (user_id,))
-            return self.cursor.fetchall()
-            
+            return self._read('get_user_vouchers', query, (user_id,), user_id).fetchall()
+        
         except Error:
-            return []
+            return None
     
     def validate_voucher(self, voucher_code, user_id, fare_amount):
         """Validate if voucher can be used"""
@@ -338,8 +1024,7 @@ class DatabaseManager:
                   AND v.expiry_date >= CURDATE()
             """
             
-            self.cursor.execute(query, (voucher_code, user_id))
-            voucher = self.cursor.fetchone()
+            voucher = self._execute('validate_voucher', query, (voucher_code, user_id)).fetchone()
             
             if not voucher:
                 return None, "Invalid or expired voucher"
@@ -350,15 +1035,8 @@ class DatabaseManager:
             if fare_amount < voucher['min_fare']:
                 return None, f"Minimum fare of ₱{voucher['min_fare']} required"
             
-            if voucher['voucher_type'] == 'percentage':
-                discount = fare_amount * (voucher['discount_value'] / 100)
-                if voucher['max_discount'] and discount > voucher['max_discount']:
-                    discount = voucher['max_discount']
-            else:
-                discount = voucher['discount_value']
-            
-            return discount, None
-            
+            return calculate_voucher_discount(voucher, fare_amount), None
+        
         except Error:
             return None, "Error validating voucher"
     
@@ -366,8 +1044,7 @@ class DatabaseManager:
         """Mark voucher as used for a ride"""
         try:
             query = "SELECT voucher_id FROM vouchers WHERE voucher_code = %s"
-            self.cursor.execute(query, (voucher_code,))
-            result = self.cursor.fetchone()
+            result = self._execute('get_voucher_id', query, (voucher_code,)).fetchone()
             
             if not result:
                 return False
@@ -379,17 +1056,18 @@ class DatabaseManager:
                 SET times_used = times_used + 1, last_used = NOW()
                 WHERE user_id = %s AND voucher_id = %s
             """
-            self.cursor.execute(update_query, (user_id, voucher_id))
+            self._execute('count_voucher_use', update_query, (user_id, voucher_id))
             
             insert_query = """
                 INSERT INTO ride_vouchers (ride_id, voucher_id, discount_applied)
                 VALUES (%s, %s, %s)
             """
-            self.cursor.execute(insert_query, (ride_id, voucher_id, discount_applied))
+            self._execute('insert_ride_voucher', insert_query, (ride_id, voucher_id, discount_applied))
             
             self.connection.commit()
+            self._note_write(user_id)
             return True
-            
+        
         except Error:
             self.connection.rollback()
             return False
@@ -398,8 +1076,7 @@ class DatabaseManager:
         """Assign a voucher to a user"""
         try:
             query = "SELECT voucher_id FROM vouchers WHERE voucher_code = %s"
-            self.cursor.execute(query, (voucher_code,))
-            result = self.cursor.fetchone()
+            result = self._execute('get_voucher_id', query, (voucher_code,)).fetchone()
             
             if not result:
                 return False
@@ -411,14 +1088,132 @@ class DatabaseManager:
                 VALUES (%s, %s, 0)
                 ON DUPLICATE KEY UPDATE date_claimed = NOW()
             """
-            self.cursor.execute(insert_query, (user_id, voucher_id))
+            self._execute('assign_voucher', insert_query, (user_id, voucher_id))
             self.connection.commit()
+            self._note_write(user_id)
             
             return True
-            
+        
         except Error:
             return False
     
+    def issue_voucher_campaign(self, voucher_code, segment='all', user_ids=None,
+                               last_login_since=None, chunk_size=None, on_progress=None):
+        """Assign a voucher to a user segment in a single transaction
+        
+        segment is 'all' (every active user), 'last_login' (active users who
+        logged in on or after last_login_since) or 'ids' (the given user_ids).
+        Users are processed in user_id order, chunk_size at a time, with one
+        INSERT ... SELECT per chunk. on_progress(done, total) is called after
+        every chunk. Returns the number of active users the voucher was
+        issued to (including users who already had it), or None on failure.
+        """
+        try:
+            query = "SELECT voucher_id FROM vouchers WHERE voucher_code = %s"
+            result = self._execute('get_voucher_id', query, (voucher_code,)).fetchone()
+            
+            if not result:
+                return None
+            
+            voucher_id = result['voucher_id']
+            chunk_size = chunk_size or config.VOUCHER_CAMPAIGN_CHUNK_SIZE
+            
+            if segment == 'ids':
+                done = self._issue_voucher_to_ids(voucher_id, user_ids or [], chunk_size, on_progress)
+            elif segment in ('all', 'last_login'):
+                if segment == 'last_login' and last_login_since is None:
+                    return None
+                done = self._issue_voucher_to_range(voucher_id, last_login_since, chunk_size, on_progress)
+            else:
+                return None
+            
+            self.connection.commit()
+            return done
+        
+        except Error:
+            self.connection.rollback()
+            return None
+    
+    def _issue_voucher_to_range(self, voucher_id, last_login_since, chunk_size, on_progress):
+        """Insert user_vouchers rows for a users segment chunk by chunk"""
+        segment_filter = "account_status = 'active'"
+        segment_params = ()
+        if last_login_since is not None:
+            segment_filter += " AND last_login >= %s"
+            segment_params = (last_login_since,)
+        
+        segment_id = 'last_login' if last_login_since is not None else 'all'
+        
+        count_query = f"SELECT COUNT(*) AS total FROM users WHERE {segment_filter}"
+        total = self._execute(f'campaign_count_{segment_id}', count_query, segment_params).fetchone()['total']
+        
+        boundary_query = f"""
+            SELECT MAX(user_id) AS last_id, COUNT(*) AS users_in_chunk
+            FROM (
+                SELECT user_id FROM users
+                WHERE user_id > %s AND {segment_filter}
+                ORDER BY user_id
+                LIMIT %s
+            ) AS chunk
+        """
+        insert_query = f"""
+            INSERT INTO user_vouchers (user_id, voucher_id, times_used)
+            SELECT user_id, %s, 0 FROM users
+            WHERE user_id > %s AND user_id <= %s AND {segment_filter}
+            ON DUPLICATE KEY UPDATE date_claimed = NOW()
+        """
+        
+        done = 0
+        last_id = 0
+        while done < total:
+            chunk = self._execute(f'campaign_boundary_{segment_id}', boundary_query,
+                                  (last_id,) + segment_params + (chunk_size,)).fetchone()
+            if not chunk or not chunk['users_in_chunk']:
+                break
+            
+            self._execute(f'campaign_insert_{segment_id}', insert_query,
+                          (voucher_id, last_id, chunk['last_id']) + segment_params)
+            
+            last_id = chunk['last_id']
+            done += chunk['users_in_chunk']
+            if on_progress:
+                on_progress(done, total)
+        
+        return done
+    
+    def _issue_voucher_to_ids(self, voucher_id, user_ids, chunk_size, on_progress):
+        """Insert user_vouchers rows for an explicit list of user ids, returns the users issued to"""
+        user_ids = sorted(set(user_ids))
+        total = len(user_ids)
+        
+        issued = 0
+        for start in range(0, total, chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            
+            # Counted rather than taken from rowcount, which ON DUPLICATE KEY
+            # UPDATE reports as 2 per updated row; unknown and inactive ids
+            # get nothing
+            count_query = f"""
+                SELECT COUNT(*) AS users FROM users
+                WHERE user_id IN ({placeholders}) AND account_status = 'active'
+            """
+            self.cursor.execute(count_query, chunk)
+            issued += self.cursor.fetchone()['users']
+            
+            insert_query = f"""
+                INSERT INTO user_vouchers (user_id, voucher_id, times_used)
+                SELECT user_id, %s, 0 FROM users
+                WHERE user_id IN ({placeholders}) AND account_status = 'active'
+                ON DUPLICATE KEY UPDATE date_claimed = NOW()
+            """
+            self.cursor.execute(insert_query, [voucher_id] + chunk)
+            
+            if on_progress:
+                on_progress(start + len(chunk), total)
+        
+        return issued
+    
     # DRIVER MANAGEMENT
     
     def get_available_drivers(self, ride_type):
@@ -436,12 +1231,74 @@ class DatabaseManager:
                 LIMIT 5
             """
             
-            self.cursor.execute(query, (ride_type,))
-            return self.cursor.fetchall()
-            
+            return self._read('get_available_drivers', query, (ride_type,)).fetchall()
+        
         except Error:
             return []
     
+    def save_driver_locations(self, locations):
+        """Upsert a batch of (driver_id, latitude, longitude, heading, speed_kmh, recorded_at) rows
+        
+        Each row is stamped with the database's updated_at. Rows the database
+        rejects are logged and dropped. Returns False only when the batch
+        could not be written and should be retried.
+        """
+        query = """
+            INSERT INTO driver_locations (driver_id, latitude, longitude, heading, speed_kmh, recorded_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE latitude = VALUES(latitude), longitude = VALUES(longitude),
+                heading = VALUES(heading), speed_kmh = VALUES(speed_kmh), recorded_at = VALUES(recorded_at),
+                updated_at = VALUES(updated_at)
+        """
+        
+        return self._write_rows('save_driver_location', query, locations, 'driver location') is not None
+    
+    def _write_rows(self, query_id, query, rows, what):
+        """Insert a batch in one statement, or row by row if the batch fails
+        
+        One bad row fails the whole executemany; on a live connection the rows
+        are then inserted one at a time and those the database rejects are
+        logged and dropped, so a batch is never retried forever. Returns the
+        rows written, or None when the connection failed.
+        """
+        try:
+            self.cursor.executemany(query, rows)
+            self.connection.commit()
+            return rows
+        
+        except Error:
+            pass
+        
+        try:
+            self.connection.rollback()
+            written = []
+            for row in rows:
+                try:
+                    self._execute(query_id, query, row)
+                    written.append(row)
+                except Error as e:
+                    if not self.connection.is_connected():
+                        raise
+                    logger.warning("Dropped %s for id %s: %s", what, row[0], e)
+            self.connection.commit()
+            return written
+        
+        except Error:
+            return None
+    
+    def get_driver_locations(self, since):
+        """Latest position of every driver written after since (database time, updated_at)"""
+        try:
+            query = """
+                SELECT driver_id, latitude, longitude, heading, recorded_at, updated_at
+                FROM driver_locations
+                WHERE updated_at > %s
+            """
+            return self._read('get_driver_locations', query, (since,)).fetchall()
+        
+        except Error:
+            return None
+    
     # NOTIFICATIONS
     
     def create_notification(self, user_id, notification_type, title, message):
@@ -452,13 +1309,31 @@ class DatabaseManager:
                 VALUES (%s, %s, %s, %s)
             """
             
-            self.cursor.execute(query, (user_id, notification_type, title, message))
+            self._execute('create_notification', query, (user_id, notification_type, title, message))
             self.connection.commit()
+            self._note_write(user_id)
             return True
-            
+        
         except Error:
             return False
     
+    def create_notifications(self, notifications):
+        """Create a batch of (user_id, type, title, message) notifications
+        
+        Rows the database rejects (a user deleted since the notification was
+        queued, say) are logged and dropped. Returns False only when the batch
+        could not be written and should be retried on a new connection.
+        """
+        query = """
+            INSERT INTO notifications (user_id, notification_type, title, message)
+            VALUES (%s, %s, %s, %s)
+        """
+        
+        written = self._write_rows('create_notification', query, notifications, 'notification')
+        if written:
+            self._note_write(*{n[0] for n in written})
+        return written is not None
+    
     def get_user_notifications(self, user_id, limit=10):
         """Get user's notifications"""
         try:
@@ -471,23 +1346,119 @@ class DatabaseManager:
                 LIMIT %s
             """
             
-            self.cursor.execute(query, (user_id, limit))
-            return self.cursor.fetchall()
+            return self._read('get_user_notifications', query, (user_id, limit), user_id).fetchall()
+        
+        except Error:
+            return []
+    
+    def get_notifications_since(self, user_id, since_id=0, limit=20):
+        """Get notifications newer than since_id, newest first"""
+        try:
+            query = """
+                SELECT notification_id, notification_type, title, message, is_read,
+                       DATE_FORMAT(created_at, '%d %b %h:%i %p') as date_display
+                FROM notifications
+                WHERE user_id = %s AND notification_id > %s
+                ORDER BY notification_id DESC
+                LIMIT %s
+            """
             
+            return self._execute('get_notifications_since', query, (user_id, since_id, limit)).fetchall()
+        
         except Error:
             return []
     
-    def mark_notification_read(self, notification_id):
-        """Mark notification as read"""
+    def get_unread_notification_count(self, user_id):
+        """Count user's unread notifications"""
         try:
-            query = "UPDATE notifications SET is_read = TRUE WHERE notification_id = %s"
-            self.cursor.execute(query, (notification_id,))
-            self.connection.commit()
-            return True
+            query = """
+                SELECT COUNT(*) AS unread
+                FROM notifications
+                WHERE user_id = %s AND is_read = FALSE
+            """
             
+            result = self._execute('get_unread_notification_count', query, (user_id,)).fetchone()
+            return int(result['unread']) if result else 0
+        
         except Error:
-            return False
+            return 0
+    
+    def mark_notifications_read(self, user_id, up_to_id=None):
+        """Mark all of a user's notifications (up to up_to_id) as read"""
+        try:
+            query = """
+                UPDATE notifications SET is_read = TRUE
+                WHERE user_id = %s AND is_read = FALSE AND notification_id <= %s
+            """
+            
+            cursor = self._execute('mark_notifications_read', query,
+                                   (user_id, up_to_id if up_to_id is not None else 2**63 - 1))
+            self.connection.commit()
+            self._note_write(user_id)
+            return cursor.rowcount
+        
+        except Error:
+            return None
+    
+    # EXPORTS
+    
+    def _export_page(self, query_id, query, after, start, end, limit):
+        """One keyset page of an export, ordered by (date, id)"""
+        start = start or datetime(1970, 1, 1)
+        end = end or datetime(9999, 12, 31)
+        after_date, after_id = after or (start, 0)
+        
+        params = (after_date, end, after_date, after_id, limit or config.EXPORT_CHUNK_SIZE)
+        return self._read(query_id, query, params).fetchall()
+    
+    def export_rides(self, after=None, start=None, end=None, limit=None):
+        """Rides booked in [start, end) after the (booking_time, ride_id) key `after`"""
+        try:
+            query = """
+                SELECT ride_id, ride_code, passenger_id, driver_id, ride_type,
+                       pickup_latitude, pickup_longitude, pickup_address,
+                       destination_latitude, destination_longitude, destination_address,
+                       distance_km, base_fare, distance_fare, final_fare, payment_method,
+                       ride_status, booking_time, end_time, rating, review_comment
+                FROM rides
+                WHERE booking_time >= %s AND booking_time < %s AND (booking_time > %s OR ride_id > %s)
+                ORDER BY booking_time, ride_id
+                LIMIT %s
+            """
+            return self._export_page('export_rides', query, after, start, end, limit)
+        
+        except Error:
+            return None
+    
+    def export_wallet_transactions(self, after=None, start=None, end=None, limit=None):
+        """Wallet transactions in [start, end) after the (transaction_date, transaction_id) key `after`"""
+        try:
+            query = """
+                SELECT transaction_id, wallet_id, user_id, transaction_type, amount,
+                       balance_before, balance_after, description, transaction_date
+                FROM wallet_transactions
+                WHERE transaction_date >= %s AND transaction_date < %s
+                      AND (transaction_date > %s OR transaction_id > %s)
+                ORDER BY transaction_date, transaction_id
+                LIMIT %s
+            """
+            return self._export_page('export_wallet_transactions', query, after, start, end, limit)
+        
+        except Error:
+            return None
+
+
+def create_database_manager(backend=None):
+    """Create the storage backend named by config.DB_BACKEND"""
+    backend = backend or config.DB_BACKEND
+    
+    if backend == 'sqlite':
+        from sqlite_backend import SQLiteDatabaseManager
+        return SQLiteDatabaseManager()
+    if backend == 'mysql':
+        return DatabaseManager()
+    raise ValueError(f"Unknown storage backend: {backend}")
 
 
 # Create global instance
-db = DatabaseManager()
\ No newline at end of file
+db = create_database_manager()
\ No newline at end of file
@@ -0,0 +1,294 @@
+# demand_heatmap.py - Pickup Demand Heatmap
+#
+# Pickups of the rides booked in the last HEATMAP_WINDOW_DAYS are counted on
+# a grid of HEATMAP_CELL_DEG cells over HEATMAP_BBOX with NumPy. The counts
+# are built by paging through get_pickups once and then topped up with the
+# rides booked since the last refresh.
+#
+# HeatmapOverlay draws the grid as one semi-transparent image on the map.
+# The image is rendered on a worker thread for the current zoom, covering the
+# view and one view size around it, and kept while panning (the image is only
+# moved). It is rendered again when the zoom changes, when the view leaves the
+# rendered area, or when a refresh added pickups.
+#
+#     python demand_heatmap.py --days 30     # time the aggregation, show the busiest cells
+#
+# Needs numpy (pip install numpy); without it the map shows no heatmap.
+
+import argparse
+import math
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from PIL import Image, ImageTk
+from tkintermapview.utility_functions import decimal_to_osm
+import config
+from database_manager import create_database_manager
+from task_runner import task_runner
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def tile_to_decimal(tile_x, tile_y, zoom):
+    """(latitude, longitude) of OSM tile coordinates"""
+    n = 2.0 ** zoom
+    longitude = tile_x / n * 360.0 - 180.0
+    latitude = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+    return latitude, longitude
+
+def color_table():
+    """256 RGBA colours from transparent through blue and yellow to red"""
+    t = numpy.linspace(0.0, 1.0, 256)
+    red = numpy.clip(t * 2.0, 0.0, 1.0)
+    green = numpy.clip(1.5 - numpy.abs(t - 0.5) * 3.0, 0.0, 1.0)
+    blue = numpy.clip(1.0 - t * 2.0, 0.0, 1.0)
+    alpha = numpy.where(t > 0, 70 + t * 130, 0)
+    table = numpy.stack([red * 255, green * 255, blue * 255, alpha], axis=1)
+    return table.astype(numpy.uint8)
+
+COLORS = color_table() if numpy is not None else None
+
+class DemandHeatmap:
+    """Pickup counts per grid cell over the service area"""
+    
+    def __init__(self, bbox=None, cell_deg=None, window_days=None):
+        self.south, self.west, self.north, self.east = bbox or config.HEATMAP_BBOX
+        self.cell_deg = cell_deg or config.HEATMAP_CELL_DEG
+        self.rows = math.ceil(round((self.north - self.south) / self.cell_deg, 6))
+        self.columns = math.ceil(round((self.east - self.west) / self.cell_deg, 6))
+        
+        # Row 0 is the northern edge, like the map
+        self.counts = numpy.zeros((self.rows, self.columns), dtype=numpy.int32)
+        self.start = datetime.now() - timedelta(days=window_days or config.HEATMAP_WINDOW_DAYS)
+        self.after = None
+        self.pickups = 0
+        self.version = 0
+        self.lock = threading.Lock()
+    
+    def add_pickups(self, latitudes, longitudes):
+        """Bin pickup coordinates, dropping the ones outside the grid"""
+        latitudes = numpy.asarray(latitudes, dtype=numpy.float64)
+        longitudes = numpy.asarray(longitudes, dtype=numpy.float64)
+        rows = numpy.floor((self.north - latitudes) / self.cell_deg).astype(numpy.int64)
+        columns = numpy.floor((longitudes - self.west) / self.cell_deg).astype(numpy.int64)
+        
+        inside = (rows >= 0) & (rows < self.rows) & (columns >= 0) & (columns < self.columns)
+        cells = rows[inside] * self.columns + columns[inside]
+        binned = numpy.bincount(cells, minlength=self.rows * self.columns).reshape(self.rows, self.columns)
+        
+        with self.lock:
+            self.counts += binned.astype(numpy.int32)
+            self.pickups += int(inside.sum())
+            self.version += 1
+    
+    def refresh(self, db, chunk_size=None):
+        """Bin the rides booked since the last refresh, returns how many were read"""
+        chunk_size = chunk_size or config.HEATMAP_CHUNK_SIZE
+        read = 0
+        while True:
+            rides = db.get_pickups(self.after, self.start, chunk_size)
+            if rides is None:
+                raise RuntimeError("Reading pickups failed")
+            if not rides:
+                return read
+            
+            self.add_pickups([ride['pickup_latitude'] for ride in rides],
+                             [ride['pickup_longitude'] for ride in rides])
+            self.after = (rides[-1]['booking_time'], rides[-1]['ride_id'])
+            read += len(rides)
+            if len(rides) < chunk_size:
+                return read
+    
+    def snapshot(self):
+        """(counts copy, version)"""
+        with self.lock:
+            return self.counts.copy(), self.version
+    
+    def render(self, counts, zoom, area, tile_size=256):
+        """(image, top-left tile position) of the cells inside a (left, top, right, bottom) tile area, or None"""
+        left, top, right, bottom = area
+        north, west = tile_to_decimal(left, top, zoom)
+        south, east = tile_to_decimal(right, bottom, zoom)
+        
+        first_row = max(0, math.floor((self.north - north) / self.cell_deg))
+        last_row = min(self.rows, math.ceil((self.north - south) / self.cell_deg))
+        first_column = max(0, math.floor((west - self.west) / self.cell_deg))
+        last_column = min(self.columns, math.ceil((east - self.west) / self.cell_deg))
+        if first_row >= last_row or first_column >= last_column:
+            return None
+        
+        # Tile coordinates of the cell edges of the slice
+        image_left, image_top = decimal_to_osm(self.north - first_row * self.cell_deg,
+                                               self.west + first_column * self.cell_deg, zoom)
+        image_right, image_bottom = decimal_to_osm(self.north - last_row * self.cell_deg,
+                                                   self.west + last_column * self.cell_deg, zoom)
+        width = max(1, round((image_right - image_left) * tile_size))
+        height = max(1, round((image_bottom - image_top) * tile_size))
+        
+        cells = counts[first_row:last_row, first_column:last_column]
+        peak = counts.max()
+        if peak == 0:
+            return None
+        levels = numpy.log1p(cells) / numpy.log1p(peak)
+        rgba = COLORS[(levels * 255).astype(numpy.uint8)]
+        
+        image = Image.fromarray(rgba, 'RGBA').resize((width, height), Image.BILINEAR)
+        return image, (image_left, image_top)
+
+class HeatmapOverlay:
+    """Keeps a rendered DemandHeatmap image under the driver dots of a map view"""
+    
+    def __init__(self, map_widget, heatmap, frame_ms=None, refresh_ms=None):
+        self.map_widget = map_widget
+        self.canvas = map_widget.canvas
+        self.heatmap = heatmap
+        self.frame_ms = frame_ms or config.HEATMAP_FRAME_MS
+        self.refresh_ms = refresh_ms or config.HEATMAP_REFRESH_MS
+        
+        self.photo = None
+        self.item = None
+        # (zoom, area, version) the photo was rendered for, and where its corner is in tile coordinates
+        self.rendered = None
+        self.corner = None
+        
+        self.render_task = None
+        self.refresh_task = None
+        self.running = False
+        self.db = None
+    
+    def start(self):
+        if self.running:
+            return
+        
+        self.db = create_database_manager()
+        self.running = True
+        self._refresh()
+        self._frame()
+    
+    def stop(self):
+        self.running = False
+        for task in (self.render_task, self.refresh_task):
+            if task:
+                task.cancel()
+        self.canvas.delete("heatmap")
+        self.item = None
+    
+    def _refresh(self):
+        if not self.running:
+            return
+        
+        if not (self.refresh_task and self.refresh_task.running):
+            self.refresh_task = task_runner.submit(self.map_widget, self._load)
+        self.map_widget.after(self.refresh_ms, self._refresh)
+    
+    def _load(self):
+        """Runs on a worker thread; the connection goes back to the pool after each refresh"""
+        if not self.db.connect():
+            return 0
+        try:
+            return self.heatmap.refresh(self.db)
+        finally:
+            self.db.disconnect()
+    
+    def _frame(self):
+        if not self.running:
+            return
+        
+        try:
+            self._follow_view()
+        finally:
+            self.map_widget.after(self.frame_ms, self._frame)
+    
+    def _follow_view(self):
+        widget = self.map_widget
+        zoom = round(widget.zoom)
+        left, top = widget.upper_left_tile_pos
+        right, bottom = widget.lower_right_tile_pos
+        if right <= left:
+            return
+        
+        if self.rendered and self.rendered[0] == zoom and self.item:
+            scale = widget.width / (right - left)
+            self.canvas.coords(self.item, (self.corner[0] - left) * scale, (self.corner[1] - top) * scale)
+        
+        if self._covers(zoom, (left, top, right, bottom), self.heatmap.version):
+            return
+        if self.render_task and self.render_task.running:
+            return
+        
+        # Render the view plus one view size on every side
+        width, height = right - left, bottom - top
+        area = (left - width, top - height, right + width, bottom + height)
+        counts, version = self.heatmap.snapshot()
+        self.render_task = task_runner.submit(
+            widget, self.heatmap.render, counts, zoom, area, widget.tile_size,
+            on_success=lambda result: self._show(result, zoom, area, version)
+        )
+    
+    def _covers(self, zoom, view, version):
+        if not self.rendered:
+            return False
+        rendered_zoom, area, rendered_version = self.rendered
+        left, top, right, bottom = view
+        return (rendered_zoom == zoom and rendered_version == version and area[0] <= left
+                and area[1] <= top and right <= area[2] and bottom <= area[3])
+    
+    def _show(self, result, zoom, area, version):
+        """Runs on the Tk main thread with a rendered image"""
+        if not self.running:
+            return
+        
+        self.rendered = (zoom, area, version)
+        self.canvas.delete("heatmap")
+        self.item = None
+        if result is None:
+            return
+        
+        image, self.corner = result
+        self.photo = ImageTk.PhotoImage(image)
+        self.item = self.canvas.create_image(0, 0, image=self.photo, anchor="nw", tags="heatmap")
+        self.map_widget.manage_z_order()
+        self._follow_view()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate pickups into the demand heatmap grid")
+    parser.add_argument('--days', type=int, default=config.HEATMAP_WINDOW_DAYS)
+    parser.add_argument('--top', type=int, default=10, help="busiest cells to show")
+    args = parser.parse_args(argv)
+    
+    if numpy is None:
+        print("The demand heatmap needs numpy (pip install numpy)")
+        return 2
+    
+    from database_manager import db
+    if not db.connect():
+        print("Could not connect to the database")
+        return 2
+    
+    heatmap = DemandHeatmap(window_days=args.days)
+    started = time.perf_counter()
+    try:
+        read = heatmap.refresh(db)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    finally:
+        db.disconnect()
+    elapsed = time.perf_counter() - started
+    
+    print(f"Binned {heatmap.pickups} of {read} pickups from the last {args.days} days into "
+          f"{heatmap.rows}x{heatmap.columns} cells in {elapsed:.2f} s")
+    counts = heatmap.counts.ravel()
+    for cell in numpy.argsort(counts)[::-1][:args.top]:
+        if not counts[cell]:
+            break
+        row, column = divmod(int(cell), heatmap.columns)
+        print(f"  {heatmap.north - (row + 0.5) * heatmap.cell_deg:.4f}, "
+              f"{heatmap.west + (column + 0.5) * heatmap.cell_deg:.4f}: {counts[cell]} pickups")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
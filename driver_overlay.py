@@ -0,0 +1,232 @@
+# driver_overlay.py - Live Driver Positions on the Map
+#
+# Polls driver_locations for drivers written since the last poll and draws
+# each one as a small canvas dot on the map view, not as a TkinterMapView
+# marker (every marker is redrawn on every map move). Polls and staleness go by
+# updated_at, the database's time of the write: recorded_at is the phone's
+# clock, and a driver whose clock runs behind would never pass the watermark.
+#
+#     positions   merged from each poll; a position that moved under half a
+#                 pixel is not redrawn
+#     culling     only drivers inside the view (plus a margin) have a dot
+#     panning     one canvas.move of the "driver" tag, then a cull pass
+#     zooming     all dots dropped and redrawn from the positions
+#     budget      dots are created, moved and deleted from a pending set for
+#                 at most DRIVER_OVERLAY_BUDGET_MS per DRIVER_OVERLAY_FRAME_MS
+#                 frame; whatever is left waits for the next frame
+#
+# Drivers not written for DRIVER_OVERLAY_STALE_SECONDS are removed.
+
+import time
+from datetime import datetime, timedelta
+from tkintermapview.utility_functions import decimal_to_osm
+import config
+from database_manager import create_database_manager
+from task_runner import task_runner
+
+# Overlap between polls, so a flush that lands just after a poll is not missed
+POLL_OVERLAP_SECONDS = 5
+
+# Drivers this far outside the view keep their dot while panning
+CULL_MARGIN = 64
+
+class DriverOverlay:
+    """Draws live drivers on a map view, moving only the dots that changed"""
+    
+    def __init__(self, map_widget, frame_ms=None, budget_ms=None, poll_ms=None, stale_seconds=None):
+        self.map_widget = map_widget
+        self.canvas = map_widget.canvas
+        self.frame_ms = frame_ms or config.DRIVER_OVERLAY_FRAME_MS
+        self.budget = (budget_ms or config.DRIVER_OVERLAY_BUDGET_MS) / 1000
+        self.poll_ms = poll_ms or config.DRIVER_OVERLAY_POLL_MS
+        self.stale_seconds = stale_seconds or config.DRIVER_OVERLAY_STALE_SECONDS
+        self.radius = config.DRIVER_OVERLAY_DOT_RADIUS
+        
+        # driver_id -> (latitude, longitude, updated_at)
+        self.positions = {}
+        # driver_id -> (canvas item, tile x, tile y) of the dots on the canvas, at the view's zoom
+        self.dots = {}
+        self.pending = set()
+        # driver_id -> (tile x, tile y) of its position at the view's zoom
+        self.projected = {}
+        
+        self.view = None
+        self.since = None
+        self.latest = None
+        self.poll_task = None
+        self.running = False
+        
+        self.db = create_database_manager()
+        self.frames = 0
+        self.frame_seconds = 0.0
+    
+    def start(self):
+        if self.running:
+            return
+        
+        self.running = True
+        self.since = datetime.now() - timedelta(seconds=self.stale_seconds)
+        self.latest = None
+        self._poll()
+        self._frame()
+    
+    def stop(self):
+        self.running = False
+        if self.poll_task:
+            self.poll_task.cancel()
+        self.canvas.delete("driver")
+        self.dots = {}
+    
+    def _poll(self):
+        if not self.running:
+            return
+        
+        if not (self.poll_task and self.poll_task.running):
+            self.poll_task = task_runner.submit(self.map_widget, self._fetch, self.since,
+                                                on_success=self.update_positions)
+        self.map_widget.after(self.poll_ms, self._poll)
+    
+    def _fetch(self, since):
+        """Runs on a worker thread; the connection goes back to the pool after each poll"""
+        if not self.db.connect():
+            return None
+        
+        try:
+            return self.db.get_driver_locations(since)
+        finally:
+            self.db.disconnect()
+    
+    def update_positions(self, rows):
+        """Merge polled driver_locations rows and drop silent drivers"""
+        if rows is None:
+            return
+        
+        for row in rows:
+            updated_at = row['updated_at']
+            if isinstance(updated_at, str):
+                updated_at = datetime.fromisoformat(updated_at)
+            if self.latest is None or updated_at > self.latest:
+                self.latest = updated_at
+            
+            driver_id = row['driver_id']
+            old = self.positions.get(driver_id)
+            if old is not None and updated_at <= old[2]:
+                continue
+            
+            self.positions[driver_id] = (float(row['latitude']), float(row['longitude']), updated_at)
+            self.projected.pop(driver_id, None)
+            self.pending.add(driver_id)
+        
+        # The newest write seen less the overlap, never the previous since less it, which would creep back
+        if self.latest is not None:
+            self.since = self.latest - timedelta(seconds=POLL_OVERLAP_SECONDS)
+        
+        cutoff = datetime.now() - timedelta(seconds=self.stale_seconds)
+        for driver_id in [driver_id for driver_id, position in self.positions.items() if position[2] < cutoff]:
+            del self.positions[driver_id]
+            self.projected.pop(driver_id, None)
+            self.pending.add(driver_id)
+    
+    def _current_view(self):
+        widget = self.map_widget
+        zoom = round(widget.zoom)
+        upper_left = widget.upper_left_tile_pos
+        tile_width = widget.lower_right_tile_pos[0] - upper_left[0]
+        scale = widget.width / tile_width if tile_width else 0
+        return zoom, upper_left[0], upper_left[1], scale, widget.width, widget.height
+    
+    def _frame(self):
+        if not self.running:
+            return
+        
+        started = time.perf_counter()
+        try:
+            self._follow_view()
+            self._drain(started + self.budget)
+        finally:
+            self.frames += 1
+            self.frame_seconds += time.perf_counter() - started
+            self.map_widget.after(self.frame_ms, self._frame)
+    
+    def _follow_view(self):
+        """Keep the dots on the map after a pan or zoom"""
+        view = self._current_view()
+        if view == self.view:
+            return
+        
+        old, self.view = self.view, view
+        zoom, left, top, scale = view[:4]
+        if old is None or old[0] != zoom or not scale or abs(old[3] - scale) > scale * 1e-9:
+            self.canvas.delete("driver")
+            self.dots = {}
+            self.projected = {}
+            self.pending.update(self.positions)
+            return
+        
+        self.canvas.move("driver", (old[1] - left) * scale, (old[2] - top) * scale)
+        
+        # Cull: drivers whose visibility flipped with the pan
+        for driver_id in self.positions:
+            x, y, _, _ = self._to_canvas(driver_id)
+            if self._visible(x, y) != (driver_id in self.dots):
+                self.pending.add(driver_id)
+    
+    def _to_canvas(self, driver_id):
+        """(canvas x, canvas y, tile x, tile y) of a driver in the current view"""
+        zoom, left, top, scale = self.view[:4]
+        tile = self.projected.get(driver_id)
+        if tile is None:
+            latitude, longitude, _ = self.positions[driver_id]
+            tile = self.projected[driver_id] = decimal_to_osm(latitude, longitude, zoom)
+        tile_x, tile_y = tile
+        return (tile_x - left) * scale, (tile_y - top) * scale, tile_x, tile_y
+    
+    def _visible(self, x, y):
+        width, height = self.view[4:]
+        return -CULL_MARGIN <= x <= width + CULL_MARGIN and -CULL_MARGIN <= y <= height + CULL_MARGIN
+    
+    def _drain(self, deadline):
+        """Redraw pending drivers until the frame budget is spent"""
+        if not self.view or not self.view[3]:
+            return
+        
+        created = False
+        checked = 0
+        while self.pending:
+            checked += 1
+            if checked % 32 == 0 and time.perf_counter() >= deadline:
+                break
+            created = self._draw(self.pending.pop()) or created
+        
+        if created:
+            self.map_widget.manage_z_order()
+    
+    def _draw(self, driver_id):
+        """Create, move or delete one driver's dot, returns True if a dot was created"""
+        position = self.positions.get(driver_id)
+        dot = self.dots.get(driver_id)
+        
+        visible = False
+        if position is not None:
+            x, y, tile_x, tile_y = self._to_canvas(driver_id)
+            visible = self._visible(x, y)
+        
+        if not visible:
+            if dot:
+                self.canvas.delete(dot[0])
+                del self.dots[driver_id]
+            return False
+        
+        r = self.radius
+        if dot is None:
+            item = self.canvas.create_oval(x - r, y - r, x + r, y + r, fill="#1E88E5", outline="white", tags="driver")
+            self.dots[driver_id] = (item, tile_x, tile_y)
+            return True
+        
+        item, drawn_x, drawn_y = dot
+        scale = self.view[3]
+        if abs(tile_x - drawn_x) * scale < 0.5 and abs(tile_y - drawn_y) * scale < 0.5:
+            return False
+        self.canvas.coords(item, x - r, y - r, x + r, y + r)
+        self.dots[driver_id] = (item, tile_x, tile_y)
+        return False
@@ -0,0 +1,186 @@
+# eta_model.py - Trip ETAs from Historical Average Speeds
+#
+# Completed rides are bucketed by origin zone, destination zone (a grid of
+# ETA_ZONE_SIZE_DEG degree cells) and hour of the week of the trip start. The
+# eta_speeds table keeps trips, total km and total minutes per bucket, plus
+# rollups where the zone pair is ANY_ZONE and/or the hour is ANY_HOUR.
+# complete_ride adds each ride to its four rows as it completes, so an ETA is
+# at most four primary key lookups: the most specific bucket with at least
+# ETA_MIN_TRIPS trips gives the speed.
+#
+#     python eta_model.py --rebuild     # recompute eta_speeds from all completed rides
+
+import argparse
+import math
+import sys
+import time
+from datetime import datetime
+import config
+
+ANY_ZONE = -1
+ANY_HOUR = 168
+
+# Trips outside these bounds (no-shows, forgotten rides, GPS jumps) are not learned from
+MIN_TRIP_MINUTES = 1.0
+MAX_TRIP_MINUTES = 240.0
+MIN_SPEED_KMH = 3.0
+MAX_SPEED_KMH = 120.0
+
+def zone_of(latitude, longitude):
+    """Grid cell id of a point"""
+    size = config.ETA_ZONE_SIZE_DEG
+    row = math.floor((float(latitude) + 90.0) / size)
+    column = math.floor((float(longitude) + 180.0) / size)
+    return row * 100000 + column
+
+def hour_of_week(when):
+    """0 (Monday 00:00-00:59) to 167 (Sunday 23:00-23:59)"""
+    return when.weekday() * 24 + when.hour
+
+def as_datetime(value):
+    """MySQL returns datetimes, SQLite returns their text"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def trip_start(ride):
+    """When a ride set off: the pickup time of a reservation, else its booking time"""
+    return as_datetime(ride.get('pickup_time') or ride.get('booking_time'))
+
+def trip_sample(ride, end_time=None):
+    """((origin, dest, hour), km, minutes) of a completed ride, or None if it is an outlier"""
+    start_time = trip_start(ride)
+    end_time = as_datetime(end_time or ride['end_time'])
+    if not start_time or not end_time:
+        return None
+    
+    minutes = (end_time - start_time).total_seconds() / 60
+    km = float(ride['distance_km'])
+    if not MIN_TRIP_MINUTES <= minutes <= MAX_TRIP_MINUTES:
+        return None
+    if not MIN_SPEED_KMH <= km / (minutes / 60) <= MAX_SPEED_KMH:
+        return None
+    
+    key = (zone_of(ride['pickup_latitude'], ride['pickup_longitude']),
+           zone_of(ride['destination_latitude'], ride['destination_longitude']),
+           hour_of_week(start_time))
+    return key, km, minutes
+
+def bucket_keys(key):
+    """The four eta_speeds rows a trip counts towards, most specific first"""
+    origin, dest, hour = key
+    return [(origin, dest, hour), (origin, dest, ANY_HOUR), (ANY_ZONE, ANY_ZONE, hour), (ANY_ZONE, ANY_ZONE, ANY_HOUR)]
+
+class EtaModel:
+    """Answers ETA queries from eta_speeds, remembering recent bucket lookups
+    
+    A remembered speed is used for ETA_CACHE_TTL_SECONDS, so the trips that
+    complete_ride adds to eta_speeds reach the ETAs without a restart.
+    """
+    
+    def __init__(self, cache_size=4096, ttl_seconds=None):
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds or config.ETA_CACHE_TTL_SECONDS
+        # key -> (speed, monotonic time it expires)
+        self.speeds = {}
+    
+    def speed_kmh(self, db, origin, dest, when=None):
+        """Average speed for a trip between two points starting at `when`"""
+        key = (zone_of(*origin), zone_of(*dest), hour_of_week(when or datetime.now()))
+        now = time.monotonic()
+        cached = self.speeds.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+        
+        rows = db.get_eta_speeds(bucket_keys(key)) or []
+        found = {(row['origin_zone'], row['dest_zone'], row['hour_of_week']): row for row in rows}
+        
+        speed = config.ETA_DEFAULT_SPEED_KMH
+        for bucket in bucket_keys(key):
+            row = found.get(bucket)
+            if row and row['trips'] >= config.ETA_MIN_TRIPS and float(row['total_minutes']) > 0:
+                speed = float(row['total_km']) / (float(row['total_minutes']) / 60)
+                break
+        
+        if len(self.speeds) >= self.cache_size:
+            self.speeds.clear()
+        self.speeds[key] = (speed, now + self.ttl_seconds)
+        return speed
+    
+    def trip_minutes(self, db, origin, dest, distance_km, when=None):
+        return float(distance_km) / self.speed_kmh(db, origin, dest, when) * 60
+    
+    def pickup_minutes(self, db, pickup, when=None):
+        """Typical driver approach time: ETA_PICKUP_DISTANCE_KM within the pickup zone"""
+        return self.trip_minutes(db, pickup, pickup, config.ETA_PICKUP_DISTANCE_KM, when)
+    
+    def pickup_text(self, db, pickup, when=None):
+        """'4-7 minutes' style range around the approach time"""
+        minutes = self.pickup_minutes(db, pickup, when)
+        low = max(1, math.floor(minutes * 0.8))
+        high = max(low + 1, math.ceil(minutes * 1.25))
+        return f"{low}-{high} minutes"
+
+def rebuild(db, chunk_size=None):
+    """Recompute eta_speeds from every completed ride, returns the number of trips learned"""
+    chunk_size = chunk_size or config.ETA_REBUILD_CHUNK_SIZE
+    totals = {}
+    trips = 0
+    after_id = 0
+    
+    while True:
+        rides = db.get_completed_trips(after_id, chunk_size)
+        if rides is None:
+            return None
+        if not rides:
+            break
+        
+        for ride in rides:
+            sample = trip_sample(ride)
+            if sample:
+                key, km, minutes = sample
+                for bucket in bucket_keys(key):
+                    entry = totals.setdefault(bucket, [0, 0.0, 0.0])
+                    entry[0] += 1
+                    entry[1] += km
+                    entry[2] += minutes
+                trips += 1
+        after_id = rides[-1]['ride_id']
+    
+    rows = [(origin, dest, hour, count, round(km, 2), round(minutes, 1))
+            for (origin, dest, hour), (count, km, minutes) in totals.items()]
+    if not db.replace_eta_speeds(rows):
+        return None
+    return trips
+
+
+# Create global instance
+eta_model = EtaModel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the trip ETA speed table")
+    parser.add_argument('--rebuild', action='store_true', help="recompute eta_speeds from all completed rides")
+    args = parser.parse_args(argv)
+    
+    if not args.rebuild:
+        parser.print_help()
+        return 0
+    
+    from database_manager import db
+    if not db.connect():
+        print("Could not connect to the database")
+        return 2
+    
+    try:
+        trips = rebuild(db)
+    finally:
+        db.disconnect()
+    
+    if trips is None:
+        print("Rebuild failed")
+        return 1
+    print(f"Learned from {trips} completed rides")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
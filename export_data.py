@@ -0,0 +1,183 @@
+# export_data.py - Streaming Export of Rides and Wallet Transactions
+#
+# Pages through rides and/or wallet_transactions with DatabaseManager's
+# export methods, EXPORT_CHUNK_SIZE rows at a time in (date, id) keyset
+# order, and appends every page to a CSV file, or to a Parquet file as one
+# row group when pyarrow is installed. Only one page is held in memory.
+#
+#     python export_data.py --from 2026-09-01 --to 2026-09-30
+#     python export_data.py --table rides --format parquet --out exports/
+#
+# --from and --to are inclusive dates; leave either out for an open range.
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import config
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Column order and type of every exported table; the type picks the Parquet column type
+EXPORTS = {
+    'rides': ('export_rides', [
+        ('ride_id', 'int'), ('ride_code', 'text'), ('passenger_id', 'int'), ('driver_id', 'int'),
+        ('ride_type', 'text'), ('pickup_latitude', 'coordinate'), ('pickup_longitude', 'coordinate'),
+        ('pickup_address', 'text'), ('destination_latitude', 'coordinate'),
+        ('destination_longitude', 'coordinate'), ('destination_address', 'text'),
+        ('distance_km', 'money'), ('base_fare', 'money'), ('distance_fare', 'money'), ('final_fare', 'money'),
+        ('payment_method', 'text'), ('ride_status', 'text'), ('booking_time', 'datetime'),
+        ('end_time', 'datetime'), ('rating', 'int'), ('review_comment', 'text')
+    ]),
+    'wallet_transactions': ('export_wallet_transactions', [
+        ('transaction_id', 'int'), ('wallet_id', 'int'), ('user_id', 'int'), ('transaction_type', 'text'),
+        ('amount', 'money'), ('balance_before', 'money'), ('balance_after', 'money'),
+        ('description', 'text'), ('transaction_date', 'datetime')
+    ])
+}
+
+# Keyset columns of each export: (date column, id column)
+EXPORT_KEYS = {
+    'rides': ('booking_time', 'ride_id'),
+    'wallet_transactions': ('transaction_date', 'transaction_id')
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export rides and wallet transactions without loading them into memory")
+    parser.add_argument('--table', choices=['rides', 'wallet_transactions', 'all'], default='all')
+    parser.add_argument('--from', dest='start', type=parse_date, help="first day to export (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', type=parse_date, help="last day to export (YYYY-MM-DD)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--out', default=config.EXPORT_PATH, help="folder to write the files to")
+    parser.add_argument('--chunk-size', type=int, default=config.EXPORT_CHUNK_SIZE)
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default=config.DB_BACKEND)
+    return parser.parse_args(argv)
+
+def parse_date(text):
+    try:
+        return datetime.strptime(text, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a YYYY-MM-DD date")
+
+def to_datetime(value):
+    """MySQL returns datetimes, SQLite returns their text"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def to_decimal(value, places):
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-places))
+
+class CSVWriter:
+    """Appends pages to a CSV file"""
+    
+    def __init__(self, path, columns):
+        self.names = [name for name, _ in columns]
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.names)
+    
+    def write(self, rows):
+        self.writer.writerows([row[name] for name in self.names] for row in rows)
+    
+    def close(self):
+        self.file.close()
+
+class ParquetWriter:
+    """Appends pages to a Parquet file, one row group per page"""
+    
+    def __init__(self, path, columns):
+        types = {
+            'int': pyarrow.int64(),
+            'text': pyarrow.string(),
+            'money': pyarrow.decimal128(12, 2),
+            'coordinate': pyarrow.decimal128(9, 6),
+            'datetime': pyarrow.timestamp('s')
+        }
+        convert = {
+            'money': lambda value: to_decimal(value, 2),
+            'coordinate': lambda value: to_decimal(value, 6),
+            'datetime': to_datetime
+        }
+        
+        self.columns = [(name, convert.get(kind)) for name, kind in columns]
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+    
+    def write(self, rows):
+        arrays = {name: [convert(row[name]) if convert else row[name] for row in rows]
+                  for name, convert in self.columns}
+        self.writer.write_table(pyarrow.Table.from_pydict(arrays, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+def export_table(db, table, writer, start=None, end=None, chunk_size=None):
+    """Stream one table through writer page by page, returns the rows written"""
+    method, _ = EXPORTS[table]
+    date_column, id_column = EXPORT_KEYS[table]
+    
+    written = 0
+    after = None
+    while True:
+        rows = getattr(db, method)(after, start, end, chunk_size)
+        if rows is None:
+            raise RuntimeError(f"Reading {table} failed after {written} rows")
+        if not rows:
+            return written
+        
+        writer.write(rows)
+        written += len(rows)
+        after = (rows[-1][date_column], rows[-1][id_column])
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.format == 'parquet' and pyarrow is None:
+        print("Parquet export needs pyarrow (pip install pyarrow); use --format csv")
+        return 2
+    
+    # The backend has to be chosen before database_manager creates db
+    config.DB_BACKEND = args.backend
+    from database_manager import db
+    
+    end = args.end + timedelta(days=1) if args.end else None
+    suffix = "_".join(day.strftime('%Y%m%d') for day in (args.start, args.end) if day) or "all"
+    tables = list(EXPORTS) if args.table == 'all' else [args.table]
+    os.makedirs(args.out, exist_ok=True)
+    
+    if not db.connect():
+        print("Could not connect to the database")
+        return 2
+    
+    try:
+        for table in tables:
+            path = os.path.join(args.out, f"{table}_{suffix}.{args.format}")
+            writer_class = ParquetWriter if args.format == 'parquet' else CSVWriter
+            writer = writer_class(path, EXPORTS[table][1])
+            
+            started = time.perf_counter()
+            try:
+                written = export_table(db, table, writer, args.start, end, args.chunk_size)
+            finally:
+                writer.close()
+            
+            print(f"{table}: {written} rows to {path} in {time.perf_counter() - started:.1f} s")
+    except RuntimeError as e:
+        print(e)
+        return 1
+    finally:
+        db.disconnect()
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
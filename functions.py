@@ -4,6 +4,11 @@ from PIL import Image, ImageTk
 from tkinter import messagebox
 import config
 from database_manager import db
+from notification_outbox import outbox
+from eta_model import eta_model, as_datetime, trip_start
+from user_places import user_places
+from math import radians, sin, cos, sqrt, atan2
+from datetime import datetime, timedelta
 import re
 
 # IMAGE LOADING
@@ -80,32 +85,52 @@ def validate_password_strength(password):
 
 # AUTHENTICATION
 
-def validate_login(username, password):
-    """Validate login credentials"""
+def authenticate_login(username, password):
+    """Check login credentials, returns (success, message, session)"""
     if username == "Username:" or password == "Password:":
-        return False, "Please enter username and password"
+        return False, "Please enter username and password", None
     
     if db.connect():
         user = db.authenticate_user(username, password)
         db.disconnect()
         
         if user:
-            config.CURRENT_USER_ID = user['user_id']
-            config.CURRENT_USERNAME = user['username']
-            config.CURRENT_USER_TYPE = user['user_type']
-            config.CURRENT_USER_FULLNAME = user['full_name']
+            session = {
+                "user_id": user['user_id'],
+                "username": user['username'],
+                "user_type": user['user_type'],
+                "full_name": user['full_name']
+            }
             
-            return True, f"Welcome, {user['full_name']}!"
+            return True, f"Welcome, {user['full_name']}!", session
     
     if username == config.DEFAULT_USERNAME and password == config.DEFAULT_PASSWORD:
-        config.CURRENT_USER_ID = 1
-        config.CURRENT_USERNAME = "admin"
-        config.CURRENT_USER_TYPE = "admin"
-        config.CURRENT_USER_FULLNAME = "Administrator"
+        session = {
+            "user_id": 1,
+            "username": "admin",
+            "user_type": "admin",
+            "full_name": "Administrator"
+        }
         
-        return True, f"Welcome, {username}!"
+        return True, f"Welcome, {username}!", session
     
-    return False, "Invalid username or password"
+    return False, "Invalid username or password", None
+
+def start_session(session):
+    """Store the logged in user in the session settings"""
+    config.CURRENT_USER_ID = session['user_id']
+    config.CURRENT_USERNAME = session['username']
+    config.CURRENT_USER_TYPE = session['user_type']
+    config.CURRENT_USER_FULLNAME = session['full_name']
+
+def validate_login(username, password):
+    """Validate login credentials"""
+    success, message, session = authenticate_login(username, password)
+    
+    if success:
+        start_session(session)
+    
+    return success, message
 
 def validate_signup(fullname, email, password):
     """Validate signup form with password strength check"""
@@ -150,39 +175,70 @@ def create_rounded_rect_points(x1, y1, x2, y2, radius):
     ]
     return points
 
+# FARES
+
+def calculate_distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between two coordinates"""
+    R = 6371
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    a = sin((lat2-lat1)/2)**2 + cos(lat1)*cos(lat2)*sin((lon2-lon1)/2)**2
+    return R * 2 * atan2(sqrt(a), sqrt(1-a))
+
+def parse_pickup_time(text, now=None):
+    """Validate a typed reservation time (YYYY-MM-DD HH:MM), returns (datetime, error message)"""
+    now = now or datetime.now()
+    try:
+        pickup_time = datetime.strptime(text.strip(), "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None, "Enter the pickup time as YYYY-MM-DD HH:MM"
+    
+    if pickup_time < now + timedelta(minutes=config.RESERVATION_MIN_AHEAD_MINUTES):
+        return None, f"Reservations must be at least {config.RESERVATION_MIN_AHEAD_MINUTES} minutes ahead"
+    if pickup_time > now + timedelta(days=config.RESERVATION_MAX_AHEAD_DAYS):
+        return None, f"Reservations can be made up to {config.RESERVATION_MAX_AHEAD_DAYS} days ahead"
+    return pickup_time, None
+
+def calculate_fare(distance_km, ride_type):
+    """Fare for a 'sedan' or 'suv' ride: base fare plus 15 per km"""
+    base_fare = 40 if ride_type == "sedan" else 60
+    return base_fare + (distance_km * 15)
+
 # DATABASE FUNCTIONS
 
 def get_wallet_data():
-    """Get wallet data for current user"""
+    """Get wallet data for current user, None if it could not be loaded"""
     if not config.CURRENT_USER_ID:
-        return {"balance": 2000, "transactions": []}
+        return None
     
     if not db.connect():
-        return {"balance": 2000, "transactions": []}
+        return None
     
     try:
         balance = db.get_wallet_balance(config.CURRENT_USER_ID)
         transactions = db.get_transaction_history(config.CURRENT_USER_ID, 10)
+        db.disconnect()
+        
+        # A failed read is not an empty wallet; the screen keeps its cached copy
+        if balance is None or transactions is None:
+            return None
         
         formatted_transactions = []
-        if transactions:
-            for trans in transactions:
-                formatted_transactions.append({
-                    "type": trans['transaction_type'],
-                    "amount": float(trans['amount']),
-                    "by": "admin" if trans['transaction_type'] == 'deposit' else "user",
-                    "date": trans['date_display']
-                })
+        for trans in transactions:
+            formatted_transactions.append({
+                "type": trans['transaction_type'],
+                "amount": float(trans['amount']),
+                "by": "admin" if trans['transaction_type'] == 'deposit' else "user",
+                "date": trans['date_display']
+            })
         
-        db.disconnect()
         return {
-            "balance": float(balance) if balance else 2000,
+            "balance": float(balance),
             "transactions": formatted_transactions
         }
-        
+    
     except Exception:
         db.disconnect()
-        return {"balance": 2000, "transactions": []}
+        return None
 
 def add_wallet_funds_db(amount):
     """Add funds to user's wallet"""
@@ -197,83 +253,213 @@ def add_wallet_funds_db(amount):
         db.disconnect()
         
         if new_balance:
+            outbox.enqueue(
+                config.CURRENT_USER_ID, 'payment', "Wallet Top-up Successful",
+                f"₱{amount:.2f} has been added to your wallet"
+            )
             return True, f"Successfully added â‚±{amount:.2f} to your wallet!"
         else:
             return False, "Failed to add funds"
-            
+    
     except Exception as e:
         db.disconnect()
         return False, f"Error: {str(e)}"
 
+def ride_duration(ride, estimate=None):
+    """Actual duration of a finished ride, else the estimate callable's minutes prefixed with ~"""
+    start = trip_start(ride)
+    end = as_datetime(ride.get('end_time'))
+    if start and end:
+        return f"{max(1, round((end - start).total_seconds() / 60))} mins"
+    if estimate:
+        return f"~{max(1, round(estimate(ride)))} mins"
+    return "15 mins"
+
+def format_rides(rides, estimate=None):
+    """Reshape get_user_rides rows for MyRidesScreen"""
+    formatted_rides = []
+    if rides:
+        for ride in rides:
+            formatted_rides.append({
+                "id": ride['ride_code'],
+                "date": ride['date'],
+                "time": ride['time'],
+                "from": ride['pickup_address'],
+                "to": ride['destination_address'],
+                "distance": f"{ride['distance_km']:.1f} km",
+                "duration": ride_duration(ride, estimate),
+                "fare": float(ride['final_fare']),
+                "vehicle": ride['ride_type'].capitalize(),
+                "driver": "Juan Dela Cruz",
+                "rating": 5,
+                "status": ride['ride_status'].capitalize(),
+                "trip": {
+                    "pickup": (float(ride['pickup_latitude']), float(ride['pickup_longitude'])),
+                    "pickup_address": ride['pickup_address'],
+                    "destination": (float(ride['destination_latitude']), float(ride['destination_longitude'])),
+                    "destination_address": ride['destination_address'],
+                    "distance_km": float(ride['distance_km'])
+                }
+            })
+    
+    return formatted_rides
+
 def get_user_rides_db():
-    """Get user's ride history"""
+    """Get user's ride history, None if it could not be loaded"""
     if not config.CURRENT_USER_ID:
-        return []
+        return None
     
     if not db.connect():
-        return []
+        return None
     
     try:
         rides = db.get_user_rides(config.CURRENT_USER_ID)
-        db.disconnect()
+        if rides is None:
+            db.disconnect()
+            return None
         
-        formatted_rides = []
-        if rides:
-            for ride in rides:
-                formatted_rides.append({
-                    "id": ride['ride_code'],
-                    "date": ride['date'],
-                    "time": ride['time'],
-                    "from": ride['pickup_address'],
-                    "to": ride['destination_address'],
-                    "distance": f"{ride['distance_km']:.1f} km",
-                    "duration": "15 mins",
-                    "fare": float(ride['final_fare']),
-                    "vehicle": ride['ride_type'].capitalize(),
-                    "driver": "Juan Dela Cruz",
-                    "rating": 5,
-                    "status": ride['ride_status'].capitalize()
-                })
+        def estimate(ride):
+            return eta_model.trip_minutes(
+                db, (ride['pickup_latitude'], ride['pickup_longitude']),
+                (ride['destination_latitude'], ride['destination_longitude']),
+                ride['distance_km'], trip_start(ride)
+            )
+        
+        formatted_rides = format_rides(rides, estimate)
+        db.disconnect()
         
         return formatted_rides
+    
+    except Exception:
+        db.disconnect()
+        return None
+
+def get_user_places_db():
+    """The user's saved and frequent places, read once per session; None if they could not be loaded"""
+    if not config.CURRENT_USER_ID:
+        return None
+    
+    if user_places.loaded_for(config.CURRENT_USER_ID):
+        return user_places.places()
+    
+    if not db.connect():
+        return None
+    
+    try:
+        loaded = user_places.load(db, config.CURRENT_USER_ID)
+        db.disconnect()
         
+        return user_places.places() if loaded else None
+    
     except Exception:
         db.disconnect()
-        return []
+        return None
 
-def get_user_vouchers_db():
-    """Get user's active vouchers"""
+def save_place_db(label, address, coords):
+    """Save a place under a label for the current user"""
     if not config.CURRENT_USER_ID:
-        return []
+        return False, "No user logged in"
     
     if not db.connect():
-        return []
+        return False, "Database connection failed"
     
     try:
-        vouchers = db.get_user_vouchers(config.CURRENT_USER_ID)
+        saved = db.save_place(config.CURRENT_USER_ID, label, address, coords[0], coords[1])
         db.disconnect()
         
-        formatted_vouchers = []
-        if vouchers:
-            for voucher in vouchers:
-                discount_display = f"{voucher['discount_value']}%" if voucher['voucher_type'] == 'percentage' else f"â‚±{voucher['discount_value']}"
-                formatted_vouchers.append({
-                    "code": voucher['voucher_code'],
-                    "title": f"{discount_display} Discount",
-                    "description": voucher['description'],
-                    "discount": discount_display,
-                    "discount_value": float(voucher['discount_value']),
-                    "min_fare": float(voucher['min_fare']),
-                    "expiry": voucher['expiry'],
-                    "status": voucher['status'],
-                    "type": voucher['voucher_type']
-                })
+        if saved:
+            user_places.remember_saved(config.CURRENT_USER_ID, label, address, coords)
+            return True, f"Saved as {label}"
+        return False, "Failed to save place"
+    
+    except Exception as e:
+        db.disconnect()
+        return False, f"Error: {str(e)}"
+
+def get_user_stats_db():
+    """Get user's ride totals, None if they could not be loaded"""
+    if not config.CURRENT_USER_ID:
+        return None
+    
+    if not db.connect():
+        return None
+    
+    try:
+        stats = db.get_user_stats(config.CURRENT_USER_ID)
+        db.disconnect()
         
-        return formatted_vouchers
+        return format_user_stats(stats) if stats else None
+    
+    except Exception:
+        db.disconnect()
+        return None
+
+def format_user_stats(stats):
+    """One-line ride summary for MyRidesScreen"""
+    rides = stats['rides_completed']
+    return (f"{rides} {'ride' if rides == 1 else 'rides'}  •  ₱{float(stats['total_spent']):,.2f}"
+            f"  •  {float(stats['total_km']):,.1f} km")
+
+def format_vouchers(vouchers):
+    """Reshape get_user_vouchers rows for VoucherScreen"""
+    formatted_vouchers = []
+    if vouchers:
+        for voucher in vouchers:
+            discount_display = f"{voucher['discount_value']}%" if voucher['voucher_type'] == 'percentage' else f"â‚±{voucher['discount_value']}"
+            formatted_vouchers.append({
+                "code": voucher['voucher_code'],
+                "title": f"{discount_display} Discount",
+                "description": voucher['description'],
+                "discount": discount_display,
+                "discount_value": float(voucher['discount_value']),
+                "min_fare": float(voucher['min_fare']),
+                "expiry": voucher['expiry'],
+                "status": voucher['status'],
+                "type": voucher['voucher_type']
+            })
+    
+    return formatted_vouchers
+
+def get_user_vouchers_db():
+    """Get user's active vouchers, None if they could not be loaded"""
+    if not config.CURRENT_USER_ID:
+        return None
+    
+    if not db.connect():
+        return None
+    
+    try:
+        vouchers = db.get_user_vouchers(config.CURRENT_USER_ID)
+        db.disconnect()
         
+        if vouchers is None:
+            return None
+        return format_vouchers(vouchers)
+    
     except Exception:
         db.disconnect()
-        return []
+        return None
+
+def issue_voucher_campaign_db(voucher_code, segment='all', user_ids=None,
+                              last_login_since=None, on_progress=None):
+    """Issue a voucher to a whole user segment"""
+    if not db.connect():
+        return False, "Database connection failed"
+    
+    try:
+        issued = db.issue_voucher_campaign(
+            voucher_code, segment=segment, user_ids=user_ids,
+            last_login_since=last_login_since, on_progress=on_progress
+        )
+        db.disconnect()
+        
+        if issued is None:
+            return False, f"Could not issue voucher {voucher_code}"
+        return True, f"Voucher {voucher_code} issued to {issued} users"
+    
+    except Exception as e:
+        db.disconnect()
+        return False, f"Error: {str(e)}"
 
 # FEATURE HANDLERS
 
@@ -302,11 +488,11 @@ def open_car_booking_window(parent_window):
     except Exception as e:
         messagebox.showerror("QuickCab Error", f"Could not open Car Booking window!\n\nError: {e}")
 
-def open_map_window(parent_window):
-    """Open the QuickCab map booking system"""
+def open_map_window(parent_window, trip=None, pickup_time=None):
+    """Open the QuickCab map booking system, prefilled with a past trip's route if given"""
     try:
         from map_system import QuickCabMapSystem
-        QuickCabMapSystem(parent_window)
+        QuickCabMapSystem(parent_window, trip, pickup_time)
     except ImportError as e:
         messagebox.showerror("QuickCab Error", f"Could not import map_system.py!\n\nError: {e}")
     except Exception as e:
@@ -0,0 +1,285 @@
+# gps_ingest.py - Driver GPS Ping Ingestion
+#
+# Accepts driver pings as text lines
+#
+#     driver_id,latitude,longitude[,heading[,speed_kmh[,unix_time]]]
+#
+# from UDP datagrams (one or more lines each) or a replayed file. The latest
+# position of every driver and a ring buffer of its last GPS_TRACK_LENGTH
+# points are kept in memory; a flusher thread upserts the drivers that moved
+# into driver_locations every GPS_FLUSH_INTERVAL seconds, however many pings
+# arrived in between.
+#
+#     python gps_ingest.py --udp                          # listen on GPS_UDP_HOST:GPS_UDP_PORT
+#     python gps_ingest.py --replay pings.csv --realtime  # replay at the recorded pace
+#     python gps_ingest.py --generate pings.csv --drivers 2000 --pings 600000
+
+import argparse
+import atexit
+import random
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import config
+from database_manager import create_database_manager
+from load_generator import AREA
+
+# driver_locations column ranges: driver_id INT, speed_kmh DECIMAL(5, 1), and
+# recorded_at a DATETIME that datetime.fromtimestamp can produce
+MAX_DRIVER_ID = 2 ** 31 - 1
+MAX_SPEED_KMH = 9999.9
+MAX_RECORDED_AT = 253402300799.0  # 9999-12-31 23:59:59 UTC
+
+class GPSIngest:
+    """Latest position and recent track of every driver, flushed to the database in batches"""
+    
+    def __init__(self, flush_interval=None, track_length=None, batch_size=None):
+        self.flush_interval = flush_interval or config.GPS_FLUSH_INTERVAL
+        self.track_length = track_length or config.GPS_TRACK_LENGTH
+        self.batch_size = batch_size or config.GPS_FLUSH_BATCH_SIZE
+        
+        # driver_id -> (latitude, longitude, heading, speed_kmh, unix_time)
+        self.latest = {}
+        self.tracks = {}
+        self.dirty = set()
+        
+        self.accepted = 0
+        self.rejected = 0
+        self.stale = 0
+        self.written = 0
+        
+        self.db = create_database_manager()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """Start the background flusher thread"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="gps-flusher", daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self, timeout=5.0):
+        """Write the last positions and stop the flusher thread"""
+        if not self.thread:
+            return
+        
+        self.stopping.set()
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def _run(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+        self.db.disconnect()
+    
+    def _ingest(self, driver_id, latitude, longitude, heading, speed, recorded_at):
+        """Record one ping; the caller holds self.lock"""
+        if not (0 < driver_id <= MAX_DRIVER_ID and -90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0
+                and 0.0 <= recorded_at <= MAX_RECORDED_AT):
+            self.rejected += 1
+            return
+        
+        if heading is not None:
+            heading %= 360
+        if speed is not None and not 0.0 <= round(speed, 1) <= MAX_SPEED_KMH:
+            # A position with an impossible speed is still a position
+            speed = None
+        
+        latest = self.latest.get(driver_id)
+        if latest is not None and recorded_at < latest[4]:
+            # Datagrams can arrive out of order; an older point is not the latest
+            self.stale += 1
+            return
+        
+        point = (latitude, longitude, heading, speed, recorded_at)
+        self.latest[driver_id] = point
+        
+        track = self.tracks.get(driver_id)
+        if track is None:
+            track = self.tracks[driver_id] = deque(maxlen=self.track_length)
+        track.append(point)
+        
+        self.dirty.add(driver_id)
+        self.accepted += 1
+    
+    def ingest(self, driver_id, latitude, longitude, heading=None, speed=None, recorded_at=None):
+        with self.lock:
+            self._ingest(driver_id, latitude, longitude, heading, speed, recorded_at or time.time())
+    
+    def ingest_lines(self, lines):
+        """Parse and record ping lines, skipping malformed ones"""
+        now = time.time()
+        with self.lock:
+            for line in lines:
+                fields = line.split(',')
+                try:
+                    count = len(fields)
+                    self._ingest(
+                        int(fields[0]), float(fields[1]), float(fields[2]),
+                        int(fields[3]) if count > 3 and fields[3] else None,
+                        float(fields[4]) if count > 4 and fields[4] else None,
+                        float(fields[5]) if count > 5 and fields[5] else now
+                    )
+                except (ValueError, IndexError):
+                    if line.strip():
+                        self.rejected += 1
+    
+    def latest_position(self, driver_id):
+        """(latitude, longitude, heading, speed_kmh, unix_time) or None"""
+        return self.latest.get(driver_id)
+    
+    def recent_track(self, driver_id):
+        """The driver's last points, oldest first"""
+        with self.lock:
+            return list(self.tracks.get(driver_id, ()))
+    
+    def flush(self):
+        """Write the latest position of every driver that moved since the last flush"""
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            points = [(driver_id, self.latest[driver_id]) for driver_id in dirty]
+        
+        if not points:
+            return True
+        
+        rows = [(driver_id, round(lat, 6), round(lon, 6), heading,
+                 round(speed, 1) if speed is not None else None, datetime.fromtimestamp(recorded_at))
+                for driver_id, (lat, lon, heading, speed, recorded_at) in points]
+        
+        if not (self.db.connection and self.db.connection.is_connected()):
+            if not self.db.connect():
+                self._retry(dirty)
+                return False
+        
+        for start in range(0, len(rows), self.batch_size):
+            if not self.db.save_driver_locations(rows[start:start + self.batch_size]):
+                self.db.disconnect()
+                self._retry(dirty)
+                return False
+        
+        self.written += len(rows)
+        return True
+    
+    def _retry(self, driver_ids):
+        """Mark drivers dirty again so the next flush writes them"""
+        with self.lock:
+            self.dirty.update(driver_ids)
+    
+    def serve_udp(self, host=None, port=None):
+        """Receive ping datagrams until stop() is called"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        sock.bind((host or config.GPS_UDP_HOST, port or config.GPS_UDP_PORT))
+        sock.settimeout(0.5)
+        
+        try:
+            while not self.stopping.is_set():
+                try:
+                    data = sock.recv(65535)
+                except socket.timeout:
+                    continue
+                self.ingest_lines(data.decode('ascii', 'replace').splitlines())
+        finally:
+            sock.close()
+    
+    def replay(self, path, realtime=False, chunk_lines=5000):
+        """Ingest a ping file, at its recorded pace with realtime"""
+        started = time.time()
+        first_time = None
+        
+        with open(path, encoding='ascii') as f:
+            chunk = []
+            for line in f:
+                if realtime:
+                    fields = line.rstrip('\n').split(',')
+                    if len(fields) > 5 and fields[5]:
+                        recorded_at = float(fields[5])
+                        first_time = first_time or recorded_at
+                        wait = (recorded_at - first_time) - (time.time() - started)
+                        if wait > 0:
+                            self.ingest_lines(chunk)
+                            chunk = []
+                            time.sleep(wait)
+                
+                chunk.append(line.rstrip('\n'))
+                if len(chunk) >= chunk_lines:
+                    self.ingest_lines(chunk)
+                    chunk = []
+            
+            self.ingest_lines(chunk)
+
+def generate_pings(path, drivers, pings, area=AREA, rate=10000.0, seed=1):
+    """Write a synthetic ping file: drivers random-walking around Davao at `rate` pings/s"""
+    rng = random.Random(seed)
+    positions = [(rng.uniform(*area['lat']), rng.uniform(*area['lon']), rng.randrange(360)) for _ in range(drivers)]
+    now = time.time()
+    
+    with open(path, 'w', encoding='ascii') as f:
+        for index in range(pings):
+            driver = rng.randrange(drivers)
+            lat, lon, heading = positions[driver]
+            heading = (heading + rng.randint(-20, 20)) % 360
+            lat += rng.gauss(0, 0.0002)
+            lon += rng.gauss(0, 0.0002)
+            positions[driver] = (lat, lon, heading)
+            f.write(f"{driver + 1},{lat:.6f},{lon:.6f},{heading},{rng.uniform(0, 60):.1f},{now + index / rate:.3f}\n")
+
+
+# Create global instance
+gps_ingest = GPSIngest()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest driver GPS pings")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--udp', action='store_true', help="listen for ping datagrams")
+    source.add_argument('--replay', metavar='FILE', help="ingest a ping file")
+    source.add_argument('--generate', metavar='FILE', help="write a synthetic ping file and exit")
+    parser.add_argument('--realtime', action='store_true', help="replay at the pace of the recorded times")
+    parser.add_argument('--port', type=int, default=config.GPS_UDP_PORT)
+    parser.add_argument('--drivers', type=int, default=2000)
+    parser.add_argument('--pings', type=int, default=600000)
+    args = parser.parse_args(argv)
+    
+    if args.generate:
+        generate_pings(args.generate, args.drivers, args.pings)
+        print(f"Wrote {args.pings} pings from {args.drivers} drivers to {args.generate}")
+        return 0
+    
+    gps_ingest.start()
+    started = time.perf_counter()
+    
+    try:
+        if args.replay:
+            gps_ingest.replay(args.replay, realtime=args.realtime)
+        else:
+            receiver = threading.Thread(target=gps_ingest.serve_udp, kwargs={'port': args.port}, daemon=True)
+            receiver.start()
+            while receiver.is_alive():
+                receiver.join(5.0)
+                elapsed = time.perf_counter() - started
+                print(f"{gps_ingest.accepted} pings ({gps_ingest.accepted / elapsed:.0f}/s), "
+                      f"{len(gps_ingest.latest)} drivers, {gps_ingest.written} rows written")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingest_seconds = time.perf_counter() - started
+        gps_ingest.stop()
+    
+    print(f"Accepted {gps_ingest.accepted} pings in {ingest_seconds:.2f} s "
+          f"({gps_ingest.accepted / ingest_seconds:.0f}/s); rejected {gps_ingest.rejected}, "
+          f"out of order {gps_ingest.stale}; {len(gps_ingest.latest)} drivers, "
+          f"{gps_ingest.written} location rows written")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
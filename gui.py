@@ -5,6 +5,7 @@ from tkinter import Canvas, messagebox
 import config
 import functions
 from gui_components import UIComponents
+from task_runner import task_runner
 from menu_manager import MenuManager
 
 class QuickCabGUI:
@@ -19,6 +20,9 @@ class QuickCabGUI:
         
         self.current_page = 0
         self.home_icon_buttons = []
+        self.auth_task = None
+        self.signup_task = None
+        self.auth_status_text = None
         
         self.images, self.photo_images = functions.load_all_page_images()
         
@@ -82,6 +86,7 @@ class QuickCabGUI:
         
         self.components['username_entry'].bind("<Return>", lambda e: self.handle_login())
         self.components['password_entry'].bind("<Return>", lambda e: self.handle_login())
+        self.root.bind("<Escape>", lambda e: self.cancel_auth_task())
     
     def toggle_login_password(self):
         """Toggle login password visibility"""
@@ -121,6 +126,7 @@ class QuickCabGUI:
     
     def draw_page(self):
         """Draw the current page"""
+        self.cancel_auth_task()
         self.canvas.delete("all")
         self.hide_all_components()
         
@@ -265,13 +271,27 @@ class QuickCabGUI:
         self.draw_page()
     
     def handle_login(self):
-        """Handle login"""
+        """Handle login on a worker thread"""
+        if self.auth_running():
+            return
+        
         username = self.components['username_entry'].get()
         password = self.components['password_entry'].get()
         
-        success, message = functions.validate_login(username, password)
+        self.show_auth_loading("Signing in...  (Esc to cancel)", 607)
+        self.auth_task = task_runner.submit(
+            self.root, functions.authenticate_login, username, password,
+            on_success=self.on_login_result, on_error=self.on_auth_error
+        )
+    
+    def on_login_result(self, result):
+        """Finish login on the main thread"""
+        self.hide_auth_loading()
+        success, message, session = result
         
         if success:
+            functions.start_session(session)
+            
             from terms_popup import show_terms_popup
             
             def on_terms_accepted():
@@ -283,12 +303,28 @@ class QuickCabGUI:
             messagebox.showerror("Login Failed", message)
     
     def handle_signup_submit(self):
-        """Handle signup with password validation"""
+        """Handle signup with password validation on a worker thread
+        
+        A signup cannot be cancelled: the account may already be created, so
+        the buttons stay disabled until the request finishes.
+        """
+        if self.auth_running():
+            return
+        
         fullname = self.components['fullname_entry'].get()
         email = self.components['email_entry'].get()
         password = self.components['signup_password_entry'].get()
         
-        success, message = functions.validate_signup(fullname, email, password)
+        self.show_auth_loading("Creating account...", 534)
+        self.signup_task = task_runner.submit(
+            self.root, functions.validate_signup, fullname, email, password,
+            on_success=self.on_signup_result, on_error=self.on_auth_error
+        )
+    
+    def on_signup_result(self, result):
+        """Finish signup on the main thread"""
+        self.hide_auth_loading()
+        success, message = result
         
         if success:
             messagebox.showinfo("Sign Up Successful", message)
@@ -310,6 +346,35 @@ class QuickCabGUI:
         else:
             messagebox.showwarning("Sign Up Error", message)
     
+    def on_auth_error(self, error):
+        self.hide_auth_loading()
+        messagebox.showerror("QuickCab Error", f"Something went wrong. Please try again.\n\nError: {error}")
+    
+    def show_auth_loading(self, text, y):
+        """Disable the auth buttons and show a status line while a request runs"""
+        self.components['login_btn'].config(state="disabled")
+        self.components['signup_page_btn'].config(state="disabled")
+        self.auth_status_text = self.canvas.create_text(
+            214, y, text=text, font=("Arial", 11), fill=config.PRIMARY_COLOR
+        )
+    
+    def hide_auth_loading(self):
+        self.components['login_btn'].config(state="normal")
+        self.components['signup_page_btn'].config(state="normal")
+        if self.auth_status_text:
+            self.canvas.delete(self.auth_status_text)
+            self.auth_status_text = None
+    
+    def auth_running(self):
+        return any(task and task.running for task in (self.auth_task, self.signup_task))
+    
+    def cancel_auth_task(self):
+        """Abandon a running login request; a running signup is left to finish"""
+        if self.auth_task and self.auth_task.running:
+            self.auth_task.cancel()
+            self.hide_auth_loading()
+        self.auth_task = None
+    
     def handle_reset_password(self):
         """Handle password reset with validation"""
         email = self.components['reset_email_entry'].get()
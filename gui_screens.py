@@ -1,11 +1,14 @@
 # gui_screens.py - Enhanced GUI Screens
 
 import tkinter as tk
-from tkinter import Canvas, Scrollbar, messagebox
+from tkinter import Canvas, Scrollbar, messagebox, simpledialog
 from PIL import Image, ImageTk
 import os
+from datetime import datetime, timedelta
 import config
 from database_manager import db
+from notification_feed import feed
+from task_runner import task_runner
 
 class BaseInfoScreen:
     """Base class for enhanced info screens"""
@@ -197,8 +200,23 @@ class EditProfileDialog:
 class NotificationScreen(BaseInfoScreen):
     """Enhanced Notification Screen"""
     
+    NOTIFICATION_STYLES = {
+        'ride': ("🚕", "#10b981"),
+        'promo': ("🎉", "#f59e0b"),
+        'payment': ("💳", "#3D5AFE"),
+        'rating': ("⭐", "#8b5cf6"),
+    }
+    
     def __init__(self, root, menu_manager):
         super().__init__(root, menu_manager, "Notifications")
+        self.cards = []
+        self.empty_labels = []
+        self.poll_task = None
+        self.poll_job = None
+        self.mark_task = None
+        
+        # Closing the screen cancels the refresh, the next poll and a mark-read
+        self.window.bind("<Destroy>", self.on_destroy, add="+")
         self.setup_ui()
     
     def setup_ui(self):
@@ -209,50 +227,106 @@ class NotificationScreen(BaseInfoScreen):
         self.add_back_button()
         
         tk.Label(header, text="🔔 Notifications", font=("Arial", 22, "bold"),
-                bg="#D2D2DF", fg="black").pack(pady=45)
+                bg="#D2D2DF", fg="black").pack(pady=(45, 0))
         
-        content_frame = tk.Frame(self.window, bg="white")
-        content_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        self.unread_label = tk.Label(header, text="", font=("Arial", 10),
+                                     bg="#D2D2DF", fg="#666")
+        self.unread_label.pack()
         
-        notifications = [
-            {
-                "icon": "🚕",
-                "title": "Ride Completed",
-                "message": "Your ride to Makati has been completed successfully!",
-                "time": "5 mins ago",
-                "color": "#10b981"
-            },
-            {
-                "icon": "🎉",
-                "title": "New Promo Available",
-                "message": "Get 20% off on your next 3 rides. Check your vouchers!",
-                "time": "1 hour ago",
-                "color": "#f59e0b"
-            },
-            {
-                "icon": "💳",
-                "title": "Payment Successful",
-                "message": "₱250.00 has been charged to your wallet",
-                "time": "3 hours ago",
-                "color": "#3D5AFE"
-            },
-            {
-                "icon": "⭐",
-                "title": "Rate Your Driver",
-                "message": "How was your experience with Juan? Please rate your ride.",
-                "time": "1 day ago",
-                "color": "#8b5cf6"
-            }
-        ]
+        tk.Button(self.window, text="✓ Mark all as read", font=("Arial", 10, "bold"),
+                 bg="#F5F5F5", fg="#3D5AFE", border=0, cursor="hand2",
+                 activebackground="#F5F5F5", command=self.mark_all_read
+                 ).pack(anchor="e", padx=20, pady=(10, 0))
+        
+        self.content_frame = tk.Frame(self.window, bg="white")
+        self.content_frame.pack(fill="both", expand=True, padx=20, pady=(5, 20))
         
-        for notif in notifications:
-            self.create_notification_card(content_frame, notif)
+        for notif in reversed(feed.get_items(config.CURRENT_USER_ID)):
+            self.add_notification(notif)
         
-        if not notifications:
-            tk.Label(content_frame, text="🔭", font=("Arial", 48),
-                    bg="white", fg="#CCC").pack(pady=100)
-            tk.Label(content_frame, text="No notifications yet",
-                    font=("Arial", 16), bg="white", fg="#999").pack()
+        self.poll()
+    
+    def poll(self):
+        """Fetch only notifications newer than the last one shown"""
+        if not self.window.winfo_exists():
+            return
+        
+        self.poll_task = task_runner.submit(self.window, feed.refresh, config.CURRENT_USER_ID,
+                                            on_success=self.on_new_notifications)
+    
+    def on_new_notifications(self, new_items):
+        if not self.window.winfo_exists():
+            return
+        
+        for notif in reversed(new_items):
+            self.add_notification(notif)
+        
+        self.update_unread_label()
+        
+        if not self.cards and not self.empty_labels:
+            self.empty_labels = [
+                tk.Label(self.content_frame, text="🔭", font=("Arial", 48),
+                        bg="white", fg="#CCC"),
+                tk.Label(self.content_frame, text="No notifications yet",
+                        font=("Arial", 16), bg="white", fg="#999")
+            ]
+            self.empty_labels[0].pack(pady=(100, 0))
+            self.empty_labels[1].pack()
+        
+        self.poll_job = self.window.after(config.NOTIFICATION_POLL_INTERVAL_MS, self.poll)
+    
+    def on_destroy(self, event):
+        if event.widget is not self.window:
+            return
+        
+        for task in (self.poll_task, self.mark_task):
+            if task:
+                task.cancel()
+        if self.poll_job:
+            try:
+                self.window.after_cancel(self.poll_job)
+            except tk.TclError:
+                pass
+            self.poll_job = None
+    
+    def add_notification(self, notif):
+        """Add a notification card at the top of the list"""
+        for label in self.empty_labels:
+            label.destroy()
+        self.empty_labels = []
+        
+        icon, color = self.NOTIFICATION_STYLES.get(notif['notification_type'], ("🔔", "#6b7280"))
+        card = self.create_notification_card(self.content_frame, {
+            "icon": icon,
+            "title": notif['title'],
+            "message": notif['message'],
+            "time": notif['date_display'],
+            "color": color if not notif['is_read'] else "#DDDDDD"
+        })
+        
+        if self.cards:
+            card.pack_configure(before=self.cards[0])
+        self.cards.insert(0, card)
+        
+        while len(self.cards) > config.NOTIFICATION_FEED_LIMIT:
+            self.cards.pop().destroy()
+    
+    def update_unread_label(self):
+        unread = feed.unread_count(config.CURRENT_USER_ID)
+        self.unread_label.config(text=f"{unread} unread" if unread else "All caught up")
+    
+    def mark_all_read(self):
+        self.mark_task = task_runner.submit(self.window, feed.mark_all_read, config.CURRENT_USER_ID,
+                                            on_success=self.on_marked_read)
+    
+    def on_marked_read(self, success):
+        if not self.window.winfo_exists():
+            return
+        
+        if success:
+            for card in self.cards:
+                card.config(highlightbackground="#DDDDDD")
+            self.update_unread_label()
     
     def create_notification_card(self, parent, notif):
         card = tk.Frame(parent, bg="white", highlightbackground=notif['color'], 
@@ -280,6 +354,8 @@ class NotificationScreen(BaseInfoScreen):
         tk.Label(details, text=notif['message'], font=("Arial", 11),
                 bg="white", fg="#666", wraplength=300, anchor="w",
                 justify="left").pack(anchor="w", pady=(3, 0))
+        
+        return card
 
 
 class CarBookingFeature:
@@ -463,17 +539,25 @@ class CarBookingFeature:
                  command=lambda: self.reserve_taxi(vehicle['name'])).pack(side="right", padx=20, pady=(0, 20))
     
     def reserve_taxi(self, vehicle_name):
-        """Handle taxi reservation"""
-        messagebox.showinfo(
-            "Taxi Reservation", 
-            f"🚕 Reserving {vehicle_name}...\n\n"
-            "Next steps:\n"
-            "• Enter pickup location\n"
-            "• Enter destination\n"
-            "• Choose payment method\n"
-            "• Confirm booking\n\n"
-            "A driver will be assigned to you shortly!"
-        )
+        """Ask for a pickup time, then choose the route on the map"""
+        from functions import parse_pickup_time, open_map_window
+        
+        suggested = (datetime.now() + timedelta(minutes=90)).replace(minute=0, second=0, microsecond=0)
+        while True:
+            text = simpledialog.askstring(
+                "Reserve a Taxi",
+                f"🚕 {vehicle_name}\n\nPickup date and time (YYYY-MM-DD HH:MM):",
+                initialvalue=suggested.strftime("%Y-%m-%d %H:%M"), parent=self.window
+            )
+            if text is None:
+                return
+            
+            pickup_time, error = parse_pickup_time(text)
+            if pickup_time:
+                break
+            messagebox.showwarning("Reserve a Taxi", error, parent=self.window)
+        
+        open_map_window(self.window, pickup_time=pickup_time)
 
 
 class ImageScreen:
@@ -534,7 +618,7 @@ class ImageScreen:
                 )
                 back_btn.image = self.menu_manager.undo_btn_img
                 back_btn.place(x=10, y=20)
-            
+        
         except FileNotFoundError:
             messagebox.showerror("Error", f"Image file '{self.image_filename}' not found!")
             self.back_to_menu()
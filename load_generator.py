@@ -0,0 +1,243 @@
+# load_generator.py - Headless Rider Load Generator
+#
+# Simulates riders doing the booking sequence the GUI drives:
+#
+#     login -> fare quote -> validate voucher -> create ride -> pay from wallet -> ride history
+#
+# Riders arrive at --rate per second (poisson, uniform or burst arrivals) and
+# run on a pool of --workers threads, each step calling the same functions
+# and DatabaseManager methods as the screens. Reports throughput and latency
+# percentiles per step, plus the per-method query stats.
+#
+#     python load_generator.py --riders 5000 --rate 200 --backend sqlite --seed
+#     python load_generator.py --riders 2000 --rate 50 --arrival burst --json results.json
+#
+# --seed creates the rider accounts (loadrider1..N, wallets and voucher LOAD10)
+# first. Use it with the sqlite backend, or against a scratch MySQL database.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+
+RIDER_PASSWORD = "Loadtest1!"
+RIDER_BALANCE = 1000000
+VOUCHER_CODE = "LOAD10"
+
+# Pickups and destinations are drawn from this box around Davao City
+AREA = {'lat': (7.03, 7.13), 'lon': (125.55, 125.65)}
+
+# validate_voucher's message when the lookup itself failed, not the voucher
+VOUCHER_ERROR = "Error validating voucher"
+
+STEPS = ['login', 'fare_quote', 'validate_voucher', 'create_ride', 'deduct_wallet_funds', 'get_user_rides']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate riders booking through DatabaseManager")
+    parser.add_argument('--riders', type=int, default=1000, help="riders to simulate")
+    parser.add_argument('--rate', type=float, default=100.0, help="mean rider arrivals per second")
+    parser.add_argument('--arrival', choices=['poisson', 'uniform', 'burst'], default='poisson')
+    parser.add_argument('--burst-size', type=int, default=50, help="riders per burst with --arrival burst")
+    parser.add_argument('--workers', type=int, default=32, help="riders served concurrently")
+    parser.add_argument('--users', type=int, default=2000, help="distinct rider accounts to log in as")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default=config.DB_BACKEND)
+    parser.add_argument('--sqlite-path', help="SQLite file (default: a new temporary file)")
+    parser.add_argument('--seed', action='store_true', help="create rider accounts, wallets and the voucher first")
+    parser.add_argument('--random-seed', type=int, default=1)
+    parser.add_argument('--json', help="also write the results to this file")
+    return parser.parse_args(argv)
+
+def arrival_delays(args, rng):
+    """Seconds to wait before each rider arrives"""
+    for index in range(args.riders):
+        if args.arrival == 'poisson':
+            yield rng.expovariate(args.rate)
+        elif args.arrival == 'uniform':
+            yield 1.0 / args.rate
+        else:
+            # A whole burst arrives at once, bursts spaced to keep the mean rate
+            yield args.burst_size / args.rate if index % args.burst_size == 0 and index else 0.0
+
+def seed_riders(db, users):
+    """Create loadrider accounts with funded wallets and the LOAD10 voucher"""
+    if not db.connect():
+        raise RuntimeError("Could not connect to seed riders")
+    
+    password_hash = db._hash_password(RIDER_PASSWORD)
+    db.cursor.executemany(
+        "INSERT INTO users (username, email, password_hash, full_name) VALUES (%s, %s, %s, %s)",
+        [(f"loadrider{i}", f"loadrider{i}@example.com", password_hash, f"Load Rider {i}") for i in range(1, users + 1)]
+    )
+    db.cursor.execute(
+        "INSERT INTO wallet (user_id, balance) SELECT user_id, %s FROM users WHERE username LIKE 'loadrider%'",
+        (RIDER_BALANCE,)
+    )
+    db.cursor.execute(
+        "INSERT INTO vouchers (voucher_code, voucher_type, discount_value, min_fare, max_discount, usage_limit, expiry_date) "
+        "VALUES (%s, 'percentage', 10, 50, 50, 1000000, '2099-12-31')",
+        (VOUCHER_CODE,)
+    )
+    db.connection.commit()
+    
+    db.cursor.execute("SELECT user_id FROM users WHERE username LIKE 'loadrider%'")
+    user_ids = [row['user_id'] for row in db.cursor.fetchall()]
+    db.issue_voucher_campaign(VOUCHER_CODE, segment='ids', user_ids=user_ids)
+    db.disconnect()
+
+class LoadGenerator:
+    """Runs simulated riders and collects per-step latency"""
+    
+    def __init__(self, args, db, functions, step_stats):
+        self.args = args
+        self.db = db
+        self.functions = functions
+        self.step_stats = step_stats
+        self.completed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+    
+    def timed(self, step, func, *args, ok=lambda result: result is not None):
+        """Run one step and record its latency; ok(result) decides if it failed"""
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception:
+            result = None
+        self.step_stats.record(step, (time.perf_counter() - start) * 1000, errored=result is None or not ok(result))
+        return result
+    
+    def with_db(self, method, *args):
+        """Call a DatabaseManager method the way the screens do"""
+        if not self.db.connect():
+            return None
+        try:
+            return getattr(self.db, method)(*args)
+        finally:
+            self.db.disconnect()
+    
+    def rider(self, rider_number, arrived_at):
+        self.step_stats.record('queue_wait', (time.perf_counter() - arrived_at) * 1000)
+        rng = random.Random(self.args.random_seed * 1000003 + rider_number)
+        username = f"loadrider{rng.randint(1, self.args.users)}"
+        
+        ok = self.ride(rng, username)
+        self.step_stats.record('rider_total', (time.perf_counter() - arrived_at) * 1000, errored=not ok)
+        with self.lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+    
+    def ride(self, rng, username):
+        login = self.timed('login', self.functions.authenticate_login, username, RIDER_PASSWORD,
+                           ok=lambda result: result[0])
+        if not login or not login[0]:
+            return False
+        user_id = login[2]['user_id']
+        
+        pickup = (rng.uniform(*AREA['lat']), rng.uniform(*AREA['lon']))
+        destination = (rng.uniform(*AREA['lat']), rng.uniform(*AREA['lon']))
+        ride_type = rng.choice(['sedan', 'suv'])
+        
+        def fare_quote():
+            distance = self.functions.calculate_distance(*pickup, *destination)
+            return distance, self.functions.calculate_fare(distance, ride_type)
+        distance, fare = self.timed('fare_quote', fare_quote)
+        
+        # A rejected voucher is a normal outcome, only a failed call is an error
+        voucher = self.timed('validate_voucher', self.with_db, 'validate_voucher', VOUCHER_CODE, user_id, fare,
+                             ok=lambda result: result[1] != VOUCHER_ERROR)
+        discount = float(voucher[0]) if voucher and voucher[0] else 0.0
+        final_fare = round(fare - discount, 2)
+        
+        ride_code = self.timed('create_ride', self.with_db, 'create_ride', user_id, ride_type,
+                               pickup[0], pickup[1], "Load test pickup",
+                               destination[0], destination[1], "Load test destination",
+                               round(distance, 2), final_fare, 'wallet')
+        if not ride_code:
+            return False
+        
+        balance = self.timed('deduct_wallet_funds', self.with_db, 'deduct_wallet_funds', user_id, final_fare,
+                             f"Payment for ride {ride_code}")
+        if balance is None:
+            return False
+        
+        # An empty history right after booking is wrong, so count it as an error
+        rides = self.timed('get_user_rides', self.with_db, 'get_user_rides', user_id, ok=bool)
+        return bool(rides)
+    
+    def run(self):
+        rng = random.Random(self.args.random_seed)
+        start = time.perf_counter()
+        next_arrival = start
+        
+        with ThreadPoolExecutor(max_workers=self.args.workers) as executor:
+            for rider_number, delay in enumerate(arrival_delays(self.args, rng)):
+                next_arrival += delay
+                wait = next_arrival - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                executor.submit(self.rider, rider_number, time.perf_counter())
+        
+        return time.perf_counter() - start
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # The backend has to be chosen before database_manager creates db
+    config.DB_BACKEND = args.backend
+    if args.backend == 'sqlite':
+        config.SQLITE_PATH = args.sqlite_path or os.path.join(tempfile.mkdtemp(prefix="quickcab-load-"), "load.db")
+    
+    import functions
+    from database_manager import db
+    from query_stats import QueryStats, query_stats
+    
+    if args.seed:
+        try:
+            seed_riders(db, args.users)
+        except Exception as e:
+            print(f"Seeding failed: {e}")
+            return 2
+    
+    query_stats.reset()
+    step_stats = QueryStats(enabled=True, slow_query_ms=float('inf'))
+    generator = LoadGenerator(args, db, functions, step_stats)
+    elapsed = generator.run()
+    
+    steps = step_stats.snapshot()
+    print(f"{args.riders} riders ({args.arrival} arrivals at {args.rate:g}/s, {args.workers} workers, "
+          f"{args.backend} backend) in {elapsed:.1f} s")
+    print(f"Completed {generator.completed}, failed {generator.failed}, "
+          f"throughput {generator.completed / elapsed:.1f} rides/s\n")
+    print(f"{'step':<22}{'calls':>8}{'errors':>8}{'per s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step in STEPS + ['queue_wait', 'rider_total']:
+        s = steps.get(step)
+        if s:
+            print(f"{step:<22}{s['calls']:>8}{s['errors']:>8}{s['calls'] / elapsed:>9.1f}"
+                  f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}")
+    print("\nDatabaseManager methods:")
+    print(query_stats.report())
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'settings': vars(args),
+                'elapsed_s': round(elapsed, 3),
+                'completed': generator.completed,
+                'failed': generator.failed,
+                'rides_per_s': round(generator.completed / elapsed, 2),
+                'steps': steps,
+                'methods': query_stats.snapshot()
+            }, f, indent=2)
+    
+    return 0 if generator.completed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# local_cache.py - Per-User Local Cache of Screen Data
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import config
+
+class LocalCache:
+    """Keeps the last successful result of each screen query in a local SQLite file"""
+    
+    def __init__(self, path=None):
+        self.path = path or config.LOCAL_CACHE_PATH
+        self.connection = None
+        self.lock = threading.Lock()
+    
+    def _connect(self):
+        if self.connection is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS screen_cache (
+                    user_id INTEGER NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, cache_key)
+                )
+            """)
+        return self.connection
+    
+    def get(self, user_id, cache_key):
+        """Cached data for a user, or None"""
+        if not user_id:
+            return None
+        
+        try:
+            with self.lock:
+                row = self._connect().execute(
+                    "SELECT payload FROM screen_cache WHERE user_id = ? AND cache_key = ?",
+                    (user_id, cache_key)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+            
+        except (sqlite3.Error, OSError, ValueError):
+            return None
+    
+    def put(self, user_id, cache_key, data):
+        """Replace the cached data for a user; None (a failed load) never replaces it"""
+        if not user_id or data is None:
+            return
+        
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO screen_cache (user_id, cache_key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                    (user_id, cache_key, json.dumps(data), time.time())
+                )
+                connection.commit()
+                
+        except (sqlite3.Error, OSError, TypeError):
+            pass
+
+
+# Create global instance
+local_cache = LocalCache()
@@ -3,15 +3,35 @@
 import tkinter as tk
 from gui import QuickCabGUI
 from database_manager import db
+from notification_outbox import outbox
+from wallet_snapshotter import snapshotter
+from ride_scheduler import scheduler
+from task_runner import task_runner
+from query_stats import query_stats
+import config
 
 def main():
     """Start the QuickCab application"""
     if db.connect():
         db.disconnect()
     
+    outbox.start()
+    if config.WALLET_LEDGER_MODE:
+        snapshotter.start()
+    if config.RIDE_SCHEDULER_ENABLED:
+        scheduler.start()
+    
     root = tk.Tk()
     app = QuickCabGUI(root)
     root.mainloop()
+    
+    task_runner.shutdown()
+    scheduler.stop()
+    outbox.stop()
+    snapshotter.stop()
+    
+    if config.QUERY_STATS_ENABLED and config.QUERY_STATS_PATH:
+        query_stats.dump()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,18 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, simpledialog
 import tkintermapview
-from math import radians, sin, cos, sqrt, atan2
 import requests
 import threading
 from PIL import Image, ImageTk
+import io
 import os
+import config
+import functions
+from demand_heatmap import DemandHeatmap, HeatmapOverlay, numpy
+from driver_overlay import DriverOverlay
+from place_search import place_search
+from task_runner import task_runner
+from tile_cache import tile_cache
 
 
 class RoundedButton(tk.Canvas):
@@ -36,8 +43,40 @@ class RoundedButton(tk.Canvas):
             self.command()
 
 
+class CachedMapView(tkintermapview.TkinterMapView):
+    """TkinterMapView that reads tiles through the disk tile cache"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tile_server = tile_cache.server
+    
+    def request_image(self, zoom, x, y, db_cursor=None):
+        data = tile_cache.fetch(zoom, x, y)
+        if data is None:
+            # Offline and not cached; left out of the memory cache so it is retried
+            return self.empty_tile_image
+        
+        try:
+            image = Image.open(io.BytesIO(data))
+            if not self.running:
+                return self.empty_tile_image
+            image_tk = ImageTk.PhotoImage(image)
+        except Exception:
+            image_tk = self.empty_tile_image
+        
+        self.tile_image_cache[f"{zoom}{x}{y}"] = image_tk
+        return image_tk
+    
+    def manage_z_order(self):
+        # The heatmap and driver dots sit above the tiles and below the route and markers
+        self.canvas.lift("heatmap")
+        self.canvas.lift("driver")
+        super().manage_z_order()
+
+
 class RideSelectionPopup:
-    def __init__(self, parent, distance, pickup_coords, destination_coords, on_book):
+    def __init__(self, parent, distance, pickup_coords, destination_coords, on_book,
+                 pickup_address=None, destination_address=None):
         self.parent = parent
         self.distance = distance
         self.pickup_coords = pickup_coords
@@ -46,8 +85,11 @@ class RideSelectionPopup:
         self.selected_ride = None
         self.is_closing = False
         
-        self.pickup_address = "Loading..."
-        self.destination_address = "Loading..."
+        # Addresses the map already knows (searched or saved places) are not looked up again
+        self.known_pickup = pickup_address
+        self.known_destination = destination_address
+        self.pickup_address = pickup_address or "Loading..."
+        self.destination_address = destination_address or "Loading..."
         
         self.window_width = 428
         self.window_height = 926
@@ -68,7 +110,8 @@ class RideSelectionPopup:
         popup_y = self.window_height - self.popup_height
         self.popup.place(x=0, y=popup_y, width=self.window_width, height=self.popup_height)
         
-        self.fetch_addresses_async()
+        if not (pickup_address and destination_address):
+            self.fetch_addresses_async()
     
     def load_images(self):
         self.sedan_icon = None
@@ -128,8 +171,8 @@ class RideSelectionPopup:
     def fetch_addresses_async(self):
         def task():
             try:
-                pickup = self.reverse_geocode(*self.pickup_coords)
-                destination = self.reverse_geocode(*self.destination_coords)
+                pickup = self.known_pickup or self.reverse_geocode(*self.pickup_coords)
+                destination = self.known_destination or self.reverse_geocode(*self.destination_coords)
                 
                 self.popup.after(0, lambda: self.update_addresses(pickup, destination))
             except Exception as e:
@@ -216,8 +259,7 @@ class RideSelectionPopup:
         fare = self.calculate_fare(ride_type.lower())
     
     def calculate_fare(self, ride_type):
-        base_fare = 40 if ride_type == "sedan" else 60
-        return base_fare + (self.distance * 15)
+        return functions.calculate_fare(self.distance, ride_type)
     
     def book_ride(self):
         if not self.selected_ride:
@@ -239,14 +281,17 @@ class RideSelectionPopup:
 
 
 class QuickCabMapSystem:
-    def __init__(self, parent_window):
+    def __init__(self, parent_window, trip=None, pickup_time=None):
         self.parent_window = parent_window
+        self.pickup_time = pickup_time
         self.davao_center = (7.0731, 125.6128)
 
         self.pickup_marker = None
         self.destination_marker = None
         self.pickup_coords = None
         self.destination_coords = None
+        self.pickup_name = None
+        self.destination_name = None
         self.route_path = None
         self.current_mode = "pickup"
         self.distance = 0
@@ -272,6 +317,20 @@ class QuickCabMapSystem:
         self.setup_location_display()
         self.setup_map()
         self.setup_bottom_controls()
+        
+        self.heatmap_overlay = None
+        if config.HEATMAP_ENABLED and numpy is not None and config.CURRENT_USER_TYPE == 'admin':
+            self.heatmap_overlay = HeatmapOverlay(self.map_widget, DemandHeatmap())
+            self.heatmap_overlay.start()
+        
+        self.driver_overlay = None
+        if config.DRIVER_OVERLAY_ENABLED and config.CURRENT_USER_TYPE == 'admin':
+            self.driver_overlay = DriverOverlay(self.map_widget)
+            self.driver_overlay.start()
+        
+        if trip:
+            self.prefill_trip(trip)
+        task_runner.submit(self.root, functions.get_user_places_db, on_success=self.show_place_buttons)
 
         self.root.protocol("WM_DELETE_WINDOW", self.go_back)
     
@@ -301,7 +360,13 @@ class QuickCabMapSystem:
             frame, text="Map",
             bg="#D2D2DF", fg="black",
             font=("Arial", 20, "bold")
-        ).place(x=214, y=60, anchor="center")
+        ).place(x=214, y=60 if not self.pickup_time else 48, anchor="center")
+        
+        if self.pickup_time:
+            tk.Label(
+                frame, text=f"Reservation for {self.pickup_time.strftime('%b %d, %I:%M %p')}",
+                bg="#D2D2DF", fg="#1e40af", font=("Arial", 11)
+            ).place(x=214, y=80, anchor="center")
         
         # Add undo button at top-left - placed on root window to overlay header
         if self.undo_btn_img:
@@ -326,6 +391,139 @@ class QuickCabMapSystem:
 
         self.pickup_label = self.create_location_box(frame, "●", "#3b82f6", "Current Location")
         self.destination_label = self.create_location_box(frame, "●", "#111111", "Enter Destination")
+        self.setup_destination_search(frame)
+        
+        self.place_bar = tk.Frame(frame, bg="white")
+        self.place_bar.pack(fill="x", padx=15, pady=(0, 10))
+    
+    def show_place_buttons(self, places):
+        """One-tap destinations from the user's saved and frequent places"""
+        for widget in self.place_bar.winfo_children():
+            widget.destroy()
+        
+        for place in places or []:
+            icon = "★" if place['saved'] else "↺"
+            tk.Button(
+                self.place_bar, text=f"{icon} {place['label']}", font=("Arial", 10),
+                bg="#eef2ff", fg="#1e40af", activebackground="#dbe4ff", border=0, relief="flat",
+                cursor="hand2", command=lambda place=place: self.choose_place(place)
+            ).pack(side="left", padx=(0, 6), ipadx=6, ipady=3)
+        
+        tk.Button(
+            self.place_bar, text="☆ Save", font=("Arial", 10),
+            bg="white", fg="#666", activebackground="#f5f5f5", border=0, relief="flat",
+            cursor="hand2", command=self.save_destination
+        ).pack(side="right", ipadx=6, ipady=3)
+    
+    def choose_place(self, place):
+        coords = (place['latitude'], place['longitude'])
+        self.hide_suggestions()
+        self.set_destination(coords, place['address'])
+        self.map_widget.set_position(*coords)
+        self.update_location_displays()
+    
+    def save_destination(self):
+        if not self.destination_coords:
+            messagebox.showwarning("Save Place", "Choose a destination to save first")
+            return
+        
+        label = simpledialog.askstring("Save Place", "Name this place (e.g. Home, Work):", parent=self.root)
+        if not label or not label.strip():
+            return
+        
+        address = self.destination_name or self.destination_label.cget("text")
+        success, message = functions.save_place_db(label.strip()[:50], address, self.destination_coords)
+        if success:
+            self.show_place_buttons(functions.get_user_places_db())
+        else:
+            messagebox.showerror("Save Place", message)
+    
+    def setup_destination_search(self, parent):
+        """Typed destination search with suggestions from the local place index"""
+        self.search_placeholder = "🔍 Search destination"
+        self.search_after_id = None
+        self.suggestions = []
+        
+        self.search_entry = tk.Entry(
+            parent, font=("Arial", 12), fg="#999", bg="#f5f5f5", relief="flat",
+            highlightbackground="#ddd", highlightthickness=1
+        )
+        self.search_entry.insert(0, self.search_placeholder)
+        self.search_entry.pack(fill="x", padx=15, pady=(0, 10), ipady=8)
+        
+        self.suggestion_list = tk.Listbox(
+            self.root, font=("Arial", 11), activestyle="none", relief="flat",
+            highlightbackground="#ddd", highlightthickness=1, selectbackground="#3b82f6"
+        )
+        
+        self.search_entry.bind("<FocusIn>", self.on_search_focus)
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        self.search_entry.bind("<Down>", self.focus_suggestions)
+        self.search_entry.bind("<Return>", lambda e: self.select_suggestion(0))
+        self.search_entry.bind("<Escape>", lambda e: self.hide_suggestions())
+        self.suggestion_list.bind("<ButtonRelease-1>", self.on_suggestion_click)
+        self.suggestion_list.bind("<Return>", self.on_suggestion_click)
+        self.suggestion_list.bind("<Escape>", lambda e: self.hide_suggestions())
+    
+    def on_search_focus(self, event):
+        if self.search_entry.get() == self.search_placeholder:
+            self.search_entry.delete(0, "end")
+            self.search_entry.config(fg="#111")
+    
+    def on_search_key(self, event):
+        if event.keysym in ("Down", "Up", "Return", "Escape"):
+            return
+        
+        # Look up once typing pauses, not on every keystroke
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(config.PLACE_SEARCH_DEBOUNCE_MS, self.show_suggestions)
+    
+    def show_suggestions(self):
+        self.search_after_id = None
+        self.suggestions = place_search.search(self.search_entry.get())
+        if not self.suggestions:
+            self.hide_suggestions()
+            return
+        
+        self.suggestion_list.delete(0, "end")
+        for place in self.suggestions:
+            self.suggestion_list.insert("end", f"  {place['name']}")
+        self.suggestion_list.config(height=len(self.suggestions))
+        self.suggestion_list.place(in_=self.search_entry, relx=0, rely=1, relwidth=1)
+        self.suggestion_list.lift()
+    
+    def hide_suggestions(self):
+        self.suggestion_list.place_forget()
+    
+    def focus_suggestions(self, event):
+        if self.suggestions:
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, "end")
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+    
+    def on_suggestion_click(self, event):
+        selection = self.suggestion_list.curselection()
+        if selection:
+            self.select_suggestion(selection[0])
+    
+    def select_suggestion(self, index):
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+            self.show_suggestions()
+        if index >= len(self.suggestions):
+            return
+        
+        place = self.suggestions[index]
+        self.hide_suggestions()
+        self.search_entry.delete(0, "end")
+        self.search_entry.insert(0, place['name'])
+        self.root.focus_set()
+        
+        self.set_destination((place['latitude'], place['longitude']), place['name'])
+        self.map_widget.set_position(place['latitude'], place['longitude'])
+        self.update_location_displays()
 
     def create_location_box(self, parent, icon, color, text):
         box = tk.Frame(parent, bg="#f5f5f5", highlightbackground="#ddd", highlightthickness=1)
@@ -342,7 +540,7 @@ class QuickCabMapSystem:
         return label
 
     def setup_map(self):
-        self.map_widget = tkintermapview.TkinterMapView(self.root, corner_radius=0)
+        self.map_widget = CachedMapView(self.root, corner_radius=0)
         self.map_widget.pack(fill="both", expand=True)
 
         self.map_widget.set_position(*self.davao_center)
@@ -411,10 +609,7 @@ class QuickCabMapSystem:
             confirm_btn.pack(side="left", padx=5)
 
     def calculate_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        a = sin((lat2-lat1)/2)**2 + cos(lat1)*cos(lat2)*sin((lon2-lon1)/2)**2
-        return R * 2 * atan2(sqrt(a), sqrt(1-a))
+        return functions.calculate_distance(lat1, lon1, lat2, lon2)
 
     def reverse_geocode(self, lat, lon):
         try:
@@ -446,54 +641,84 @@ class QuickCabMapSystem:
         threading.Thread(target=task, daemon=True).start()
 
     def update_location_displays(self):
-        if self.pickup_coords:
+        if self.pickup_name:
+            self.pickup_label.config(text=self.pickup_name, fg="#111")
+        elif self.pickup_coords:
             self.update_label_async(self.pickup_label, *self.pickup_coords)
         else:
             self.pickup_label.config(text="Current Location", fg="#666")
 
-        if self.destination_coords:
+        if self.destination_name:
+            self.destination_label.config(text=self.destination_name, fg="#111")
+        elif self.destination_coords:
             self.update_label_async(self.destination_label, *self.destination_coords)
         else:
             self.destination_label.config(text="Enter Destination", fg="#666")
 
     def map_click(self, coords):
+        self.hide_suggestions()
+        
         if self.active_popup and not self.active_popup.is_closing:
             self.active_popup.close()
             self.active_popup = None
             return
         
         if self.current_mode == "pickup":
-            if self.pickup_marker:
-                self.pickup_marker.delete()
-
-            self.pickup_marker = self.map_widget.set_marker(
-                coords[0], coords[1], text="Pickup",
-                marker_color_circle="green", marker_color_outside="darkgreen"
-            )
-            self.pickup_coords = coords
-            self.current_mode = "destination"
-
+            self.set_pickup(coords)
+        
         else:
-            if self.destination_marker:
-                self.destination_marker.delete()
-
-            self.destination_marker = self.map_widget.set_marker(
-                coords[0], coords[1], text="Destination",
-                marker_color_circle="red", marker_color_outside="darkred"
-            )
-            self.destination_coords = coords
-
-            if self.route_path:
-                self.map_widget.delete(self.route_path)
+            self.set_destination(coords)
+        
+        self.update_location_displays()
+    
+    def set_pickup(self, coords, name=None):
+        """Place the pickup marker; name skips the reverse geocode (a past trip's address)"""
+        if self.pickup_marker:
+            self.pickup_marker.delete()
+
+        self.pickup_marker = self.map_widget.set_marker(
+            coords[0], coords[1], text="Pickup",
+            marker_color_circle="green", marker_color_outside="darkgreen"
+        )
+        self.pickup_coords = coords
+        self.pickup_name = name
+        self.current_mode = "destination"
+        self.draw_route()
+
+    def set_destination(self, coords, name=None, distance_km=None):
+        """Place the destination marker; name skips the reverse geocode (a searched or saved place)"""
+        if self.destination_marker:
+            self.destination_marker.delete()
+
+        self.destination_marker = self.map_widget.set_marker(
+            coords[0], coords[1], text="Destination",
+            marker_color_circle="red", marker_color_outside="darkred"
+        )
+        self.destination_coords = coords
+        self.destination_name = name
+        self.draw_route(distance_km)
+    
+    def prefill_trip(self, trip):
+        """Show a past trip's route with its stored addresses and distance (Book Again)"""
+        pickup, destination = tuple(trip['pickup']), tuple(trip['destination'])
+        self.set_pickup(pickup, trip.get('pickup_address'))
+        self.set_destination(destination, trip.get('destination_address'), trip.get('distance_km'))
+        self.map_widget.set_position((pickup[0] + destination[0]) / 2, (pickup[1] + destination[1]) / 2)
+        self.update_location_displays()
+    
+    def draw_route(self, distance_km=None):
+        if not (self.pickup_coords and self.destination_coords):
+            return
 
-            self.route_path = self.map_widget.set_path(
-                [self.pickup_coords, self.destination_coords],
-                color="#3b82f6", width=4
-            )
+        if self.route_path:
+            self.map_widget.delete(self.route_path)
 
-            self.distance = self.calculate_distance(*self.pickup_coords, *self.destination_coords)
+        self.route_path = self.map_widget.set_path(
+            [self.pickup_coords, self.destination_coords],
+            color="#3b82f6", width=4
+        )
 
-        self.update_location_displays()
+        self.distance = distance_km or self.calculate_distance(*self.pickup_coords, *self.destination_coords)
 
     def clear_all(self):
         for obj in [self.pickup_marker, self.destination_marker, self.route_path]:
@@ -502,7 +727,12 @@ class QuickCabMapSystem:
 
         self.pickup_marker = self.destination_marker = self.route_path = None
         self.pickup_coords = self.destination_coords = None
+        self.pickup_name = self.destination_name = None
         self.current_mode = "pickup"
+        self.hide_suggestions()
+        self.search_entry.delete(0, "end")
+        self.search_entry.insert(0, self.search_placeholder)
+        self.search_entry.config(fg="#999")
         self.update_location_displays()
 
     def confirm_booking(self):
@@ -515,7 +745,9 @@ class QuickCabMapSystem:
             self.distance,
             self.pickup_coords,
             self.destination_coords,
-            self.on_booking_confirmed
+            self.on_booking_confirmed,
+            self.pickup_name,
+            self.destination_name
         )
 
     def on_booking_confirmed(self, ride_type, fare, pickup_address, destination_address):
@@ -528,7 +760,10 @@ class QuickCabMapSystem:
                 fare=fare,
                 pickup_address=pickup_address,
                 destination_address=destination_address,
-                distance=self.distance
+                distance=self.distance,
+                pickup_coords=self.pickup_coords,
+                destination_coords=self.destination_coords,
+                pickup_time=self.pickup_time
             )
             
         except ImportError as e:
@@ -540,6 +775,10 @@ class QuickCabMapSystem:
             messagebox.showerror("Payment Error", f"Could not open payment screen!\n\nError: {e}")
 
     def go_back(self):
+        if self.heatmap_overlay:
+            self.heatmap_overlay.stop()
+        if self.driver_overlay:
+            self.driver_overlay.stop()
         self.parent_window.deiconify()
         self.root.destroy()
 
@@ -5,6 +5,8 @@ from tkinter import messagebox
 from PIL import Image, ImageTk
 import os
 import config
+from notification_feed import feed
+from user_places import user_places
 
 class MenuManager:
     """Handles the side menu and info screens"""
@@ -225,6 +227,9 @@ class MenuManager:
             
             self.close()
             
+            feed.forget(config.CURRENT_USER_ID)
+            user_places.clear()
+            
             config.CURRENT_USER_ID = None
             config.CURRENT_USERNAME = None
             config.CURRENT_USER_TYPE = None
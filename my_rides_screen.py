@@ -2,7 +2,9 @@ import tkinter as tk
 from tkinter import Canvas, messagebox, Scrollbar
 from PIL import Image, ImageTk
 import os
-from functions import get_user_rides_db
+from functions import get_user_rides_db, get_user_stats_db, open_map_window
+from screen_loader import ScreenDataLoader
+from task_runner import task_runner
 import config
 
 class MyRidesScreen:
@@ -12,53 +14,7 @@ class MyRidesScreen:
         self.window_width = 428
         self.window_height = 926
         
-        self.rides = get_user_rides_db()
-        
-        if not self.rides:
-            self.rides = [
-                {
-                    "id": "QC-2024-001",
-                    "date": "02/05/2022",
-                    "time": "02:30 PM",
-                    "from": "M.Roxas Ave cor C.M Recto Ave, Davao City",
-                    "to": "DPT Bldg, Ma-A Talomo, Davao City",
-                    "distance": "5.2 km",
-                    "duration": "15 mins",
-                    "fare": 250,
-                    "vehicle": "Sedan",
-                    "driver": "Juan Dela Cruz",
-                    "rating": 5,
-                    "status": "Completed"
-                },
-                {
-                    "id": "QC-2024-002",
-                    "date": "08/05/2022",
-                    "time": "09:15 AM",
-                    "from": "M.Roxas Ave cor C.M Recto Ave, Davao City",
-                    "to": "MacArthur Hwy, Matina Crossing Talomo, Davao City",
-                    "distance": "3.8 km",
-                    "duration": "12 mins",
-                    "fare": 360,
-                    "vehicle": "Sedan",
-                    "driver": "Maria Santos",
-                    "rating": 4,
-                    "status": "Cancel"
-                },
-                {
-                    "id": "QC-2024-003",
-                    "date": "08/05/2022",
-                    "time": "06:45 PM",
-                    "from": "Toril, Davao City",
-                    "to": "Mintal, Davao City",
-                    "distance": "7.1 km",
-                    "duration": "20 mins",
-                    "fare": 150,
-                    "vehicle": "SUV",
-                    "driver": "Pedro Reyes",
-                    "rating": 5,
-                    "status": "Cancelled"
-                }
-            ]
+        self.rides = []
         
         self.root = tk.Toplevel(parent_window)
         self.root.title("My Rides")
@@ -76,6 +32,36 @@ class MyRidesScreen:
         self.setup_ui()
         
         self.root.protocol("WM_DELETE_WINDOW", self.go_back)
+        
+        self.loader = ScreenDataLoader(
+            self.scrollable_frame, get_user_rides_db, self.on_rides_loaded, cache_key="rides"
+        ).load()
+        
+        self.stats_task = task_runner.submit(self.root, get_user_stats_db, on_success=self.on_stats_loaded)
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+    
+    def on_destroy(self, event):
+        if event.widget is self.root:
+            self.stats_task.cancel()
+    
+    def on_stats_loaded(self, summary):
+        if summary and self.stats_label.winfo_exists():
+            self.stats_label.config(text=summary)
+    
+    def on_rides_loaded(self, rides):
+        self.rides = rides
+        
+        for widget in self.scrollable_frame.winfo_children():
+            widget.destroy()
+        
+        if not self.rides:
+            tk.Label(
+                self.scrollable_frame, text="🚕 No rides yet",
+                font=("Arial", 14), bg="#D2D2DF", fg="#999"
+            ).pack(padx=130, pady=100)
+            return
+        
+        self.populate_rides()
     
     def load_images(self):
         frames_folder = "Python Frames"
@@ -128,6 +114,12 @@ class MyRidesScreen:
             font=("Arial", 22, "bold"), bg="#D2D2DF", fg="#333"
         ).place(relx=0.5, y=50, anchor="center")
         
+        self.stats_label = tk.Label(
+            header_frame, text="",
+            font=("Arial", 10), bg="#D2D2DF", fg="#666"
+        )
+        self.stats_label.place(relx=0.5, y=85, anchor="center")
+        
         self.create_rides_list()
     
     def create_rounded_rect_on_canvas(self, canvas, x1, y1, x2, y2, radius, **kwargs):
@@ -166,8 +158,6 @@ class MyRidesScreen:
         list_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        self.populate_rides()
-        
         list_canvas.bind_all("<MouseWheel>", lambda e: list_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
     
     def populate_rides(self):
@@ -181,6 +171,8 @@ class MyRidesScreen:
             return "#ffe4e6", "#e11d48"
         elif status == "Cancelled":
             return "#f3f4f6", "#6b7280"
+        elif status == "Scheduled":
+            return "#fef3c7", "#d97706"
         else:
             return "#dbeafe", "#2563eb"
     
@@ -364,11 +356,10 @@ class MyRidesScreen:
         )
         
         if messagebox.askyesno("Book Again", msg):
-            messagebox.showinfo(
-                "Ride Booked! 🚗",
-                f"Opening map to book your ride...\n\n"
-                f"Route: {ride['from']} → {ride['to']}"
-            )
+            # Rides cached before trips were stored open an empty map
+            parent_window = self.parent_window
+            self.root.destroy()
+            open_map_window(parent_window, ride.get('trip'))
     
     def view_receipt(self, ride):
         receipt_text = (
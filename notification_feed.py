@@ -0,0 +1,102 @@
+# notification_feed.py - Incremental Notification Feed
+
+import threading
+import config
+from database_manager import db
+
+class NotificationFeed:
+    """Keeps each user's latest notifications and unread count in memory"""
+    
+    def __init__(self, limit=None):
+        self.limit = limit or config.NOTIFICATION_FEED_LIMIT
+        self.items = {}
+        self.last_seen_id = {}
+        self.unread = {}
+        self.lock = threading.Lock()
+    
+    def refresh(self, user_id):
+        """Fetch notifications newer than the last one seen, returns the new ones
+        
+        At most limit notifications are kept, so when more than that arrived
+        since the last poll the newest page replaces the cached list and the
+        unread count is read again rather than added to.
+        """
+        if not user_id or not db.connect():
+            return []
+        
+        with self.lock:
+            since_id = self.last_seen_id.get(user_id, 0)
+            counted = user_id in self.unread
+        
+        try:
+            new_items = db.get_notifications_since(user_id, since_id, self.limit)
+            caught_up = len(new_items) < self.limit
+            if counted and caught_up:
+                unread = None
+            else:
+                unread = db.get_unread_notification_count(user_id)
+            db.disconnect()
+        
+        except Exception:
+            db.disconnect()
+            return []
+        
+        with self.lock:
+            # A refresh running at the same time may have added some already
+            last_seen_id = self.last_seen_id.get(user_id, 0)
+            new_items = [item for item in new_items if item['notification_id'] > last_seen_id]
+            
+            if unread is not None:
+                self.unread[user_id] = unread
+            elif new_items:
+                self.unread[user_id] += sum(1 for item in new_items if not item['is_read'])
+            
+            if new_items:
+                self.last_seen_id[user_id] = new_items[0]['notification_id']
+                if caught_up:
+                    self.items[user_id] = (new_items + self.items.get(user_id, []))[:self.limit]
+                else:
+                    self.items[user_id] = new_items
+        
+        return new_items
+    
+    def get_items(self, user_id):
+        """Cached notifications for a user, newest first"""
+        with self.lock:
+            return list(self.items.get(user_id, []))
+    
+    def unread_count(self, user_id):
+        """Cached unread count for a user"""
+        with self.lock:
+            return self.unread.get(user_id, 0)
+    
+    def mark_all_read(self, user_id):
+        """Mark everything the user has seen so far as read in one UPDATE"""
+        with self.lock:
+            up_to_id = self.last_seen_id.get(user_id)
+        if not user_id or up_to_id is None or not db.connect():
+            return False
+        
+        updated = db.mark_notifications_read(user_id, up_to_id)
+        db.disconnect()
+        
+        if updated is None:
+            return False
+        
+        with self.lock:
+            self.unread[user_id] = 0
+            for item in self.items.get(user_id, []):
+                item['is_read'] = True
+        
+        return True
+    
+    def forget(self, user_id):
+        """Drop a user's cached feed (on logout)"""
+        with self.lock:
+            self.items.pop(user_id, None)
+            self.last_seen_id.pop(user_id, None)
+            self.unread.pop(user_id, None)
+
+
+# Create global instance
+feed = NotificationFeed()
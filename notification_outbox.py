@@ -0,0 +1,131 @@
+# notification_outbox.py - Batched Background Notification Writer
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from mysql.connector import Error
+import config
+from database_manager import create_database_manager
+
+logger = logging.getLogger("quickcab.notifications")
+
+class NotificationOutbox:
+    """Queues notifications in memory and writes them to the database in batches"""
+    
+    def __init__(self, batch_size=None, flush_interval=None, queue_limit=None):
+        self.batch_size = batch_size or config.NOTIFICATION_BATCH_SIZE
+        self.flush_interval = flush_interval or config.NOTIFICATION_FLUSH_INTERVAL
+        
+        # Bounded, so a long database outage cannot grow it without limit
+        self.queue = queue.Queue(maxsize=queue_limit or config.NOTIFICATION_QUEUE_LIMIT)
+        self.dropped = 0
+        self.db = create_database_manager()
+        self.pending = []
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """Start the background writer thread"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self, timeout=5.0):
+        """Flush everything still queued and stop the writer thread"""
+        if not self.thread:
+            return
+        
+        self.stopping.set()
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def enqueue(self, user_id, notification_type, title, message):
+        """Queue a notification without touching the database; dropped if the queue is full"""
+        if not user_id:
+            return
+        
+        try:
+            self.queue.put_nowait((user_id, notification_type, title, message))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped % 1000 == 1:
+                logger.warning("Notification queue full, %d notifications dropped so far", dropped)
+        
+        if not (self.thread and self.thread.is_alive()):
+            self.start()
+    
+    def _run(self):
+        """Writer loop: collect a batch, write it, repeat until drained"""
+        while True:
+            batch = self._next_batch()
+            
+            try:
+                written = not batch or self._write(batch)
+            except Error:
+                # The connection dropped under us; retry on a new one
+                self.db.cursor = None
+                self.db.connection = None
+                self.pending = batch
+                written = False
+            
+            if not written:
+                if self.stopping.is_set():
+                    logger.warning("Dropped %d unsent notifications on shutdown",
+                                   len(self.pending) + self.queue.qsize())
+                    return
+                self.stopping.wait(self.flush_interval)
+            
+            if self.stopping.is_set() and self.queue.empty() and not self.pending:
+                try:
+                    self.db.disconnect()
+                except Error:
+                    pass
+                return
+    
+    def _next_batch(self):
+        """Collect queued notifications until the batch is full or its time is up"""
+        batch, self.pending = self.pending, []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            
+            try:
+                if self.stopping.is_set():
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _write(self, batch):
+        """Write one batch, keeping it pending if the database is unavailable"""
+        if not (self.db.connection and self.db.connection.is_connected()):
+            if not self.db.connect():
+                self.pending = batch
+                return False
+        
+        if not self.db.create_notifications(batch):
+            self.db.disconnect()
+            self.pending = batch
+            return False
+        
+        return True
+
+
+# Create global instance
+outbox = NotificationOutbox()
@@ -3,10 +3,13 @@ from tkinter import messagebox
 from PIL import Image, ImageTk
 import os
 from database_manager import db
+from notification_outbox import outbox
+from eta_model import eta_model
+from user_places import user_places
 import config
 
 class PaymentMethodScreen:
-    def __init__(self, parent_window, ride_type, fare, pickup_address, destination_address, distance, pickup_coords=None, destination_coords=None):
+    def __init__(self, parent_window, ride_type, fare, pickup_address, destination_address, distance, pickup_coords=None, destination_coords=None, pickup_time=None):
         self.parent_window = parent_window
         self.ride_type = ride_type
         self.fare = fare
@@ -16,6 +19,7 @@ class PaymentMethodScreen:
         self.distance = distance
         self.pickup_coords = pickup_coords
         self.destination_coords = destination_coords
+        self.pickup_time = pickup_time
         self.selected_payment = "cash"
         self.coupon_applied = False
         self.applied_voucher_code = None
@@ -321,7 +325,8 @@ class PaymentMethodScreen:
             f"Ride Type: {self.ride_type}\n"
             f"Distance: {self.distance:.2f} km\n"
             f"Fare: ₱{self.fare:.2f}\n"
-            f"Payment: {self.selected_payment.title()}\n\n"
+            f"Payment: {self.selected_payment.title()}\n"
+            f"{self.pickup_time_line()}\n"
             f"From: {display_pickup}\n\n"
             f"To: {display_destination}\n\n"
             f"Confirm payment?"
@@ -330,11 +335,21 @@ class PaymentMethodScreen:
         if messagebox.askyesno("Confirm Payment", msg):
             success = self.save_ride_to_database()
             
-            if success:
+            if success and self.pickup_time:
+                messagebox.showinfo(
+                    "Reservation Confirmed! 📅",
+                    f"Your {self.ride_type} is reserved for "
+                    f"{self.pickup_time.strftime('%b %d, %I:%M %p')}.\n"
+                    f"We will start finding your driver {config.RESERVATION_LEAD_MINUTES} minutes before pickup.\n\n"
+                    f"Total: ₱{self.fare:.2f}\n\n"
+                    f"Check 'My Rides' to view your booking."
+                )
+                self.close_and_return_to_map()
+            elif success:
                 messagebox.showinfo(
                     "Booking Complete! 🎉", 
                     f"Your {self.ride_type} is on the way!\n"
-                    f"Driver arriving in 5-10 minutes 🚕\n\n"
+                    f"Driver arriving in {self.pickup_eta_text()} 🚕\n\n"
                     f"Total Paid: ₱{self.fare:.2f}\n\n"
                     f"Check 'My Rides' to view your booking."
                 )
@@ -342,6 +357,23 @@ class PaymentMethodScreen:
             else:
                 messagebox.showerror("Booking Failed", "Could not save your booking. Please try again.")
     
+    def pickup_time_line(self):
+        if self.pickup_time:
+            return f"Pickup: {self.pickup_time.strftime('%b %d, %I:%M %p')}\n"
+        return ""
+    
+    def pickup_eta_text(self):
+        """Expected driver arrival from the ETA model, or the usual range"""
+        try:
+            if not (self.pickup_coords and db.connect()):
+                return "5-10 minutes"
+            try:
+                return eta_model.pickup_text(db, self.pickup_coords)
+            finally:
+                db.disconnect()
+        except Exception:
+            return "5-10 minutes"
+    
     def save_ride_to_database(self):
         try:
             if not db.connect():
@@ -363,12 +395,19 @@ class PaymentMethodScreen:
                 dest_addr=self.destination_address,
                 distance_km=self.distance,
                 fare=self.fare,
-                payment_method=self.selected_payment
+                payment_method=self.selected_payment,
+                pickup_time=self.pickup_time
             )
             
             db.disconnect()
             
             if ride_code:
+                user_places.add_trip(config.CURRENT_USER_ID, (dest_lat, dest_lon), self.destination_address)
+                when = f" for {self.pickup_time.strftime('%b %d, %I:%M %p')}" if self.pickup_time else ""
+                outbox.enqueue(
+                    config.CURRENT_USER_ID, 'ride', "Ride Booked",
+                    f"Your {self.ride_type} ride {ride_code} is confirmed{when}. ₱{self.fare:.2f} via {self.selected_payment.title()}."
+                )
                 return True
             return False
                 
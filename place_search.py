@@ -0,0 +1,226 @@
+# place_search.py - Destination Autocomplete
+#
+# Places are read from PLACES_PATH (a CSV of name, latitude, longitude,
+# category, popularity) into a prefix trie over the words of their names.
+# Every trie node holds the ids of the places with a word starting there, so
+# a query is one walk per typed word and a set intersection:
+#
+#     "sm la"     places with a word starting "sm" and one starting "la"
+#
+# The last word is matched as a prefix, the earlier ones too (riders type
+# "ate dav" for Ateneo de Davao). When nothing matches, the last word is
+# looked up again allowing one typo or swapped letter pair (two for words
+# of eight letters or more). Matches are ranked by popularity, with a bonus
+# when the name starts with the query and a penalty for typo matches.
+#
+#     python place_search.py "abre"          # suggestions and lookup time
+
+import csv
+import heapq
+import re
+import sys
+import time
+import unicodedata
+import config
+
+WORD = re.compile(r"[a-z0-9]+")
+
+# Ranking adjustments, in popularity points
+NAME_START_BONUS = 50
+TYPO_PENALTY = 25
+
+def words_of(text):
+    """Lowercase ASCII words of a name or query"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return WORD.findall(text.replace("'", ""))
+
+class TrieNode:
+    __slots__ = ('children', 'places', 'leading', 'ranked', 'ranked_leading')
+    
+    def __init__(self):
+        self.children = {}
+        # Ids of the places with a word starting with this node's prefix
+        self.places = set()
+        # Ids of the places whose first word starts with it
+        self.leading = set()
+        # The same ids by popularity, built on first search
+        self.ranked = None
+        self.ranked_leading = None
+
+class PlaceIndex:
+    """Prefix trie over place name words"""
+    
+    def __init__(self, places=None):
+        self.root = TrieNode()
+        self.places = []
+        for place in places or []:
+            self.add(place)
+    
+    @classmethod
+    def load(cls, path=None):
+        """Index the places of a CSV file; a missing file gives an empty index"""
+        index = cls()
+        try:
+            with open(path or config.PLACES_PATH, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    index.add({
+                        'name': row['name'],
+                        'latitude': float(row['latitude']),
+                        'longitude': float(row['longitude']),
+                        'category': row.get('category') or '',
+                        'popularity': float(row.get('popularity') or 0)
+                    })
+        except (OSError, KeyError, ValueError):
+            pass
+        return index
+    
+    def add(self, place):
+        place_id = len(self.places)
+        self.places.append(dict(place, words=words_of(place['name'])))
+        
+        for position, word in enumerate(self.places[place_id]['words']):
+            node = self.root
+            for letter in word:
+                node = node.children.setdefault(letter, TrieNode())
+                node.places.add(place_id)
+                node.ranked = None
+                if position == 0:
+                    node.leading.add(place_id)
+                    node.ranked_leading = None
+    
+    def _prefix(self, prefix):
+        node = self.root
+        for letter in prefix:
+            node = node.children.get(letter)
+            if node is None:
+                return None
+        return node
+    
+    def _fuzzy(self, word, max_edits):
+        """Ids of places with a word prefix within max_edits edits (swaps count as one) of word"""
+        found = set()
+        first_row = list(range(len(word) + 1))
+        
+        # Edit distance rows along the trie; a node whose row ends within
+        # max_edits matches as a prefix, a row entirely above it stops the walk
+        # Typos in the first letter are rare; starting with it keeps the walk small
+        first = self.root.children.get(word[0])
+        stack = [(first, word[0], None, first_row, None)] if first else []
+        while stack:
+            node, letter, last_letter, previous, before = stack.pop()
+            row = [previous[0] + 1]
+            for column in range(1, len(word) + 1):
+                cost = min(row[column - 1] + 1, previous[column] + 1,
+                           previous[column - 1] + (word[column - 1] != letter))
+                if (before is not None and column > 1 and word[column - 1] == last_letter
+                        and word[column - 2] == letter):
+                    cost = min(cost, before[column - 2] + 1)
+                row.append(cost)
+            
+            if row[-1] <= max_edits:
+                found |= node.places
+            elif min(row) <= max_edits:
+                stack.extend((child, next_letter, letter, row, previous)
+                             for next_letter, child in node.children.items())
+        return found
+    
+    def _score(self, place_id, phrase, fuzzy):
+        place = self.places[place_id]
+        value = place['popularity']
+        if " ".join(place['words']).startswith(phrase):
+            value += NAME_START_BONUS
+        if fuzzy:
+            value -= TYPO_PENALTY
+        return value
+    
+    def _by_popularity(self, place_ids):
+        return sorted(place_ids, key=lambda place_id: -self.places[place_id]['popularity'])
+    
+    def _walk(self, top, ranked, others, bonus, phrase, limit):
+        """Push the best of `ranked` (by popularity) that are in every set of others onto the top heap"""
+        for place_id in ranked:
+            if len(top) == limit and self.places[place_id]['popularity'] + bonus <= top[0][0]:
+                return
+            if all(place_id in places for places in others):
+                entry = (self._score(place_id, phrase, False), -place_id)
+                if entry in top:
+                    continue
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+    
+    def search(self, query, limit=None):
+        """Best places for a typed query, most relevant first"""
+        limit = limit or config.PLACE_SEARCH_LIMIT
+        words = words_of(query)
+        if not words:
+            return []
+        phrase = " ".join(words)
+        
+        nodes = [self._prefix(word) for word in words]
+        if None in nodes[:-1]:
+            return []
+        
+        if nodes[-1] is None:
+            candidates = self._fuzzy(words[-1], 2 if len(words[-1]) >= 8 else 1)
+            for node in nodes[:-1]:
+                candidates &= node.places
+            best = heapq.nlargest(limit, candidates, key=lambda place_id: self._score(place_id, phrase, True))
+            return [self.places[place_id] for place_id in best]
+        
+        # Walk the smallest match set by popularity until the next place cannot
+        # beat the current top `limit`, counting only places without the name
+        # start bonus; those with it all lead with the first word, so a second
+        # walk over the first word's leading places covers them
+        first = nodes[0]
+        nodes.sort(key=lambda node: len(node.places))
+        top = []
+        if nodes[0].ranked is None:
+            nodes[0].ranked = self._by_popularity(nodes[0].places)
+        self._walk(top, nodes[0].ranked, [node.places for node in nodes[1:]], 0, phrase, limit)
+        
+        if first.ranked_leading is None:
+            first.ranked_leading = self._by_popularity(first.leading)
+        self._walk(top, first.ranked_leading, [node.places for node in nodes], NAME_START_BONUS, phrase, limit)
+        
+        return [self.places[-place_id] for _, place_id in sorted(top, reverse=True)]
+
+
+class PlaceSearch:
+    """Loads the place index on first use"""
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.index = None
+    
+    def search(self, query, limit=None):
+        if self.index is None:
+            self.index = PlaceIndex.load(self.path)
+        return self.index.search(query, limit)
+
+
+# Create global instance
+place_search = PlaceSearch()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print('Usage: python place_search.py "query"')
+        return 2
+    
+    query = " ".join(argv)
+    place_search.search(query)
+    runs = 1000
+    started = time.perf_counter()
+    for _ in range(runs):
+        results = place_search.search(query)
+    elapsed = (time.perf_counter() - started) / runs
+    
+    for place in results:
+        print(f"  {place['name']} ({place['category']}) {place['latitude']:.4f}, {place['longitude']:.4f}")
+    print(f"{len(results)} suggestions in {elapsed * 1000:.3f} ms from {len(place_search.index.places)} places")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+# query_plan_check.py - EXPLAIN Every DatabaseManager Query and Fail on Full Table Scans
+#
+# Builds a scratch database from the versioned schema, seeds it with enough
+# rows for the optimizer to prefer indexes, runs every public DatabaseManager
+# method while recording the SQL it sends, and EXPLAINs each statement.
+# Exits non-zero if any statement scans a whole table or if a public method
+# is missing from PLAN_CHECK_CALLS.
+#
+#     python query_plan_check.py
+
+import random
+import sys
+from datetime import datetime, timedelta
+import mysql.connector
+from mysql.connector import Error
+import config
+from database_manager import DatabaseManager
+from schema_migrate import apply_migrations
+
+CHECK_DB_NAME = config.DB_NAME + "_plancheck"
+
+SEED_USERS = 2000
+SEED_DRIVERS = 300
+SEED_RIDES = 20000
+SEED_TRANSACTIONS = 20000
+SEED_NOTIFICATIONS = 20000
+SEED_VOUCHERS = 50
+
+# Methods that do not send SQL of their own
+SKIPPED_METHODS = {'connect', 'disconnect'}
+
+# (method, args, kwargs) run in order against the seeded database
+PLAN_CHECK_CALLS = [
+    ('authenticate_user', ('user1', 'Password1!'), {}),
+    ('create_user', ('Plan Check', 'plancheck@example.com', 'Password1!'), {}),
+    ('get_user_info', (1,), {}),
+    ('get_wallet_balance', (1,), {}),
+    ('add_wallet_funds', (1, 100), {}),
+    ('deduct_wallet_funds', (1, 50), {}),
+    ('get_transaction_history', (1,), {}),
+    ('get_last_transaction_id', (), {}),
+    ('get_wallet_activity', (0, 5000), {}),
+    ('snapshot_wallet', (1,), {}),
+    ('rebase_wallet_snapshots', (), {'chunk_size': 500}),
+    ('create_ride', (1, 'sedan', 7.07, 125.61, 'Pickup', 7.08, 125.62, 'Destination', 2.5, 77.5, 'cash'), {}),
+    ('create_ride', (1, 'sedan', 7.07, 125.61, 'Pickup', 7.08, 125.62, 'Destination', 2.5, 77.5, 'cash'),
+     {'pickup_time': datetime.now() + timedelta(hours=2)}),
+    ('get_user_rides', (1,), {}),
+    ('update_ride_status', (1, 'accepted'), {}),
+    ('complete_ride', (1, 5, 'Great ride'), {}),
+    ('get_user_stats', (1,), {}),
+    ('rebuild_user_stats', (), {'chunk_size': 500}),
+    ('get_eta_speeds', ([(1, 2, 3), (1, 2, 168), (-1, -1, 3), (-1, -1, 168)],), {}),
+    ('get_completed_trips', (0, 500), {}),
+    ('replace_eta_speeds', ([(1, 2, 3, 1, 2.5, 8.0)],), {}),
+    ('get_pickups', (None, datetime.now() - timedelta(days=30), 500), {}),
+    ('get_scheduled_rides', (None, datetime.now() + timedelta(hours=24), 500), {}),
+    ('get_scheduled_rides', ((datetime.now(), 10), datetime.now() + timedelta(hours=24), 500), {}),
+    ('get_recent_reservations', (datetime.now() - timedelta(minutes=2),), {}),
+    ('release_scheduled_rides', ([1, 2, 3], datetime.now() + timedelta(hours=3)), {}),
+    ('get_saved_places', (1,), {}),
+    ('get_frequent_places', (1,), {}),
+    ('save_place', (1, 'Plan check', 'Roxas Ave, Davao City', 7.0731, 125.6128), {}),
+    ('delete_saved_place', (1, 'Plan check'), {}),
+    ('get_user_vouchers', (1,), {}),
+    ('validate_voucher', ('PLAN1', 1, 500.0), {}),
+    ('use_voucher', ('PLAN1', 1, 1, 50.0), {}),
+    ('assign_voucher_to_user', (2, 'PLAN1'), {}),
+    ('issue_voucher_campaign', ('PLAN2',), {'segment': 'all', 'chunk_size': 500}),
+    ('issue_voucher_campaign', ('PLAN2',), {'segment': 'last_login',
+                                            'last_login_since': datetime.now() - timedelta(days=7)}),
+    ('issue_voucher_campaign', ('PLAN2',), {'segment': 'ids', 'user_ids': list(range(1, 51))}),
+    ('get_available_drivers', ('sedan',), {}),
+    ('save_driver_locations', ([(1, 7.07, 125.61, 90, 32.5, datetime.now())],), {}),
+    ('get_driver_locations', (datetime.now() - timedelta(minutes=2),), {}),
+    ('create_notification', (1, 'system', 'Plan check', 'Checking query plans'), {}),
+    ('create_notifications', ([(1, 'system', 'Plan check', 'Batch')],), {}),
+    ('get_user_notifications', (1,), {}),
+    ('get_notifications_since', (1, 10), {}),
+    ('get_unread_notification_count', (1,), {}),
+    ('mark_notifications_read', (1,), {}),
+    ('export_rides', (), {'start': datetime.now() - timedelta(days=30), 'end': datetime.now()}),
+    ('export_rides', ((datetime.now() - timedelta(days=7), 100),), {'limit': 500}),
+    ('export_wallet_transactions', (), {'start': datetime.now() - timedelta(days=30), 'end': datetime.now()}),
+]
+
+# Run again with config.WALLET_LEDGER_MODE on, for its snapshot + postings queries
+LEDGER_PLAN_CHECK_CALLS = [
+    ('get_wallet_balance', (1,), {}),
+    ('add_wallet_funds', (1, 100), {}),
+    ('deduct_wallet_funds', (1, 50), {}),
+]
+
+
+class RecordingCursor:
+    """Cursor wrapper that remembers every statement sent through it"""
+    
+    def __init__(self, cursor, statements):
+        self._cursor = cursor
+        self._statements = statements
+    
+    def execute(self, operation, params=None):
+        self._statements.append((operation, params))
+        return self._cursor.execute(operation, params)
+    
+    def executemany(self, operation, seq_params):
+        seq_params = list(seq_params)
+        if seq_params:
+            self._statements.append((operation, seq_params[0]))
+        return self._cursor.executemany(operation, seq_params)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def create_check_database():
+    """Recreate the scratch database and bring it to the latest schema"""
+    connection = mysql.connector.connect(
+        host=config.DB_HOST, user=config.DB_USER,
+        password=config.DB_PASSWORD, port=config.DB_PORT
+    )
+    cursor = connection.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {CHECK_DB_NAME}")
+    cursor.execute(f"CREATE DATABASE {CHECK_DB_NAME}")
+    cursor.execute(f"USE {CHECK_DB_NAME}")
+    cursor.close()
+    
+    apply_migrations(connection)
+    return connection
+
+def seed(connection):
+    """Fill the scratch database with realistic amounts of data"""
+    rng = random.Random(42)
+    cursor = connection.cursor()
+    now = datetime.now()
+    password_hash = DatabaseManager()._hash_password('Password1!')
+    
+    cursor.executemany(
+        "INSERT INTO users (username, email, password_hash, full_name, user_type, last_login) VALUES (%s, %s, %s, %s, %s, %s)",
+        [(f"user{i}", f"user{i}@example.com", password_hash, f"User {i}",
+          'driver' if i > SEED_USERS - SEED_DRIVERS else 'passenger',
+          now - timedelta(days=rng.randint(0, 90)))
+         for i in range(1, SEED_USERS + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO wallet (user_id, balance) VALUES (%s, %s)",
+        [(i, 5000) for i in range(1, SEED_USERS + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO drivers (user_id, vehicle_type, vehicle_plate, vehicle_model, rating, driver_status, verification_status) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [(SEED_USERS - SEED_DRIVERS + i, rng.choice(['sedan', 'suv']), f"PLT-{i:04d}", "Toyota Vios",
+          round(rng.uniform(3.5, 5.0), 2), rng.choice(['available', 'busy', 'offline']),
+          rng.choice(['verified', 'verified', 'pending']))
+         for i in range(1, SEED_DRIVERS + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO wallet_transactions (wallet_id, user_id, transaction_type, amount, balance_before, balance_after, "
+        "description, transaction_date) VALUES (%s, %s, 'deposit', 10, 5000, 5010, 'Seed', %s)",
+        [(user_id, user_id, now - timedelta(minutes=rng.randint(0, 100000)))
+         for user_id in (rng.randint(1, SEED_USERS) for _ in range(SEED_TRANSACTIONS))]
+    )
+    cursor.executemany(
+        "INSERT INTO rides (ride_code, passenger_id, ride_type, pickup_latitude, pickup_longitude, destination_latitude, "
+        "destination_longitude, distance_km, base_fare, distance_fare, final_fare, payment_method, ride_status, booking_time) "
+        "VALUES (%s, %s, 'sedan', 7.07, 125.61, 7.08, 125.62, 2.5, 40, 37.5, 77.5, 'cash', 'completed', %s)",
+        [(f"QC-{i:06d}", rng.randint(1, SEED_USERS), now - timedelta(minutes=rng.randint(0, 100000)))
+         for i in range(SEED_RIDES)]
+    )
+    cursor.executemany(
+        "INSERT INTO vouchers (voucher_code, voucher_type, discount_value, min_fare, max_discount, usage_limit, expiry_date) "
+        "VALUES (%s, 'percentage', 10, 100, 100, 5, %s)",
+        [(f"PLAN{i}", (now + timedelta(days=30)).date()) for i in range(1, SEED_VOUCHERS + 1)]
+    )
+    cursor.executemany(
+        "INSERT IGNORE INTO user_vouchers (user_id, voucher_id) VALUES (%s, %s)",
+        [(1, 1)] + [(rng.randint(1, SEED_USERS), rng.randint(3, SEED_VOUCHERS)) for _ in range(5000)]
+    )
+    cursor.executemany(
+        "INSERT INTO notifications (user_id, notification_type, title, message, is_read, created_at) "
+        "VALUES (%s, 'system', 'Seed', 'Seed notification', %s, %s)",
+        [(rng.randint(1, SEED_USERS), rng.random() < 0.7, now - timedelta(minutes=rng.randint(0, 100000)))
+         for _ in range(SEED_NOTIFICATIONS)]
+    )
+    connection.commit()
+    
+    cursor.execute("SHOW TABLES")
+    for (table,) in cursor.fetchall():
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+    cursor.close()
+
+def record_statements():
+    """Run every PLAN_CHECK_CALLS entry and return [(method, sql, params)]"""
+    config.DB_NAME = CHECK_DB_NAME
+    # The path the app runs: _execute statements on cached prepared cursors,
+    # the rest on manager.cursor; both are recorded
+    config.DB_PREPARED_STATEMENTS = True
+    manager = DatabaseManager()
+    if not manager.connect():
+        raise RuntimeError(f"Could not connect to {CHECK_DB_NAME}")
+    
+    statements = []
+    statement_cursor = manager._statement_cursor
+    manager._statement_cursor = lambda query_id, replica=False: RecordingCursor(
+        statement_cursor(query_id, replica), statements)
+    
+    recorded = []
+    calls = [(False, call) for call in PLAN_CHECK_CALLS] + [(True, call) for call in LEDGER_PLAN_CHECK_CALLS]
+    for ledger_mode, (method, args, kwargs) in calls:
+        config.WALLET_LEDGER_MODE = ledger_mode
+        manager.cursor = RecordingCursor(manager.cursor, statements)
+        getattr(manager, method)(*args, **kwargs)
+        manager.cursor = manager.cursor._cursor
+        recorded.extend((method, sql, params) for sql, params in statements)
+        statements.clear()
+    
+    config.WALLET_LEDGER_MODE = False
+    manager.disconnect()
+    return recorded
+
+def uncovered_methods():
+    public = {name for name in dir(DatabaseManager)
+              if not name.startswith('_') and callable(getattr(DatabaseManager, name))}
+    covered = {method for method, _, _ in PLAN_CHECK_CALLS}
+    return sorted(public - covered - SKIPPED_METHODS)
+
+def explain(connection, recorded):
+    """EXPLAIN each recorded statement, return [(method, table, sql)] full scans"""
+    cursor = connection.cursor(dictionary=True)
+    full_scans = []
+    
+    for method, sql, params in recorded:
+        statement = sql.strip()
+        if statement.upper().startswith('INSERT') and 'SELECT' not in statement.upper():
+            continue
+        
+        cursor.execute("EXPLAIN " + statement, params)
+        for row in cursor.fetchall():
+            table = row.get('table') or ''
+            if row.get('type') == 'ALL' and not table.startswith('<'):
+                full_scans.append((method, table, " ".join(statement.split())))
+    
+    cursor.close()
+    return full_scans
+
+def main():
+    try:
+        connection = create_check_database()
+        seed(connection)
+        recorded = record_statements()
+        full_scans = explain(connection, recorded)
+        connection.close()
+    except (Error, RuntimeError) as e:
+        print(f"Query plan check could not run: {e}")
+        return 2
+    
+    missing = uncovered_methods()
+    
+    print(f"Checked {len(recorded)} statements from {len(PLAN_CHECK_CALLS)} calls")
+    for method, table, sql in full_scans:
+        print(f"FULL SCAN  {method}: {table}\n    {sql}")
+    for method in missing:
+        print(f"NOT CHECKED  {method}: add it to PLAN_CHECK_CALLS")
+    
+    return 1 if full_scans or missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# query_stats.py - Per-Method Database Latency, Row and Error Statistics
+
+import bisect
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+import config
+
+logger = logging.getLogger("quickcab.db")
+
+# Histogram bucket upper bounds in ms: 0.05 ms to about 40 s, each 25% wider
+# than the last, so a percentile is never off by more than one bucket width
+LATENCY_BUCKETS_MS = [0.05 * 1.25 ** i for i in range(62)]
+
+class MethodStats:
+    """Call count, latency histogram, rows and errors of one DatabaseManager method"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    
+    def add(self, elapsed_ms, rows, errored):
+        self.calls += 1
+        self.rows += rows
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        if errored:
+            self.errors += 1
+    
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile call, in ms"""
+        if not self.calls:
+            return 0.0
+        
+        rank = max(1, math.ceil(self.calls * p / 100))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+    
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 3)
+        }
+
+class _Call:
+    """A DatabaseManager method call in progress on this thread"""
+    
+    __slots__ = ('method', 'rows', 'errored')
+    
+    def __init__(self, method):
+        self.method = method
+        self.rows = 0
+        self.errored = False
+
+class QueryStats:
+    """Collects MethodStats for every instrumented DatabaseManager method"""
+    
+    def __init__(self, enabled=None, slow_query_ms=None):
+        self.enabled = config.QUERY_STATS_ENABLED if enabled is None else enabled
+        self.slow_query_ms = config.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+        self.methods = {}
+        self.lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _calls(self):
+        calls = getattr(self._local, 'calls', None)
+        if calls is None:
+            calls = self._local.calls = []
+        return calls
+    
+    def current_call(self):
+        """The innermost instrumented method running on this thread, or None"""
+        calls = self._calls()
+        return calls[-1] if calls else None
+    
+    def record(self, method, elapsed_ms, rows=0, errored=False):
+        with self.lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = MethodStats()
+            stats.add(elapsed_ms, rows, errored)
+    
+    def statement_finished(self, sql, params, elapsed_ms, errored=False):
+        """Attribute one statement to the running method and log it if slow"""
+        call = self.current_call()
+        if call and errored:
+            call.errored = True
+        
+        if elapsed_ms >= self.slow_query_ms:
+            if 'password' in sql:
+                params = '<redacted>'
+            logger.warning("Slow query (%.1f ms) in %s: %s params=%r",
+                           elapsed_ms, call.method if call else '?', " ".join(sql.split()), params)
+    
+    def rows_fetched(self, count):
+        call = self.current_call()
+        if call:
+            call.rows += count
+    
+    def snapshot(self):
+        """{method: stats dict} for every method called so far"""
+        with self.lock:
+            return {method: stats.to_dict() for method, stats in self.methods.items()}
+    
+    def report(self):
+        """Text table of the snapshot, slowest total time first"""
+        snapshot = self.snapshot()
+        lines = [f"{'method':<32}{'calls':>8}{'errors':>8}{'rows':>10}"
+                 f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total ms':>12}"]
+        for method, s in sorted(snapshot.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{method:<32}{s['calls']:>8}{s['errors']:>8}{s['rows']:>10}"
+                         f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['total_ms']:>12.1f}")
+        return "\n".join(lines)
+    
+    def dump(self, path=None):
+        """Write the snapshot as JSON, returns the path written"""
+        path = path or config.QUERY_STATS_PATH
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'written_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'methods': self.snapshot()}, f, indent=2)
+        return path
+    
+    def reset(self):
+        with self.lock:
+            self.methods = {}
+
+class InstrumentedCursor:
+    """Cursor wrapper that times each statement and counts fetched rows"""
+    
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self.stats = stats
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def _timed(self, run, operation, params):
+        start = time.perf_counter()
+        try:
+            result = run(operation, params)
+        except Exception:
+            self.stats.statement_finished(operation, params, (time.perf_counter() - start) * 1000, errored=True)
+            raise
+        self.stats.statement_finished(operation, params, (time.perf_counter() - start) * 1000)
+        return result
+    
+    def execute(self, operation, params=()):
+        return self._timed(self._cursor.execute, operation, params)
+    
+    def executemany(self, operation, seq_params):
+        return self._timed(self._cursor.executemany, operation, seq_params)
+    
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self.stats.rows_fetched(1)
+        return row
+    
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self.stats.rows_fetched(len(rows))
+        return rows
+    
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self.stats.rows_fetched(len(rows))
+        return rows
+
+def instrument_cursor(cursor):
+    """Wrap a new cursor so its statements are recorded, if stats are enabled"""
+    if cursor is None or not query_stats.enabled:
+        return cursor
+    return InstrumentedCursor(cursor, query_stats)
+
+def instrumented(method):
+    """Record latency, fetched rows and errors of a DatabaseManager method"""
+    name = method.__name__
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not query_stats.enabled:
+            return method(self, *args, **kwargs)
+        
+        calls = query_stats._calls()
+        call = _Call(name)
+        calls.append(call)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            call.errored = True
+            raise
+        finally:
+            calls.pop()
+            query_stats.record(name, (time.perf_counter() - start) * 1000, call.rows, call.errored)
+    
+    return wrapper
+
+def instrument_methods(cls):
+    """Class decorator applying @instrumented to every public query method"""
+    for name, value in list(vars(cls).items()):
+        if callable(value) and not name.startswith('_') and name not in ('connect', 'disconnect'):
+            setattr(cls, name, instrumented(value))
+    return cls
+
+
+# Create global instance
+query_stats = QueryStats()
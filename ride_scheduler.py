@@ -0,0 +1,209 @@
+# ride_scheduler.py - Releases Scheduled Rides to Dispatch
+#
+# A reservation is a ride in status 'scheduled' with a pickup_time. The
+# scheduler keeps the reservations picked up within the next
+# RIDE_SCHEDULER_HORIZON_HOURS in a heap ordered by pickup time and moves each
+# one to 'pending' (dispatch) RESERVATION_LEAD_MINUTES before it, notifying
+# the rider. Later reservations stay in the database until the horizon
+# reaches them: the heap is topped up with one idx_rides_status_pickup range
+# read whenever half the horizon has passed, which is also how it is rebuilt
+# after a restart (overdue reservations are released straight away).
+#
+# Reservations booked by this or any other client are picked up every
+# RIDE_SCHEDULER_RESCAN_INTERVAL seconds by reading the ones booked since the
+# previous check (an idx_rides_booking_status range, overlapping the previous
+# one by an interval for bookings that committed late). Between those reads
+# the thread sleeps until the next release is due, so an idle scheduler costs
+# one small query a minute however many reservations are waiting.
+#
+# Run exactly one releaser: this script, or the app with
+# RIDE_SCHEDULER_ENABLED (off by default).
+#
+#     python ride_scheduler.py            # release reservations until interrupted
+#     python ride_scheduler.py --once     # release the ones due now and exit
+
+import argparse
+import atexit
+import heapq
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+import config
+from database_manager import create_database_manager
+from eta_model import as_datetime
+from notification_outbox import outbox
+
+# Seconds before a pass that hit a database error is retried
+RETRY_SECONDS = 5
+
+class RideScheduler:
+    """Moves reservations to dispatch shortly before their pickup time"""
+    
+    def __init__(self, lead_minutes=None, horizon_hours=None, rescan_interval=None, chunk_size=None):
+        self.lead = timedelta(minutes=lead_minutes or config.RESERVATION_LEAD_MINUTES)
+        self.horizon = timedelta(hours=horizon_hours or config.RIDE_SCHEDULER_HORIZON_HOURS)
+        self.rescan_interval = rescan_interval or config.RIDE_SCHEDULER_RESCAN_INTERVAL
+        self.chunk_size = chunk_size or config.RIDE_SCHEDULER_CHUNK_SIZE
+        
+        self.db = create_database_manager()
+        self.heap = []  # (pickup_time, ride_id) of the reservations picked up before loaded_until
+        self.queued = set()  # ride ids in the heap
+        self.loaded_until = None
+        self.last_scan = None  # when bookings were last checked for new reservations
+        self.next_rescan = 0.0  # time.monotonic() of the next check
+        self.failed = False  # a read or release of this pass failed
+        self.released = 0
+        
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """Start the background release thread"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="ride-scheduler", daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self, timeout=5.0):
+        """Stop the release thread after its current pass"""
+        if not self.thread:
+            return
+        
+        self.stopping.set()
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def _run(self):
+        while not self.stopping.is_set():
+            self.stopping.wait(self.run_once())
+    
+    def run_once(self):
+        """Load and release what is due, returns the seconds until the next pass is needed"""
+        if not self.db.connect():
+            return self.rescan_interval
+        
+        try:
+            self.failed = False
+            now = datetime.now()
+            if self.last_scan is None:
+                # The first load sees everything booked so far
+                self.last_scan = now
+                self.next_rescan = time.monotonic() + self.rescan_interval
+            elif time.monotonic() >= self.next_rescan:
+                self._scan_recent(now)
+            
+            if self.loaded_until is None or self.loaded_until - now < self.horizon / 2:
+                self._load(now + self.horizon)
+            
+            self._release_due(now)
+            if self.failed:
+                return RETRY_SECONDS
+            return self._seconds_to_next(datetime.now())
+        finally:
+            self.db.disconnect()
+    
+    def _push(self, ride_id, pickup_time):
+        if ride_id not in self.queued:
+            self.queued.add(ride_id)
+            heapq.heappush(self.heap, (as_datetime(pickup_time), ride_id))
+    
+    def _load(self, until):
+        """Queue the reservations picked up before until that are not queued yet"""
+        after = (self.loaded_until, 0) if self.loaded_until else None
+        while not self.stopping.is_set():
+            rides = self.db.get_scheduled_rides(after, until, self.chunk_size)
+            if rides is None:
+                self.failed = True
+                return
+            
+            for ride in rides:
+                self._push(ride['ride_id'], ride['pickup_time'])
+            if len(rides) < self.chunk_size:
+                self.loaded_until = until
+                return
+            after = (rides[-1]['pickup_time'], rides[-1]['ride_id'])
+    
+    def _scan_recent(self, now):
+        """Queue reservations booked since the last scan that fall inside the loaded horizon"""
+        rides = self.db.get_recent_reservations(self.last_scan - timedelta(seconds=self.rescan_interval))
+        if rides is None:
+            self.failed = True
+            return
+        
+        for ride in rides:
+            if self.loaded_until and as_datetime(ride['pickup_time']) < self.loaded_until:
+                self._push(ride['ride_id'], ride['pickup_time'])
+        self.last_scan = now
+        self.next_rescan = time.monotonic() + self.rescan_interval
+    
+    def _release_due(self, now):
+        """Release the queued reservations whose pickup is within the lead time"""
+        due_by = now + self.lead
+        while self.heap and self.heap[0][0] <= due_by and not self.stopping.is_set():
+            batch = []
+            while self.heap and self.heap[0][0] <= due_by and len(batch) < self.chunk_size:
+                batch.append(heapq.heappop(self.heap))
+            
+            rides = self.db.release_scheduled_rides([ride_id for _, ride_id in batch], due_by)
+            if rides is None:
+                # Try again on the next pass
+                self.failed = True
+                for entry in batch:
+                    heapq.heappush(self.heap, entry)
+                return
+            
+            self.queued.difference_update(ride_id for _, ride_id in batch)
+            self.released += len(rides)
+            for ride in rides:
+                pickup = as_datetime(ride['pickup_time']).strftime('%I:%M %p')
+                outbox.enqueue(
+                    ride['passenger_id'], 'ride', "Scheduled Ride Dispatched",
+                    f"We are finding a {ride['ride_type']} for your {pickup} pickup ({ride['ride_code']})."
+                )
+    
+    def _seconds_to_next(self, now):
+        """Sleep until the next release, rescan or horizon top-up, whichever comes first"""
+        wait = self.next_rescan - time.monotonic()
+        if self.heap:
+            wait = min(wait, (self.heap[0][0] - self.lead - now).total_seconds())
+        if self.loaded_until:
+            wait = min(wait, (self.loaded_until - self.horizon / 2 - now).total_seconds())
+        return max(wait, 0.05)
+
+
+# Create global instance
+scheduler = RideScheduler()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Release scheduled rides to dispatch before their pickup time")
+    parser.add_argument('--once', action='store_true', help="release the reservations due now and exit")
+    args = parser.parse_args(argv)
+    
+    worker = scheduler
+    started = time.perf_counter()
+    wait = worker.run_once()
+    print(f"{len(worker.heap)} reservations within {worker.horizon} loaded, {worker.released} released "
+          f"in {time.perf_counter() - started:.2f} s")
+    if args.once:
+        outbox.stop()
+        return 0
+    
+    try:
+        while True:
+            time.sleep(wait)
+            before = worker.released
+            wait = worker.run_once()
+            if worker.released > before:
+                print(f"Released {worker.released - before} scheduled rides")
+    except KeyboardInterrupt:
+        outbox.stop()
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+-- 001_initial.sql - QuickCab base schema (MySQL / MariaDB)
+--
+-- Every index below serves a DatabaseManager query; the access path is noted
+-- next to it. Run `python query_plan_check.py` after changing either side.
+
+CREATE TABLE users (
+    user_id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    password_hash CHAR(64) NOT NULL,
+    full_name VARCHAR(100) NOT NULL,
+    phone_number VARCHAR(20) NULL,
+    user_type ENUM('passenger', 'driver', 'admin') NOT NULL DEFAULT 'passenger',
+    account_status ENUM('active', 'suspended', 'deleted') NOT NULL DEFAULT 'active',
+    date_registered DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_login DATETIME NULL,
+    -- authenticate_user
+    UNIQUE KEY uq_users_username (username),
+    UNIQUE KEY uq_users_email (email),
+    -- issue_voucher_campaign segments (all active users / by last_login)
+    KEY idx_users_status_login (account_status, last_login)
+) ENGINE=InnoDB;
+
+CREATE TABLE wallet (
+    wallet_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    balance DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- get_wallet_balance, add_wallet_funds, deduct_wallet_funds
+    UNIQUE KEY uq_wallet_user (user_id),
+    CONSTRAINT fk_wallet_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE wallet_transactions (
+    transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    wallet_id INT NOT NULL,
+    user_id INT NOT NULL,
+    transaction_type ENUM('deposit', 'withdrawal') NOT NULL,
+    amount DECIMAL(12, 2) NOT NULL,
+    balance_before DECIMAL(12, 2) NOT NULL,
+    balance_after DECIMAL(12, 2) NOT NULL,
+    description VARCHAR(255) NULL,
+    transaction_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- get_transaction_history: WHERE user_id ORDER BY transaction_date DESC LIMIT n
+    KEY idx_wallet_tx_user_date (user_id, transaction_date),
+    KEY idx_wallet_tx_wallet (wallet_id, transaction_id),
+    CONSTRAINT fk_wallet_tx_wallet FOREIGN KEY (wallet_id) REFERENCES wallet (wallet_id),
+    CONSTRAINT fk_wallet_tx_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE drivers (
+    driver_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    vehicle_type ENUM('sedan', 'suv') NOT NULL,
+    vehicle_plate VARCHAR(20) NOT NULL,
+    vehicle_model VARCHAR(50) NOT NULL,
+    rating DECIMAL(3, 2) NOT NULL DEFAULT 5.00,
+    driver_status ENUM('available', 'busy', 'offline') NOT NULL DEFAULT 'offline',
+    verification_status ENUM('pending', 'verified', 'rejected') NOT NULL DEFAULT 'pending',
+    -- get_available_drivers: equality on status/type/verification, ORDER BY rating DESC LIMIT 5
+    KEY idx_drivers_dispatch (driver_status, vehicle_type, verification_status, rating),
+    UNIQUE KEY uq_drivers_user (user_id),
+    CONSTRAINT fk_drivers_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE rides (
+    ride_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    ride_code VARCHAR(20) NOT NULL,
+    passenger_id INT NOT NULL,
+    driver_id INT NULL,
+    ride_type ENUM('sedan', 'suv') NOT NULL,
+    pickup_latitude DECIMAL(9, 6) NOT NULL,
+    pickup_longitude DECIMAL(9, 6) NOT NULL,
+    pickup_address VARCHAR(255) NULL,
+    destination_latitude DECIMAL(9, 6) NOT NULL,
+    destination_longitude DECIMAL(9, 6) NOT NULL,
+    destination_address VARCHAR(255) NULL,
+    distance_km DECIMAL(8, 2) NOT NULL,
+    base_fare DECIMAL(10, 2) NOT NULL,
+    distance_fare DECIMAL(10, 2) NOT NULL,
+    final_fare DECIMAL(10, 2) NOT NULL,
+    payment_method ENUM('cash', 'visa', 'wallet') NOT NULL,
+    ride_status ENUM('pending', 'accepted', 'in_progress', 'completed', 'cancelled') NOT NULL DEFAULT 'pending',
+    booking_time DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    end_time DATETIME NULL,
+    rating TINYINT NULL,
+    review_comment VARCHAR(500) NULL,
+    -- get_user_rides: WHERE passenger_id ORDER BY booking_time DESC LIMIT n
+    KEY idx_rides_passenger_booking (passenger_id, booking_time),
+    KEY idx_rides_driver (driver_id),
+    CONSTRAINT fk_rides_passenger FOREIGN KEY (passenger_id) REFERENCES users (user_id),
+    CONSTRAINT fk_rides_driver FOREIGN KEY (driver_id) REFERENCES drivers (driver_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE vouchers (
+    voucher_id INT AUTO_INCREMENT PRIMARY KEY,
+    voucher_code VARCHAR(30) NOT NULL,
+    voucher_type ENUM('percentage', 'fixed') NOT NULL,
+    discount_value DECIMAL(10, 2) NOT NULL,
+    min_fare DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    max_discount DECIMAL(10, 2) NULL,
+    usage_limit INT NOT NULL DEFAULT 1,
+    description VARCHAR(255) NULL,
+    voucher_status ENUM('active', 'inactive') NOT NULL DEFAULT 'active',
+    expiry_date DATE NOT NULL,
+    -- validate_voucher, use_voucher, assign_voucher_to_user, issue_voucher_campaign
+    UNIQUE KEY uq_vouchers_code (voucher_code)
+) ENGINE=InnoDB;
+
+CREATE TABLE user_vouchers (
+    user_voucher_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    voucher_id INT NOT NULL,
+    times_used INT NOT NULL DEFAULT 0,
+    date_claimed DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used DATETIME NULL,
+    -- get_user_vouchers / validate_voucher joins, use_voucher update, ON DUPLICATE KEY target
+    UNIQUE KEY uq_user_vouchers (user_id, voucher_id),
+    KEY idx_user_vouchers_voucher (voucher_id),
+    CONSTRAINT fk_user_vouchers_user FOREIGN KEY (user_id) REFERENCES users (user_id),
+    CONSTRAINT fk_user_vouchers_voucher FOREIGN KEY (voucher_id) REFERENCES vouchers (voucher_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE ride_vouchers (
+    ride_voucher_id INT AUTO_INCREMENT PRIMARY KEY,
+    ride_id BIGINT NOT NULL,
+    voucher_id INT NOT NULL,
+    discount_applied DECIMAL(10, 2) NOT NULL,
+    KEY idx_ride_vouchers_ride (ride_id),
+    CONSTRAINT fk_ride_vouchers_ride FOREIGN KEY (ride_id) REFERENCES rides (ride_id),
+    CONSTRAINT fk_ride_vouchers_voucher FOREIGN KEY (voucher_id) REFERENCES vouchers (voucher_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE notifications (
+    notification_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    notification_type ENUM('ride', 'payment', 'promo', 'rating', 'system') NOT NULL DEFAULT 'system',
+    title VARCHAR(100) NOT NULL,
+    message VARCHAR(500) NOT NULL,
+    is_read BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- get_user_notifications: WHERE user_id ORDER BY created_at DESC LIMIT n
+    KEY idx_notifications_user_created (user_id, created_at),
+    -- get_notifications_since: WHERE user_id AND notification_id > last seen
+    KEY idx_notifications_user_id (user_id, notification_id),
+    -- get_unread_notification_count / mark_notifications_read
+    KEY idx_notifications_user_unread (user_id, is_read),
+    CONSTRAINT fk_notifications_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
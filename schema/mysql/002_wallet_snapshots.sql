@@ -0,0 +1,21 @@
+-- 002_wallet_snapshots.sql - Wallet ledger snapshots (MySQL / MariaDB)
+--
+-- In ledger mode (config.WALLET_LEDGER_MODE) a wallet's balance is its
+-- snapshot plus the wallet_transactions postings after last_transaction_id,
+-- read through idx_wallet_tx_wallet (wallet_id, transaction_id).
+-- wallet_snapshotter.py moves snapshots forward.
+
+CREATE TABLE wallet_snapshots (
+    wallet_id INT PRIMARY KEY,
+    balance DECIMAL(12, 2) NOT NULL,
+    last_transaction_id BIGINT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_wallet_snapshots_wallet FOREIGN KEY (wallet_id) REFERENCES wallet (wallet_id)
+) ENGINE=InnoDB;
+
+-- Start every wallet from its current balance
+INSERT INTO wallet_snapshots (wallet_id, balance, last_transaction_id)
+SELECT w.wallet_id, w.balance, COALESCE(MAX(t.transaction_id), 0)
+FROM wallet w
+LEFT JOIN wallet_transactions t ON t.wallet_id = w.wallet_id
+GROUP BY w.wallet_id, w.balance;
@@ -0,0 +1,9 @@
+-- 003_export_indexes.sql - Date-ordered indexes for export_data.py (MySQL / MariaDB)
+--
+-- export_rides / export_wallet_transactions page through a date range with a
+-- (date, id) keyset: WHERE date >= last date AND date < end AND (date, id) > last
+-- row ORDER BY date, id.
+-- InnoDB appends the primary key to secondary indexes, so these cover the id too.
+
+CREATE INDEX idx_rides_booking ON rides (booking_time);
+CREATE INDEX idx_wallet_tx_date ON wallet_transactions (transaction_date);
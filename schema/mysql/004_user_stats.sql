@@ -0,0 +1,25 @@
+-- 004_user_stats.sql - Per-user ride statistics rollup (MySQL / MariaDB)
+--
+-- One row per passenger, kept current by create_ride (rides_booked,
+-- last_ride_at) and complete_ride (rides_completed, total_spent, total_km),
+-- so get_user_stats is a primary key lookup instead of an aggregate over
+-- rides. rebuild_user_stats recomputes it from rides.
+
+CREATE TABLE user_stats (
+    user_id INT PRIMARY KEY,
+    rides_booked INT NOT NULL DEFAULT 0,
+    rides_completed INT NOT NULL DEFAULT 0,
+    total_spent DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_km DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    last_ride_at DATETIME NULL,
+    CONSTRAINT fk_user_stats_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+INSERT INTO user_stats (user_id, rides_booked, rides_completed, total_spent, total_km, last_ride_at)
+SELECT passenger_id, COUNT(*),
+       SUM(CASE WHEN ride_status = 'completed' THEN 1 ELSE 0 END),
+       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN final_fare END), 0),
+       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN distance_km END), 0),
+       MAX(booking_time)
+FROM rides
+GROUP BY passenger_id;
@@ -0,0 +1,14 @@
+-- 005_driver_locations.sql - Latest reported position of each driver (MySQL / MariaDB)
+--
+-- Written in batches by gps_ingest.py (save_driver_locations upserts on the
+-- primary key). No foreign key to drivers: a ping from an unknown driver must
+-- not fail the rest of its batch.
+
+CREATE TABLE driver_locations (
+    driver_id INT PRIMARY KEY,
+    latitude DECIMAL(9, 6) NOT NULL,
+    longitude DECIMAL(9, 6) NOT NULL,
+    heading SMALLINT NULL,
+    speed_kmh DECIMAL(5, 1) NULL,
+    recorded_at DATETIME NOT NULL
+) ENGINE=InnoDB;
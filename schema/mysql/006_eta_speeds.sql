@@ -0,0 +1,16 @@
+-- 006_eta_speeds.sql - Historical trip speeds for eta_model.py (MySQL / MariaDB)
+--
+-- Trips, km and minutes of completed rides per (origin zone, destination
+-- zone, hour of week); zone -1 and hour 168 hold the rollups used when a
+-- bucket has too few trips. complete_ride adds to it, eta_model.py --rebuild
+-- recomputes it. ETA lookups are primary key reads.
+
+CREATE TABLE eta_speeds (
+    origin_zone INT NOT NULL,
+    dest_zone INT NOT NULL,
+    hour_of_week SMALLINT NOT NULL,
+    trips INT NOT NULL DEFAULT 0,
+    total_km DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_minutes DECIMAL(12, 1) NOT NULL DEFAULT 0,
+    PRIMARY KEY (origin_zone, dest_zone, hour_of_week)
+) ENGINE=InnoDB;
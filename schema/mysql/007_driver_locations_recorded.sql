@@ -0,0 +1,6 @@
+-- 007_driver_locations_recorded.sql - Index for polling recent driver positions (MySQL / MariaDB)
+--
+-- The live driver overlay (driver_overlay.py) asks for the drivers that
+-- reported since its last poll.
+
+CREATE INDEX idx_driver_locations_recorded ON driver_locations (recorded_at);
@@ -0,0 +1,39 @@
+-- 008_user_places.sql - Saved places and frequent destinations per user (MySQL / MariaDB)
+--
+-- saved_places holds the places a rider named (Home, Work, ...).
+-- frequent_places counts a rider's destinations on a 0.001 degree grid
+-- (about 110 m), so repeated map clicks around the same spot share a row;
+-- create_ride adds to it and it keeps the latest address and coordinates.
+
+CREATE TABLE saved_places (
+    place_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    label VARCHAR(50) NOT NULL,
+    address VARCHAR(255) NULL,
+    latitude DECIMAL(9, 6) NOT NULL,
+    longitude DECIMAL(9, 6) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_saved_places_label (user_id, label),
+    CONSTRAINT fk_saved_places_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE frequent_places (
+    user_id INT NOT NULL,
+    cell_lat INT NOT NULL,
+    cell_lon INT NOT NULL,
+    latitude DECIMAL(9, 6) NOT NULL,
+    longitude DECIMAL(9, 6) NOT NULL,
+    address VARCHAR(255) NULL,
+    trips INT NOT NULL DEFAULT 0,
+    last_used_at DATETIME NULL,
+    PRIMARY KEY (user_id, cell_lat, cell_lon),
+    INDEX idx_frequent_places_trips (user_id, trips),
+    CONSTRAINT fk_frequent_places_user FOREIGN KEY (user_id) REFERENCES users (user_id)
+) ENGINE=InnoDB;
+
+INSERT INTO frequent_places (user_id, cell_lat, cell_lon, latitude, longitude, address, trips, last_used_at)
+SELECT passenger_id, ROUND(destination_latitude * 1000), ROUND(destination_longitude * 1000),
+       MAX(destination_latitude), MAX(destination_longitude), MAX(destination_address),
+       COUNT(*), MAX(booking_time)
+FROM rides
+GROUP BY passenger_id, ROUND(destination_latitude * 1000), ROUND(destination_longitude * 1000);
@@ -0,0 +1,14 @@
+-- 009_scheduled_rides.sql - Rides booked for a later pickup time (MySQL / MariaDB)
+--
+-- A reservation is a ride in status 'scheduled' with its pickup_time.
+-- ride_scheduler.py moves it to 'pending' (dispatch) RESERVATION_LEAD_MINUTES
+-- before pickup_time and reloads the upcoming ones after a restart with a
+-- range scan of idx_rides_status_pickup: ride_status = 'scheduled' AND
+-- pickup_time in [from, until) ORDER BY pickup_time, ride_id.
+
+ALTER TABLE rides
+    MODIFY ride_status ENUM('scheduled', 'pending', 'accepted', 'in_progress', 'completed', 'cancelled')
+        NOT NULL DEFAULT 'pending',
+    ADD COLUMN pickup_time DATETIME NULL AFTER booking_time;
+
+CREATE INDEX idx_rides_status_pickup ON rides (ride_status, pickup_time);
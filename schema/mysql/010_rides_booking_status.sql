@@ -0,0 +1,10 @@
+-- 010_rides_booking_status.sql - Recently booked reservations (MySQL / MariaDB)
+--
+-- ride_scheduler.py looks for reservations booked since its previous check:
+-- booking_time >= since AND ride_status = 'scheduled'. With both columns in
+-- one index that is a short booking_time range whose rows are filtered in the
+-- index, however many reservations idx_rides_status_pickup holds.
+-- get_recent_reservations names it in an index hint. idx_rides_booking stays
+-- for the (booking_time, ride_id) keyset order of the exports.
+
+CREATE INDEX idx_rides_booking_status ON rides (booking_time, ride_status);
@@ -0,0 +1,16 @@
+-- 011_driver_locations_updated.sql - Server time of each driver position write (MySQL / MariaDB)
+--
+-- recorded_at is the phone's clock, which can run behind or jump. The live
+-- driver overlay (driver_overlay.py) polls on updated_at instead, the
+-- database's own time of the write that save_driver_locations stamps, so a
+-- driver with a slow clock is still picked up by the next poll.
+-- idx_driver_locations_updated replaces idx_driver_locations_recorded.
+
+ALTER TABLE driver_locations
+    ADD COLUMN updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP AFTER recorded_at;
+
+UPDATE driver_locations SET updated_at = recorded_at;
+
+DROP INDEX idx_driver_locations_recorded ON driver_locations;
+
+CREATE INDEX idx_driver_locations_updated ON driver_locations (updated_at);
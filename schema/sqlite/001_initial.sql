@@ -0,0 +1,129 @@
+-- 001_initial.sql - QuickCab base schema (SQLite)
+--
+-- Mirrors schema/mysql/001_initial.sql. ENUM columns become TEXT with CHECK
+-- constraints and timestamps default to local time like MySQL's NOW().
+
+CREATE TABLE users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    phone_number TEXT NULL,
+    user_type TEXT NOT NULL DEFAULT 'passenger' CHECK (user_type IN ('passenger', 'driver', 'admin')),
+    account_status TEXT NOT NULL DEFAULT 'active' CHECK (account_status IN ('active', 'suspended', 'deleted')),
+    date_registered TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    last_login TEXT NULL
+);
+CREATE UNIQUE INDEX uq_users_username ON users (username);
+CREATE UNIQUE INDEX uq_users_email ON users (email);
+CREATE INDEX idx_users_status_login ON users (account_status, last_login);
+
+CREATE TABLE wallet (
+    wallet_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    balance NUMERIC NOT NULL DEFAULT 0.00,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX uq_wallet_user ON wallet (user_id);
+
+CREATE TABLE wallet_transactions (
+    transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    wallet_id INTEGER NOT NULL REFERENCES wallet (wallet_id),
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    transaction_type TEXT NOT NULL CHECK (transaction_type IN ('deposit', 'withdrawal')),
+    amount NUMERIC NOT NULL,
+    balance_before NUMERIC NOT NULL,
+    balance_after NUMERIC NOT NULL,
+    description TEXT NULL,
+    transaction_date TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX idx_wallet_tx_user_date ON wallet_transactions (user_id, transaction_date);
+CREATE INDEX idx_wallet_tx_wallet ON wallet_transactions (wallet_id, transaction_id);
+
+CREATE TABLE drivers (
+    driver_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    vehicle_type TEXT NOT NULL CHECK (vehicle_type IN ('sedan', 'suv')),
+    vehicle_plate TEXT NOT NULL,
+    vehicle_model TEXT NOT NULL,
+    rating NUMERIC NOT NULL DEFAULT 5.00,
+    driver_status TEXT NOT NULL DEFAULT 'offline' CHECK (driver_status IN ('available', 'busy', 'offline')),
+    verification_status TEXT NOT NULL DEFAULT 'pending' CHECK (verification_status IN ('pending', 'verified', 'rejected'))
+);
+CREATE INDEX idx_drivers_dispatch ON drivers (driver_status, vehicle_type, verification_status, rating);
+CREATE UNIQUE INDEX uq_drivers_user ON drivers (user_id);
+
+CREATE TABLE rides (
+    ride_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ride_code TEXT NOT NULL,
+    passenger_id INTEGER NOT NULL REFERENCES users (user_id),
+    driver_id INTEGER NULL REFERENCES drivers (driver_id),
+    ride_type TEXT NOT NULL CHECK (ride_type IN ('sedan', 'suv')),
+    pickup_latitude REAL NOT NULL,
+    pickup_longitude REAL NOT NULL,
+    pickup_address TEXT NULL,
+    destination_latitude REAL NOT NULL,
+    destination_longitude REAL NOT NULL,
+    destination_address TEXT NULL,
+    distance_km REAL NOT NULL,
+    base_fare NUMERIC NOT NULL,
+    distance_fare NUMERIC NOT NULL,
+    final_fare NUMERIC NOT NULL,
+    payment_method TEXT NOT NULL CHECK (payment_method IN ('cash', 'visa', 'wallet')),
+    ride_status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (ride_status IN ('pending', 'accepted', 'in_progress', 'completed', 'cancelled')),
+    booking_time TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    end_time TEXT NULL,
+    rating INTEGER NULL,
+    review_comment TEXT NULL
+);
+CREATE INDEX idx_rides_passenger_booking ON rides (passenger_id, booking_time);
+CREATE INDEX idx_rides_driver ON rides (driver_id);
+
+CREATE TABLE vouchers (
+    voucher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    voucher_code TEXT NOT NULL,
+    voucher_type TEXT NOT NULL CHECK (voucher_type IN ('percentage', 'fixed')),
+    discount_value NUMERIC NOT NULL,
+    min_fare NUMERIC NOT NULL DEFAULT 0.00,
+    max_discount NUMERIC NULL,
+    usage_limit INTEGER NOT NULL DEFAULT 1,
+    description TEXT NULL,
+    voucher_status TEXT NOT NULL DEFAULT 'active' CHECK (voucher_status IN ('active', 'inactive')),
+    expiry_date TEXT NOT NULL
+);
+CREATE UNIQUE INDEX uq_vouchers_code ON vouchers (voucher_code);
+
+CREATE TABLE user_vouchers (
+    user_voucher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    voucher_id INTEGER NOT NULL REFERENCES vouchers (voucher_id),
+    times_used INTEGER NOT NULL DEFAULT 0,
+    date_claimed TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    last_used TEXT NULL
+);
+CREATE UNIQUE INDEX uq_user_vouchers ON user_vouchers (user_id, voucher_id);
+CREATE INDEX idx_user_vouchers_voucher ON user_vouchers (voucher_id);
+
+CREATE TABLE ride_vouchers (
+    ride_voucher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ride_id INTEGER NOT NULL REFERENCES rides (ride_id),
+    voucher_id INTEGER NOT NULL REFERENCES vouchers (voucher_id),
+    discount_applied NUMERIC NOT NULL
+);
+CREATE INDEX idx_ride_vouchers_ride ON ride_vouchers (ride_id);
+
+CREATE TABLE notifications (
+    notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    notification_type TEXT NOT NULL DEFAULT 'system'
+        CHECK (notification_type IN ('ride', 'payment', 'promo', 'rating', 'system')),
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    is_read INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX idx_notifications_user_created ON notifications (user_id, created_at);
+CREATE INDEX idx_notifications_user_id ON notifications (user_id, notification_id);
+CREATE INDEX idx_notifications_user_unread ON notifications (user_id, is_read);
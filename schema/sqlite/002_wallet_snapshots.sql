@@ -0,0 +1,17 @@
+-- 002_wallet_snapshots.sql - Wallet ledger snapshots (SQLite)
+--
+-- Mirrors schema/mysql/002_wallet_snapshots.sql.
+
+CREATE TABLE wallet_snapshots (
+    wallet_id INTEGER PRIMARY KEY REFERENCES wallet (wallet_id),
+    balance NUMERIC NOT NULL,
+    last_transaction_id INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Start every wallet from its current balance
+INSERT INTO wallet_snapshots (wallet_id, balance, last_transaction_id)
+SELECT w.wallet_id, w.balance, COALESCE(MAX(t.transaction_id), 0)
+FROM wallet w
+LEFT JOIN wallet_transactions t ON t.wallet_id = w.wallet_id
+GROUP BY w.wallet_id, w.balance;
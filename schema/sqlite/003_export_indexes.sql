@@ -0,0 +1,7 @@
+-- 003_export_indexes.sql - Date-ordered indexes for export_data.py (SQLite)
+--
+-- Mirrors schema/mysql/003_export_indexes.sql. SQLite index entries end
+-- with the rowid, which is the INTEGER PRIMARY KEY.
+
+CREATE INDEX idx_rides_booking ON rides (booking_time);
+CREATE INDEX idx_wallet_tx_date ON wallet_transactions (transaction_date);
@@ -0,0 +1,21 @@
+-- 004_user_stats.sql - Per-user ride statistics rollup (SQLite)
+--
+-- Mirrors schema/mysql/004_user_stats.sql.
+
+CREATE TABLE user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users (user_id),
+    rides_booked INTEGER NOT NULL DEFAULT 0,
+    rides_completed INTEGER NOT NULL DEFAULT 0,
+    total_spent NUMERIC NOT NULL DEFAULT 0,
+    total_km NUMERIC NOT NULL DEFAULT 0,
+    last_ride_at TEXT NULL
+);
+
+INSERT INTO user_stats (user_id, rides_booked, rides_completed, total_spent, total_km, last_ride_at)
+SELECT passenger_id, COUNT(*),
+       SUM(CASE WHEN ride_status = 'completed' THEN 1 ELSE 0 END),
+       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN final_fare END), 0),
+       COALESCE(SUM(CASE WHEN ride_status = 'completed' THEN distance_km END), 0),
+       MAX(booking_time)
+FROM rides
+GROUP BY passenger_id;
@@ -0,0 +1,12 @@
+-- 005_driver_locations.sql - Latest reported position of each driver (SQLite)
+--
+-- Mirrors schema/mysql/005_driver_locations.sql.
+
+CREATE TABLE driver_locations (
+    driver_id INTEGER PRIMARY KEY,
+    latitude NUMERIC NOT NULL,
+    longitude NUMERIC NOT NULL,
+    heading INTEGER NULL,
+    speed_kmh NUMERIC NULL,
+    recorded_at TEXT NOT NULL
+);
@@ -0,0 +1,13 @@
+-- 006_eta_speeds.sql - Historical trip speeds for eta_model.py (SQLite)
+--
+-- Mirrors schema/mysql/006_eta_speeds.sql.
+
+CREATE TABLE eta_speeds (
+    origin_zone INTEGER NOT NULL,
+    dest_zone INTEGER NOT NULL,
+    hour_of_week INTEGER NOT NULL,
+    trips INTEGER NOT NULL DEFAULT 0,
+    total_km NUMERIC NOT NULL DEFAULT 0,
+    total_minutes NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (origin_zone, dest_zone, hour_of_week)
+) WITHOUT ROWID;
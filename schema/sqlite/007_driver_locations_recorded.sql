@@ -0,0 +1,5 @@
+-- 007_driver_locations_recorded.sql - Index for polling recent driver positions (SQLite)
+--
+-- Mirrors schema/mysql/007_driver_locations_recorded.sql.
+
+CREATE INDEX idx_driver_locations_recorded ON driver_locations (recorded_at);
@@ -0,0 +1,37 @@
+-- 008_user_places.sql - Saved places and frequent destinations per user (SQLite)
+--
+-- Mirrors schema/mysql/008_user_places.sql.
+
+CREATE TABLE saved_places (
+    place_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    label TEXT NOT NULL,
+    address TEXT NULL,
+    latitude NUMERIC NOT NULL,
+    longitude NUMERIC NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, label)
+);
+
+CREATE TABLE frequent_places (
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    cell_lat INTEGER NOT NULL,
+    cell_lon INTEGER NOT NULL,
+    latitude NUMERIC NOT NULL,
+    longitude NUMERIC NOT NULL,
+    address TEXT NULL,
+    trips INTEGER NOT NULL DEFAULT 0,
+    last_used_at TEXT NULL,
+    PRIMARY KEY (user_id, cell_lat, cell_lon)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_frequent_places_trips ON frequent_places (user_id, trips);
+
+INSERT INTO frequent_places (user_id, cell_lat, cell_lon, latitude, longitude, address, trips, last_used_at)
+SELECT passenger_id, CAST(ROUND(destination_latitude * 1000) AS INTEGER),
+       CAST(ROUND(destination_longitude * 1000) AS INTEGER),
+       MAX(destination_latitude), MAX(destination_longitude), MAX(destination_address),
+       COUNT(*), MAX(booking_time)
+FROM rides
+GROUP BY passenger_id, CAST(ROUND(destination_latitude * 1000) AS INTEGER),
+         CAST(ROUND(destination_longitude * 1000) AS INTEGER);
@@ -0,0 +1,51 @@
+-- 009_scheduled_rides.sql - Rides booked for a later pickup time (SQLite)
+--
+-- Mirrors schema/mysql/009_scheduled_rides.sql. SQLite cannot change the
+-- ride_status CHECK constraint in place, so rides is rebuilt with foreign
+-- keys off (the backend turns them back on after migrating).
+
+PRAGMA foreign_keys = OFF;
+
+CREATE TABLE rides_new (
+    ride_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ride_code TEXT NOT NULL,
+    passenger_id INTEGER NOT NULL REFERENCES users (user_id),
+    driver_id INTEGER NULL REFERENCES drivers (driver_id),
+    ride_type TEXT NOT NULL CHECK (ride_type IN ('sedan', 'suv')),
+    pickup_latitude REAL NOT NULL,
+    pickup_longitude REAL NOT NULL,
+    pickup_address TEXT NULL,
+    destination_latitude REAL NOT NULL,
+    destination_longitude REAL NOT NULL,
+    destination_address TEXT NULL,
+    distance_km REAL NOT NULL,
+    base_fare NUMERIC NOT NULL,
+    distance_fare NUMERIC NOT NULL,
+    final_fare NUMERIC NOT NULL,
+    payment_method TEXT NOT NULL CHECK (payment_method IN ('cash', 'visa', 'wallet')),
+    ride_status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (ride_status IN ('scheduled', 'pending', 'accepted', 'in_progress', 'completed', 'cancelled')),
+    booking_time TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    pickup_time TEXT NULL,
+    end_time TEXT NULL,
+    rating INTEGER NULL,
+    review_comment TEXT NULL
+);
+
+INSERT INTO rides_new (ride_id, ride_code, passenger_id, driver_id, ride_type, pickup_latitude, pickup_longitude,
+                       pickup_address, destination_latitude, destination_longitude, destination_address,
+                       distance_km, base_fare, distance_fare, final_fare, payment_method, ride_status,
+                       booking_time, end_time, rating, review_comment)
+SELECT ride_id, ride_code, passenger_id, driver_id, ride_type, pickup_latitude, pickup_longitude,
+       pickup_address, destination_latitude, destination_longitude, destination_address,
+       distance_km, base_fare, distance_fare, final_fare, payment_method, ride_status,
+       booking_time, end_time, rating, review_comment
+FROM rides;
+
+DROP TABLE rides;
+ALTER TABLE rides_new RENAME TO rides;
+
+CREATE INDEX idx_rides_passenger_booking ON rides (passenger_id, booking_time);
+CREATE INDEX idx_rides_driver ON rides (driver_id);
+CREATE INDEX idx_rides_booking ON rides (booking_time);
+CREATE INDEX idx_rides_status_pickup ON rides (ride_status, pickup_time);
@@ -0,0 +1,5 @@
+-- 010_rides_booking_status.sql - Recently booked reservations (SQLite)
+--
+-- Mirrors schema/mysql/010_rides_booking_status.sql.
+
+CREATE INDEX idx_rides_booking_status ON rides (booking_time, ride_status);
@@ -0,0 +1,12 @@
+-- 011_driver_locations_updated.sql - Server time of each driver position write (SQLite)
+--
+-- Mirrors schema/mysql/011_driver_locations_updated.sql. SQLite cannot add a
+-- column defaulting to CURRENT_TIMESTAMP, so existing rows are backfilled.
+
+ALTER TABLE driver_locations ADD COLUMN updated_at TEXT NOT NULL DEFAULT '1970-01-01 00:00:00';
+
+UPDATE driver_locations SET updated_at = recorded_at;
+
+DROP INDEX idx_driver_locations_recorded;
+
+CREATE INDEX idx_driver_locations_updated ON driver_locations (updated_at);
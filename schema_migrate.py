@@ -0,0 +1,159 @@
+# schema_migrate.py - Versioned Database Schema Migrations
+
+import glob
+import os
+import re
+import sys
+import mysql.connector
+from mysql.connector import Error
+import config
+
+SCHEMA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema")
+
+def migration_files(dialect='mysql'):
+    """List (version, path) of every migration for a dialect, oldest first"""
+    migrations = []
+    
+    for path in glob.glob(os.path.join(SCHEMA_FOLDER, dialect, "*.sql")):
+        match = re.match(r'(\d+)_', os.path.basename(path))
+        if match:
+            migrations.append((int(match.group(1)), path))
+    
+    return sorted(migrations)
+
+# Words after END that close a block BEGIN/CASE did not open
+END_OF_UNCOUNTED_BLOCK = {'IF', 'WHILE', 'LOOP', 'REPEAT'}
+
+def split_statements(sql):
+    """Split a migration file into statements, dropping comments
+    
+    A ";" ends a statement only outside quotes, comments and BEGIN ... END
+    (trigger and procedure bodies) or CASE ... END blocks, so a semicolon in
+    a string default or a multi-statement trigger stays where it is.
+    """
+    statements = []
+    current = []
+    depth = 0
+    last_word = None
+    i = 0
+    length = len(sql)
+    
+    while i < length:
+        char = sql[i]
+        
+        if char in "'\"`":
+            # Quoted string or identifier; a doubled or backslashed quote does not end it
+            end = i + 1
+            while end < length:
+                if sql[end] == '\\' and char != '`':
+                    end += 2
+                    continue
+                if sql[end] == char:
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+            continue
+        
+        if sql.startswith('--', i) or char == '#':
+            end = sql.find('\n', i)
+            i = length if end == -1 else end
+            current.append(' ')
+            continue
+        
+        if sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            current.append(' ')
+            continue
+        
+        if char.isalpha() or char == '_':
+            end = i
+            while end < length and (sql[end].isalnum() or sql[end] in '_$'):
+                end += 1
+            word = sql[i:end].upper()
+            if word == 'CASE' and last_word != 'END':
+                depth += 1
+            elif word == 'BEGIN':
+                following = sql[end:].lstrip()[:11].upper()
+                if not following.startswith((';', 'TRANSACTION', 'WORK')):
+                    depth += 1
+            elif word in END_OF_UNCOUNTED_BLOCK and last_word == 'END':
+                # END IF and the like: undo the END counted for it
+                depth += 1
+            if word == 'END':
+                depth = max(depth - 1, 0)
+            last_word = word
+            current.append(sql[i:end])
+            i = end
+            continue
+        
+        if char == ';' and depth == 0:
+            statements.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+        if not char.isspace():
+            last_word = None
+        i += 1
+    
+    statements.append("".join(current))
+    return [statement.strip() for statement in statements if statement.strip()]
+
+def apply_migrations(connection, dialect='mysql', placeholder='%s'):
+    """Apply every migration newer than the database's schema version"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    cursor.execute("SELECT version FROM schema_version")
+    applied = {row[0] for row in cursor.fetchall()}
+    
+    newly_applied = []
+    for version, path in migration_files(dialect):
+        if version in applied:
+            continue
+        
+        with open(path, encoding='utf-8') as f:
+            for statement in split_statements(f.read()):
+                cursor.execute(statement)
+        
+        cursor.execute(f"INSERT INTO schema_version (version) VALUES ({placeholder})", (version,))
+        connection.commit()
+        newly_applied.append(version)
+    
+    cursor.close()
+    return newly_applied
+
+def main():
+    """Bring the configured database up to the latest schema version"""
+    try:
+        connection = mysql.connector.connect(
+            host=config.DB_HOST,
+            database=config.DB_NAME,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            port=config.DB_PORT
+        )
+    except Error as e:
+        print(f"Could not connect to {config.DB_NAME}: {e}")
+        return 1
+    
+    applied = apply_migrations(connection)
+    connection.close()
+    
+    if applied:
+        print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    else:
+        print("Schema is up to date")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# screen_loader.py - Asynchronous Data Loading for Screens
+
+import tkinter as tk
+from tkinter import Canvas
+import config
+from functions import create_rounded_rect_points
+from local_cache import local_cache
+from task_runner import task_runner
+
+class ScreenDataLoader:
+    """Fetches a screen's data on the worker pool while the screen shows a skeleton
+    
+    With a cache_key the last successful result for the current user is shown
+    straight away from the local cache and replaced once fresh data arrives.
+    fetch returns None when the data could not be loaded.
+    """
+    
+    def __init__(self, container, fetch, on_loaded, cache_key=None, timeout_ms=None,
+                 skeleton_rows=4, bg="#D2D2DF"):
+        self.container = container
+        self.fetch = fetch
+        self.on_loaded = on_loaded
+        self.cache_key = cache_key
+        self.timeout_ms = timeout_ms or config.SCREEN_LOAD_TIMEOUT_MS
+        self.skeleton_rows = skeleton_rows
+        self.bg = bg
+        
+        self.task = None
+        self.timeout_job = None
+        self.placeholder = None
+        self.cached_data = None
+        
+        # Closing the screen cancels the fetch and its timeout
+        self.container.bind("<Destroy>", self.on_destroy, add="+")
+    
+    def load(self):
+        """Show cached data or the skeleton, then start fetching"""
+        self.cancel()
+        
+        if self.cache_key:
+            self.cached_data = local_cache.get(config.CURRENT_USER_ID, self.cache_key)
+        
+        if self.cached_data is not None:
+            self.clear_placeholder()
+            self.on_loaded(self.cached_data)
+        else:
+            self.show_skeleton()
+        
+        self.task = task_runner.submit(
+            self.container, self.fetch,
+            on_success=self.handle_result, on_error=self.handle_error
+        )
+        self.timeout_job = self.container.after(self.timeout_ms, self.handle_timeout)
+        return self
+    
+    def cancel(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self.timeout_job:
+            try:
+                self.container.after_cancel(self.timeout_job)
+            except tk.TclError:
+                pass
+            self.timeout_job = None
+    
+    def on_destroy(self, event):
+        if event.widget is self.container:
+            self.cancel()
+    
+    def handle_result(self, data):
+        self.cancel()
+        
+        if data is None:
+            self.handle_error(None)
+            return
+        
+        if self.cache_key:
+            local_cache.put(config.CURRENT_USER_ID, self.cache_key, data)
+        
+        if data == self.cached_data:
+            return
+        
+        self.cached_data = data
+        self.clear_placeholder()
+        self.on_loaded(data)
+    
+    def handle_error(self, error):
+        """Keep showing cached data if there is any, otherwise show the error state"""
+        self.cancel()
+        if self.cached_data is None and self.container.winfo_exists():
+            self.show_error("Could not load your data.")
+    
+    def handle_timeout(self):
+        self.timeout_job = None
+        if not self.container.winfo_exists():
+            return
+        if self.task and self.task.running:
+            self.cancel()
+            if self.cached_data is None:
+                self.show_error("This is taking longer than usual.")
+    
+    def show_skeleton(self):
+        """Grey placeholder cards shown until the data arrives"""
+        self.clear_placeholder()
+        self.placeholder = tk.Frame(self.container, bg=self.bg)
+        self.placeholder.pack(fill="x")
+        
+        for _ in range(self.skeleton_rows):
+            card = Canvas(self.placeholder, width=370, height=85, bg=self.bg, highlightthickness=0)
+            card.pack(pady=8)
+            card.create_polygon(create_rounded_rect_points(0, 0, 365, 80, 15),
+                                smooth=True, fill="#E4E4EC", outline="")
+            card.create_polygon(create_rounded_rect_points(20, 18, 220, 32, 6),
+                                smooth=True, fill="#D0D0DA", outline="")
+            card.create_polygon(create_rounded_rect_points(20, 45, 140, 60, 6),
+                                smooth=True, fill="#D0D0DA", outline="")
+    
+    def show_error(self, message):
+        """Error state with a retry button"""
+        self.clear_placeholder()
+        self.placeholder = tk.Frame(self.container, bg=self.bg)
+        self.placeholder.pack(fill="x", pady=80)
+        
+        tk.Label(self.placeholder, text="⚠️", font=("Arial", 40),
+                bg=self.bg).pack()
+        tk.Label(self.placeholder, text=message, font=("Arial", 13),
+                bg=self.bg, fg="#666").pack(pady=(10, 15))
+        tk.Button(self.placeholder, text="Try Again", font=("Arial", 12, "bold"),
+                 bg=config.PRIMARY_COLOR, fg="white", border=0, relief="flat",
+                 cursor="hand2", width=12, height=1, command=self.load).pack()
+    
+    def clear_placeholder(self):
+        if self.placeholder:
+            self.placeholder.destroy()
+            self.placeholder = None
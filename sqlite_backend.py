@@ -0,0 +1,253 @@
+# sqlite_backend.py - Embedded SQLite Storage Backend
+
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from mysql.connector import Error
+from database_manager import DatabaseManager
+from query_stats import instrument_cursor
+from schema_migrate import apply_migrations
+import config
+
+# MySQL DATE_FORMAT specifiers used by DatabaseManager and their strftime equivalents
+DATE_FORMAT_CODES = {
+    '%d': '%d', '%m': '%m', '%Y': '%Y', '%y': '%y', '%b': '%b', '%M': '%B',
+    '%H': '%H', '%h': '%I', '%i': '%M', '%S': '%S', '%p': '%p'
+}
+
+# Unique key each "ON DUPLICATE KEY UPDATE" upsert conflicts on, by table
+UPSERT_KEYS = {
+    'user_vouchers': 'user_id, voucher_id',
+    'wallet_snapshots': 'wallet_id',
+    'user_stats': 'user_id',
+    'driver_locations': 'driver_id',
+    'eta_speeds': 'origin_zone, dest_zone, hour_of_week',
+    'saved_places': 'user_id, label',
+    'frequent_places': 'user_id, cell_lat, cell_lon'
+}
+
+# Names of in-memory databases; id(self) can be reused while an earlier one is still open
+_memory_database_ids = itertools.count(1)
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def _curdate():
+    return date.today().isoformat()
+
+def _date_format(value, mysql_format):
+    """MySQL DATE_FORMAT() for the text timestamps SQLite stores"""
+    if value is None:
+        return None
+    
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    
+    strftime_format = re.sub(r'%[a-zA-Z]', lambda m: DATE_FORMAT_CODES.get(m.group(0), m.group(0)), mysql_format)
+    return moment.strftime(strftime_format)
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+@lru_cache(maxsize=512)
+def translate_sql(query):
+    """Rewrite a DatabaseManager query into SQLite's dialect
+    
+    Placeholders become "?", ON DUPLICATE KEY UPDATE becomes an ON CONFLICT
+    upsert and a FORCE INDEX (name) hint becomes INDEXED BY name. A trailing
+    FOR UPDATE is dropped; SQLiteCursor takes the database write lock for
+    those reads instead. NOW(), CURDATE() and DATE_FORMAT() are registered as
+    functions on every connection, so they are left alone. The result is
+    cached, so each query text is translated once and then hits SQLite's
+    per-connection statement cache as the same string.
+    """
+    match = re.search(r'ON DUPLICATE KEY UPDATE', query)
+    if match:
+        table = re.search(r'INSERT\s+INTO\s+(\w+)', query).group(1)
+        updates = re.sub(r'VALUES\((\w+)\)', r'excluded.\1', query[match.end():])
+        query = f"{query[:match.start()]}ON CONFLICT ({UPSERT_KEYS[table]}) DO UPDATE SET{updates}"
+    
+    query = re.sub(r'FORCE INDEX \((\w+)\)', r'INDEXED BY \1', query)
+    query = re.sub(r'\s+FOR UPDATE\s*$', '', query)
+    return query.replace('%s', '?')
+
+class SQLiteCursor:
+    """mysql.connector style dictionary cursor over a sqlite3 cursor"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+    
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    def execute(self, operation, params=()):
+        try:
+            if operation.rstrip().endswith('FOR UPDATE') and not self._cursor.connection.in_transaction:
+                # Lock out other writers until commit, like InnoDB's row lock
+                self._cursor.execute("BEGIN IMMEDIATE")
+            self._cursor.execute(translate_sql(operation), params or ())
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+    
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(translate_sql(operation), seq_params)
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+    
+    def fetchone(self):
+        return self._cursor.fetchone()
+    
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+    
+    def fetchall(self):
+        return self._cursor.fetchall()
+    
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """mysql.connector style connection over a sqlite3 connection"""
+    
+    def __init__(self, raw):
+        self.raw = raw
+    
+    @property
+    def in_transaction(self):
+        return self.raw is not None and self.raw.in_transaction
+    
+    def is_connected(self):
+        return self.raw is not None
+    
+    def cursor(self, dictionary=True):
+        return SQLiteCursor(self.raw.cursor())
+    
+    def commit(self):
+        try:
+            self.raw.commit()
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+    
+    def rollback(self):
+        try:
+            self.raw.rollback()
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+    
+    def close(self):
+        if self.raw is not None:
+            self.raw.close()
+            self.raw = None
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """SQLite storage backend
+    
+    Runs every DatabaseManager query unchanged through SQLiteCursor, which
+    translates the MySQL dialect. The file is opened in WAL mode so screens
+    keep reading while a background worker writes. Each thread keeps one
+    connection open between connect() and disconnect() calls, which keeps its
+    compiled statements (SQLite's prepared statement cache) warm. The schema
+    is migrated from schema/sqlite/ the first time the file is opened.
+    """
+    
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or config.SQLITE_PATH
+        self.schema_lock = threading.Lock()
+        self.schema_ready = False
+        self.keeper = None
+        
+        if self.path == ':memory:':
+            # A named shared-cache database, so every thread sees the same data
+            # for as long as the keeper connection stays open
+            self.uri = f"file:quickcab-{next(_memory_database_ids)}?mode=memory&cache=shared"
+        else:
+            self.uri = None
+    
+    def _open(self):
+        """Open and configure a connection for the current thread"""
+        if self.uri:
+            raw = sqlite3.connect(self.uri, uri=True, timeout=config.SQLITE_BUSY_TIMEOUT,
+                                  cached_statements=config.SQLITE_CACHED_STATEMENTS,
+                                  check_same_thread=False)
+        else:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            raw = sqlite3.connect(self.path, timeout=config.SQLITE_BUSY_TIMEOUT,
+                                  cached_statements=config.SQLITE_CACHED_STATEMENTS,
+                                  check_same_thread=False)
+            raw.execute("PRAGMA journal_mode = WAL")
+            raw.execute("PRAGMA synchronous = NORMAL")
+        
+        raw.create_function("NOW", 0, _now)
+        raw.create_function("CURDATE", 0, _curdate)
+        raw.create_function("DATE_FORMAT", 2, _date_format, deterministic=True)
+        
+        with self.schema_lock:
+            if self.uri and self.keeper is None:
+                self.keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            if not self.schema_ready:
+                apply_migrations(raw, dialect='sqlite', placeholder='?')
+                self.schema_ready = True
+        
+        # After migrating: a migration that rebuilds a table turns foreign keys off
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.row_factory = _dict_row
+        return raw
+    
+    def connect(self):
+        """Open this thread's connection, or reuse it if it is already open"""
+        try:
+            if not (self.connection and self.connection.is_connected()):
+                self.connection = SQLiteConnection(self._open())
+            
+            self.cursor = instrument_cursor(self.connection.cursor(dictionary=True))
+            return True
+        
+        except (sqlite3.Error, OSError):
+            return False
+    
+    def _statement_cursor(self, query_id, replica=False):
+        """SQLite caches compiled statements per connection by SQL text"""
+        return self.cursor
+    
+    def _use_replica(self, user_id=None):
+        """An embedded store has no replicas"""
+        return False
+    
+    def disconnect(self):
+        """Release the cursor; the connection stays open for this thread"""
+        if self.cursor:
+            self.cursor.close()
+            self.cursor = None
+        if self.connection and self.connection.in_transaction:
+            self.connection.rollback()
+    
+    def close(self):
+        """Close this thread's connection"""
+        self.disconnect()
+        if self.connection:
+            self.connection.close()
+            self.connection = None
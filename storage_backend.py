@@ -0,0 +1,217 @@
+# storage_backend.py - Storage Backend Interface
+
+from abc import ABC, abstractmethod
+
+class StorageBackend(ABC):
+    """Methods every QuickCab storage backend provides
+    
+    DatabaseManager implements them against MySQL and SQLiteDatabaseManager
+    against an embedded SQLite file. Pick one with config.DB_BACKEND; the rest
+    of the app only talks to this method set through database_manager.db.
+    """
+    
+    # CONNECTION
+    
+    @abstractmethod
+    def connect(self):
+        ...
+    
+    @abstractmethod
+    def disconnect(self):
+        ...
+    
+    # USER MANAGEMENT
+    
+    @abstractmethod
+    def authenticate_user(self, username, password):
+        ...
+    
+    @abstractmethod
+    def create_user(self, full_name, email, password, username=None, user_type='passenger'):
+        ...
+    
+    @abstractmethod
+    def get_user_info(self, user_id):
+        ...
+    
+    # WALLET MANAGEMENT
+    
+    @abstractmethod
+    def get_wallet_balance(self, user_id):
+        ...
+    
+    @abstractmethod
+    def add_wallet_funds(self, user_id, amount, description="Wallet top-up"):
+        ...
+    
+    @abstractmethod
+    def deduct_wallet_funds(self, user_id, amount, description="Payment"):
+        ...
+    
+    @abstractmethod
+    def get_transaction_history(self, user_id, limit=10):
+        ...
+    
+    @abstractmethod
+    def get_last_transaction_id(self):
+        ...
+    
+    @abstractmethod
+    def get_wallet_activity(self, after_id, up_to_id):
+        ...
+    
+    @abstractmethod
+    def snapshot_wallet(self, user_id):
+        ...
+    
+    @abstractmethod
+    def rebase_wallet_snapshots(self, chunk_size=None):
+        ...
+    
+    # RIDE MANAGEMENT
+    
+    @abstractmethod
+    def create_ride(self, passenger_id, ride_type, pickup_lat, pickup_lon, pickup_addr,
+                   dest_lat, dest_lon, dest_addr, distance_km, fare, payment_method, pickup_time=None):
+        ...
+    
+    @abstractmethod
+    def get_user_rides(self, user_id, limit=20):
+        ...
+    
+    @abstractmethod
+    def update_ride_status(self, ride_id, new_status):
+        ...
+    
+    @abstractmethod
+    def complete_ride(self, ride_id, rating=None, review=None):
+        ...
+    
+    @abstractmethod
+    def get_user_stats(self, user_id):
+        ...
+    
+    @abstractmethod
+    def rebuild_user_stats(self, chunk_size=None):
+        ...
+    
+    @abstractmethod
+    def get_eta_speeds(self, keys):
+        ...
+    
+    @abstractmethod
+    def get_completed_trips(self, after_id=0, limit=5000):
+        ...
+    
+    @abstractmethod
+    def replace_eta_speeds(self, rows):
+        ...
+    
+    @abstractmethod
+    def get_pickups(self, after=None, start=None, limit=None):
+        ...
+    
+    # SCHEDULED RIDES
+    
+    @abstractmethod
+    def get_scheduled_rides(self, after=None, until=None, limit=None):
+        ...
+    
+    @abstractmethod
+    def get_recent_reservations(self, booked_since):
+        ...
+    
+    @abstractmethod
+    def release_scheduled_rides(self, ride_ids, due_by):
+        ...
+    
+    # SAVED PLACES
+    
+    @abstractmethod
+    def get_saved_places(self, user_id):
+        ...
+    
+    @abstractmethod
+    def get_frequent_places(self, user_id, limit=None):
+        ...
+    
+    @abstractmethod
+    def save_place(self, user_id, label, address, latitude, longitude):
+        ...
+    
+    @abstractmethod
+    def delete_saved_place(self, user_id, label):
+        ...
+    
+    # VOUCHER MANAGEMENT
+    
+    @abstractmethod
+    def get_user_vouchers(self, user_id):
+        ...
+    
+    @abstractmethod
+    def validate_voucher(self, voucher_code, user_id, fare_amount):
+        ...
+    
+    @abstractmethod
+    def use_voucher(self, voucher_code, user_id, ride_id, discount_applied):
+        ...
+    
+    @abstractmethod
+    def assign_voucher_to_user(self, user_id, voucher_code):
+        ...
+    
+    @abstractmethod
+    def issue_voucher_campaign(self, voucher_code, segment='all', user_ids=None,
+                               last_login_since=None, chunk_size=None, on_progress=None):
+        ...
+    
+    # DRIVER MANAGEMENT
+    
+    @abstractmethod
+    def get_available_drivers(self, ride_type):
+        ...
+    
+    @abstractmethod
+    def save_driver_locations(self, locations):
+        ...
+    
+    @abstractmethod
+    def get_driver_locations(self, since):
+        ...
+    
+    # NOTIFICATIONS
+    
+    @abstractmethod
+    def create_notification(self, user_id, notification_type, title, message):
+        ...
+    
+    @abstractmethod
+    def create_notifications(self, notifications):
+        ...
+    
+    @abstractmethod
+    def get_user_notifications(self, user_id, limit=10):
+        ...
+    
+    @abstractmethod
+    def get_notifications_since(self, user_id, since_id=0, limit=20):
+        ...
+    
+    @abstractmethod
+    def get_unread_notification_count(self, user_id):
+        ...
+    
+    @abstractmethod
+    def mark_notifications_read(self, user_id, up_to_id=None):
+        ...
+    
+    # EXPORTS
+    
+    @abstractmethod
+    def export_rides(self, after=None, start=None, end=None, limit=None):
+        ...
+    
+    @abstractmethod
+    def export_wallet_transactions(self, after=None, start=None, end=None, limit=None):
+        ...
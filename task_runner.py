@@ -0,0 +1,76 @@
+# task_runner.py - Background Task Runner for the Tk GUI
+
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+import config
+
+class BackgroundTask:
+    """Handle for a call running on the worker pool"""
+    
+    def __init__(self, widget, future, on_success, on_error):
+        self.widget = widget
+        self.future = future
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.finished = False
+        
+        self._schedule_check()
+    
+    @property
+    def running(self):
+        return not (self.cancelled or self.finished)
+    
+    def cancel(self):
+        """Drop the result; the callbacks will not be called"""
+        self.cancelled = True
+        self.future.cancel()
+    
+    def _schedule_check(self):
+        try:
+            self.widget.after(config.TASK_POLL_INTERVAL_MS, self._check)
+        except tk.TclError:
+            self.cancel()
+    
+    def _check(self):
+        """Runs on the Tk main thread: deliver the result once it is ready"""
+        if self.cancelled:
+            return
+        
+        if not self.future.done():
+            self._schedule_check()
+            return
+        
+        self.finished = True
+        
+        try:
+            result = self.future.result()
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
+            return
+        
+        if self.on_success:
+            self.on_success(result)
+
+
+class TaskRunner:
+    """Runs blocking calls (database, network) off the Tk event loop"""
+    
+    def __init__(self, max_workers=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.TASK_WORKERS,
+            thread_name_prefix="quickcab-worker"
+        )
+    
+    def submit(self, widget, func, *args, on_success=None, on_error=None, **kwargs):
+        """Run func on a worker thread and hand its result back through widget.after"""
+        future = self.executor.submit(func, *args, **kwargs)
+        return BackgroundTask(widget, future, on_success, on_error)
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Create global instance
+task_runner = TaskRunner()
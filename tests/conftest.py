@@ -0,0 +1,40 @@
+# tests/conftest.py - Shared Fixtures
+#
+# Every test runs against a fresh in-memory SQLite stand-in, so the suite
+# needs no MySQL server:
+#
+#     python -m pytest -q
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import config
+
+# database_manager builds its global db on import; make it the stand-in
+config.DB_BACKEND = 'sqlite'
+config.SQLITE_PATH = ':memory:'
+config.SLOW_QUERY_MS = 10 ** 9
+config.QUERY_STATS_PATH = None
+
+import database_manager
+from sqlite_backend import SQLiteDatabaseManager
+
+@pytest.fixture
+def db():
+    """A connected DatabaseManager over an empty, migrated in-memory database"""
+    manager = SQLiteDatabaseManager(':memory:')
+    assert manager.connect()
+    yield manager
+    manager.disconnect()
+
+@pytest.fixture
+def rider(db):
+    """user_id of a passenger with a 1000.00 wallet"""
+    assert db.create_user("Test Rider", "rider@example.com", "Quickcab2026!", username="rider")
+    user_id = db.authenticate_user("rider", "Quickcab2026!")['user_id']
+    db.cursor.execute("INSERT INTO wallet (user_id, balance) VALUES (%s, %s)", (user_id, 1000))
+    db.connection.commit()
+    return user_id
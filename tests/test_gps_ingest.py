@@ -0,0 +1,54 @@
+# tests/test_gps_ingest.py - Driver Ping Validation and Flushing
+
+import pytest
+from datetime import datetime, timedelta
+from gps_ingest import GPSIngest
+
+@pytest.fixture
+def ingest(db):
+    worker = GPSIngest(flush_interval=60, track_length=5, batch_size=100)
+    worker.db = db
+    return worker
+
+def test_pings_outside_the_column_ranges_are_rejected_or_clamped(ingest):
+    ingest.ingest_lines([
+        "0,7.07,125.61,90,30.0",
+        "-4,7.07,125.61,90,30.0",
+        "2147483648,7.07,125.61,90,30.0",
+        "7,7.07,125.61,725,30.0",
+        "8,7.07,125.61,-90,12000.0",
+        "9,7.07,125.61,90,nan",
+    ])
+    
+    assert ingest.rejected == 3
+    assert ingest.latest_position(7)[2:4] == (5, 30.0)
+    assert ingest.latest_position(8)[2:4] == (270, None)
+    assert ingest.latest_position(9)[3] is None
+
+def test_flush_writes_every_accepted_driver(ingest, db):
+    ingest.ingest_lines([f"{driver},7.07,125.61,{driver * 40},{driver * 3.5}" for driver in range(1, 11)])
+    
+    assert ingest.flush()
+    assert not ingest.dirty
+    db.cursor.execute("SELECT COUNT(*) AS drivers, MAX(heading) AS heading FROM driver_locations")
+    row = db.cursor.fetchone()
+    assert (row['drivers'], row['heading']) == (10, 320)
+
+def test_a_rejected_row_does_not_fail_its_batch(db):
+    rows = [
+        (1, 7.07, 125.61, 90, 30.0, '2026-10-19 08:00:00'),
+        (2, None, 125.61, 90, 30.0, '2026-10-19 08:00:00'),
+        (3, 7.08, 125.62, 180, 20.0, '2026-10-19 08:00:00'),
+    ]
+    
+    assert db.save_driver_locations(rows)
+    db.cursor.execute("SELECT driver_id FROM driver_locations ORDER BY driver_id")
+    assert [row['driver_id'] for row in db.cursor.fetchall()] == [1, 3]
+
+def test_a_driver_with_a_slow_clock_is_still_polled(db):
+    before = datetime.now() - timedelta(seconds=5)
+    assert db.save_driver_locations([(4, 7.07, 125.61, 90, 30.0, datetime.now() - timedelta(hours=3))])
+    
+    rows = db.get_driver_locations(before)
+    assert [row['driver_id'] for row in rows] == [4]
+    assert datetime.fromisoformat(rows[0]['updated_at']) >= before.replace(microsecond=0)
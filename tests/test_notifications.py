@@ -0,0 +1,58 @@
+# tests/test_notifications.py - Notification Batches and Feed
+
+import pytest
+import notification_feed
+from notification_outbox import NotificationOutbox
+
+def test_batch_with_a_rejected_row_keeps_the_others(db, rider):
+    batch = [
+        (rider, 'system', 'First', 'Kept'),
+        (rider + 1000, 'system', 'Orphan', 'No such user'),
+        (rider, 'system', 'Second', 'Kept'),
+    ]
+    
+    assert db.create_notifications(batch)
+    
+    titles = [row['title'] for row in db.get_user_notifications(rider)]
+    assert sorted(titles) == ['First', 'Second']
+    db.cursor.execute("SELECT COUNT(*) AS notifications FROM notifications")
+    assert db.cursor.fetchone()['notifications'] == 2
+
+@pytest.fixture
+def feed(db, monkeypatch):
+    monkeypatch.setattr(notification_feed, 'db', db)
+    return notification_feed.NotificationFeed(limit=3)
+
+def notify(db, user_id, *titles):
+    db.connect()
+    assert db.create_notifications([(user_id, 'system', title, 'Test') for title in titles])
+
+def test_feed_adds_notifications_that_arrive_between_polls(db, rider, feed):
+    notify(db, rider, 'One', 'Two')
+    feed.refresh(rider)
+    notify(db, rider, 'Three')
+    
+    assert [item['title'] for item in feed.refresh(rider)] == ['Three']
+    assert [item['title'] for item in feed.get_items(rider)] == ['Three', 'Two', 'One']
+    assert feed.unread_count(rider) == 3
+
+def test_feed_reloads_when_more_than_a_page_arrived(db, rider, feed):
+    notify(db, rider, 'One', 'Two')
+    feed.refresh(rider)
+    notify(db, rider, 'Three', 'Four', 'Five', 'Six', 'Seven')
+    
+    feed.refresh(rider)
+    assert [item['title'] for item in feed.get_items(rider)] == ['Seven', 'Six', 'Five']
+    assert feed.unread_count(rider) == 7
+    assert feed.refresh(rider) == []
+
+def test_outbox_drops_notifications_beyond_its_queue_limit(monkeypatch, caplog):
+    outbox = NotificationOutbox(queue_limit=2)
+    monkeypatch.setattr(outbox, 'start', lambda: None)
+    
+    for title in ('One', 'Two', 'Three'):
+        outbox.enqueue(1, 'system', title, 'Test')
+    
+    assert outbox.queue.qsize() == 2
+    assert outbox.dropped == 1
+    assert "1 notifications dropped" in caplog.text
@@ -0,0 +1,53 @@
+# tests/test_schema_migrate.py - Migration Statement Splitting
+
+import glob
+import os
+import sqlite3
+from schema_migrate import SCHEMA_FOLDER, apply_migrations, split_statements
+
+def test_semicolons_in_strings_and_comments_do_not_split():
+    sql = """
+        -- a comment; with a semicolon
+        CREATE TABLE t (a TEXT DEFAULT 'x;y', b TEXT DEFAULT 'it''s;');
+        /* block; comment */ INSERT INTO t (a, b) VALUES ('a\\';', "q;");
+    """
+    
+    assert split_statements(sql) == [
+        "CREATE TABLE t (a TEXT DEFAULT 'x;y', b TEXT DEFAULT 'it''s;')",
+        "INSERT INTO t (a, b) VALUES ('a\\';', \"q;\")",
+    ]
+
+def test_trigger_body_is_one_statement():
+    sql = """
+        CREATE TRIGGER t_touch AFTER UPDATE ON t FOR EACH ROW
+        BEGIN
+            IF NEW.a <> OLD.a THEN SET @changed = 1; END IF;
+            UPDATE t SET b = CASE WHEN a = 'z' THEN 'w;' ELSE b END WHERE a = NEW.a;
+        END;
+        SELECT 1;
+    """
+    
+    statements = split_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].startswith("CREATE TRIGGER") and statements[0].endswith("END")
+    assert statements[1] == "SELECT 1"
+
+def test_sqlite_trigger_migration_applies():
+    connection = sqlite3.connect(":memory:")
+    connection.executescript("CREATE TABLE t (a TEXT, hits INTEGER DEFAULT 0)")
+    for statement in split_statements("""
+        CREATE TRIGGER t_hit AFTER INSERT ON t BEGIN
+            UPDATE t SET hits = hits + 1 WHERE rowid = NEW.rowid;
+        END;
+        INSERT INTO t (a) VALUES ('x;y');
+    """):
+        connection.execute(statement)
+    
+    assert connection.execute("SELECT a, hits FROM t").fetchall() == [('x;y', 1)]
+
+def test_every_sqlite_migration_applies():
+    connection = sqlite3.connect(":memory:")
+    
+    applied = apply_migrations(connection, dialect='sqlite', placeholder='?')
+    assert applied == sorted(applied)
+    assert len(applied) == len(glob.glob(os.path.join(SCHEMA_FOLDER, 'sqlite', '*.sql')))
@@ -0,0 +1,30 @@
+# tests/test_screen_data.py - Screen Loads: Failure Is Not Empty
+
+import pytest
+import config
+import functions
+
+@pytest.fixture
+def signed_in(db, rider, monkeypatch):
+    monkeypatch.setattr(functions, 'db', db)
+    monkeypatch.setattr(config, 'CURRENT_USER_ID', rider)
+    return rider
+
+def test_empty_history_loads_as_empty(signed_in):
+    assert functions.get_wallet_data() == {"balance": 1000.0, "transactions": []}
+    assert functions.get_user_rides_db() == []
+    assert functions.get_user_vouchers_db() == []
+
+@pytest.mark.parametrize('table, load', [
+    ('wallet_transactions', functions.get_wallet_data),
+    ('user_vouchers', functions.get_user_vouchers_db),
+])
+def test_failed_read_loads_as_none(db, signed_in, table, load):
+    db.cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_gone")
+    
+    assert load() is None
+
+def test_failed_ride_read_loads_as_none(db, signed_in):
+    db.cursor.execute("ALTER TABLE rides RENAME COLUMN pickup_time TO pickup_at")
+    
+    assert functions.get_user_rides_db() is None
@@ -0,0 +1,178 @@
+# tests/test_storage_contract.py - StorageBackend Contract
+#
+# The same checks run against every backend. SQLite always runs; MySQL runs
+# when QUICKCAB_TEST_MYSQL_DB names a scratch database on config.DB_HOST
+# (it is migrated first, and every test creates its own users):
+#
+#     QUICKCAB_TEST_MYSQL_DB=quickcab_test python -m pytest -q tests/test_storage_contract.py
+
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+import config
+from database_manager import DatabaseManager
+from schema_migrate import apply_migrations
+from sqlite_backend import SQLiteDatabaseManager
+from storage_backend import StorageBackend
+
+PASSWORD = "Quickcab2026!"
+
+@pytest.fixture(params=['sqlite', 'mysql'])
+def backend(request, monkeypatch):
+    if request.param == 'sqlite':
+        manager = SQLiteDatabaseManager(':memory:')
+    else:
+        database = os.environ.get('QUICKCAB_TEST_MYSQL_DB')
+        if not database:
+            pytest.skip("set QUICKCAB_TEST_MYSQL_DB to run the contract against MySQL")
+        monkeypatch.setattr(config, 'DB_NAME', database)
+        manager = DatabaseManager()
+    
+    if not manager.connect():
+        pytest.skip(f"{request.param} backend is not reachable")
+    if request.param == 'mysql':
+        apply_migrations(manager.connection)
+    
+    yield manager
+    manager.disconnect()
+
+def new_rider(manager, balance=500):
+    """user_id of a new passenger with a funded wallet"""
+    username = f"rider_{uuid.uuid4().hex[:12]}"
+    assert manager.create_user("Contract Rider", f"{username}@example.com", PASSWORD, username=username)
+    user_id = manager.authenticate_user(username, PASSWORD)['user_id']
+    manager.cursor.execute("INSERT INTO wallet (user_id, balance) VALUES (%s, %s)", (user_id, balance))
+    manager.connection.commit()
+    return user_id
+
+def book(manager, user_id, **kwargs):
+    return manager.create_ride(user_id, 'sedan', 7.0731, 125.6128, 'SM Lanang Premier',
+                               7.0907, 125.6120, 'Abreeza Mall', 5.4, 121.0, 'wallet', **kwargs)
+
+def test_backends_implement_the_whole_interface(backend):
+    assert isinstance(backend, StorageBackend)
+    assert not getattr(type(backend), '__abstractmethods__', None)
+
+def test_interface_methods_are_abstract():
+    class Partial(StorageBackend):
+        def connect(self):
+            return True
+    
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_users(backend):
+    user_id = new_rider(backend)
+    
+    info = backend.get_user_info(user_id)
+    assert info['full_name'] == "Contract Rider"
+    assert backend.authenticate_user(info['username'], "wrong password") is None
+
+def test_wallet(backend):
+    user_id = new_rider(backend, balance=100)
+    
+    assert float(backend.get_wallet_balance(user_id)) == 100.0
+    assert float(backend.add_wallet_funds(user_id, 50)) == 150.0
+    assert float(backend.deduct_wallet_funds(user_id, 30)) == 120.0
+    assert backend.deduct_wallet_funds(user_id, 1000) is None
+    assert float(backend.get_wallet_balance(user_id)) == 120.0
+    
+    history = backend.get_transaction_history(user_id)
+    assert sorted(row['transaction_type'] for row in history) == ['deposit', 'withdrawal']
+
+def test_rides(backend):
+    user_id = new_rider(backend)
+    assert book(backend, user_id)
+    
+    rides = backend.get_user_rides(user_id)
+    assert len(rides) == 1
+    assert rides[0]['ride_status'] == 'pending'
+    
+    assert backend.complete_ride(rides[0]['ride_id'], rating=5)
+    assert backend.get_user_rides(user_id)[0]['ride_status'] == 'completed'
+    assert float(backend.get_wallet_balance(user_id)) == 379.0
+    
+    stats = backend.get_user_stats(user_id)
+    assert (stats['rides_booked'], stats['rides_completed']) == (1, 1)
+
+def test_scheduled_rides(backend):
+    user_id = new_rider(backend)
+    booked_since = datetime.now() - timedelta(seconds=1)
+    pickup_time = (datetime.now() + timedelta(hours=2)).replace(microsecond=0)
+    assert book(backend, user_id, pickup_time=pickup_time)
+    ride_id = backend.get_user_rides(user_id)[0]['ride_id']
+    
+    assert ride_id in [ride['ride_id'] for ride in backend.get_recent_reservations(booked_since)]
+    assert backend.release_scheduled_rides([ride_id], datetime.now()) == []
+    
+    released = backend.release_scheduled_rides([ride_id], pickup_time)
+    assert [ride['ride_id'] for ride in released] == [ride_id]
+    assert backend.get_user_rides(user_id)[0]['ride_status'] == 'pending'
+    assert ride_id not in [ride['ride_id'] for ride in backend.get_recent_reservations(booked_since)]
+
+def test_saved_places(backend):
+    user_id = new_rider(backend)
+    
+    assert backend.save_place(user_id, 'Home', 'Lanang, Davao City', 7.1, 125.65)
+    assert backend.save_place(user_id, 'Home', 'Obrero, Davao City', 7.08, 125.61)
+    places = backend.get_saved_places(user_id)
+    assert [(place['label'], place['address']) for place in places] == [('Home', 'Obrero, Davao City')]
+    
+    assert backend.delete_saved_place(user_id, 'Home')
+    assert backend.get_saved_places(user_id) == []
+
+def test_vouchers(backend):
+    user_id = new_rider(backend)
+    code = f"T{uuid.uuid4().hex[:10].upper()}"
+    backend.cursor.execute(
+        "INSERT INTO vouchers (voucher_code, voucher_type, discount_value, min_fare, max_discount, usage_limit, expiry_date) "
+        "VALUES (%s, 'percentage', 10, 50, 20, 1, '2099-12-31')", (code,)
+    )
+    backend.connection.commit()
+    
+    assert backend.validate_voucher(code, user_id, 100.0) == (None, "Invalid or expired voucher")
+    assert backend.assign_voucher_to_user(user_id, code)
+    assert backend.validate_voucher(code, user_id, 100.0) == (10.0, None)
+    assert backend.validate_voucher(code, user_id, 500.0) == (20.0, None)
+    assert backend.validate_voucher(code, user_id, 40.0)[0] is None
+
+def test_notifications(backend):
+    user_id = new_rider(backend)
+    
+    assert backend.create_notification(user_id, 'system', 'Welcome', 'Thanks for riding')
+    assert backend.create_notifications([(user_id, 'ride', 'Booked', 'On the way')])
+    assert backend.get_unread_notification_count(user_id) == 2
+    
+    newest = backend.get_notifications_since(user_id)
+    assert [item['title'] for item in newest] == ['Booked', 'Welcome']
+    assert backend.get_notifications_since(user_id, newest[0]['notification_id']) == []
+    
+    assert backend.mark_notifications_read(user_id, newest[0]['notification_id']) is not None
+    assert backend.get_unread_notification_count(user_id) == 0
+
+def test_voucher_campaign_counts_the_users_issued(backend):
+    riders = [new_rider(backend) for _ in range(3)]
+    backend.cursor.execute("UPDATE users SET account_status = 'suspended' WHERE user_id = %s", (riders[2],))
+    code = f"T{uuid.uuid4().hex[:10].upper()}"
+    backend.cursor.execute(
+        "INSERT INTO vouchers (voucher_code, voucher_type, discount_value, expiry_date) "
+        "VALUES (%s, 'fixed', 25, '2099-12-31')", (code,)
+    )
+    backend.connection.commit()
+    assert backend.assign_voucher_to_user(riders[0], code)
+    
+    # One already holds it, one is suspended and one id does not exist
+    unknown = max(riders) + 1000
+    assert backend.issue_voucher_campaign(code, segment='ids', user_ids=riders + [unknown], chunk_size=2) == 2
+
+def test_release_of_a_batch_that_is_not_a_size_class(backend):
+    user_id = new_rider(backend)
+    pickup_time = (datetime.now() + timedelta(hours=2)).replace(microsecond=0)
+    for _ in range(3):
+        assert book(backend, user_id, pickup_time=pickup_time)
+    ride_ids = sorted(ride['ride_id'] for ride in backend.get_user_rides(user_id))
+    
+    released = backend.release_scheduled_rides(ride_ids, pickup_time)
+    assert sorted(ride['ride_id'] for ride in released) == ride_ids
+    assert {ride['ride_status'] for ride in backend.get_user_rides(user_id)} == {'pending'}
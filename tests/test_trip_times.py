@@ -0,0 +1,46 @@
+# tests/test_trip_times.py - Trip Durations and ETA Speeds
+
+from datetime import datetime
+import functions
+import eta_model
+from eta_model import EtaModel, ANY_HOUR, ANY_ZONE, hour_of_week, trip_sample
+
+RESERVATION = {
+    'booking_time': datetime(2026, 10, 21, 6, 45),
+    'pickup_time': datetime(2026, 10, 21, 9, 0),
+    'end_time': datetime(2026, 10, 21, 9, 25),
+    'distance_km': 8.0,
+    'pickup_latitude': 7.0731, 'pickup_longitude': 125.6128,
+    'destination_latitude': 7.0907, 'destination_longitude': 125.6120,
+}
+
+def test_reservation_is_timed_from_its_pickup():
+    assert functions.ride_duration(RESERVATION) == "25 mins"
+    assert functions.ride_duration(dict(RESERVATION, booking_time=datetime(2026, 10, 19, 8, 0))) == "25 mins"
+
+def test_reservation_is_learned_from_its_pickup():
+    key, km, minutes = trip_sample(RESERVATION)
+    
+    assert minutes == 25.0
+    assert key[2] == hour_of_week(RESERVATION['pickup_time'])
+
+def test_immediate_ride_is_timed_from_its_booking():
+    ride = dict(RESERVATION, pickup_time=None, booking_time=datetime(2026, 10, 21, 9, 5))
+    
+    assert functions.ride_duration(ride) == "20 mins"
+    assert trip_sample(ride)[2] == 20.0
+
+def test_eta_speeds_are_looked_up_again_after_the_ttl(db, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(eta_model.time, 'monotonic', lambda: clock[0])
+    model = EtaModel(ttl_seconds=60)
+    pickup = (RESERVATION['pickup_latitude'], RESERVATION['pickup_longitude'])
+    
+    assert db.replace_eta_speeds([(ANY_ZONE, ANY_ZONE, ANY_HOUR, 10, 100.0, 300.0)])
+    assert model.speed_kmh(db, pickup, pickup) == 20.0
+    
+    assert db.replace_eta_speeds([(ANY_ZONE, ANY_ZONE, ANY_HOUR, 10, 100.0, 200.0)])
+    clock[0] += 59
+    assert model.speed_kmh(db, pickup, pickup) == 20.0
+    clock[0] += 2
+    assert model.speed_kmh(db, pickup, pickup) == 30.0
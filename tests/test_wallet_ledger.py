@@ -0,0 +1,46 @@
+# tests/test_wallet_ledger.py - Ledger Mode Wallet Balances
+
+import pytest
+import config
+from wallet_reconcile import Reconciler
+
+@pytest.fixture
+def ledger_mode(monkeypatch):
+    monkeypatch.setattr(config, 'WALLET_LEDGER_MODE', True)
+
+def test_wallet_without_snapshot_starts_from_its_balance(db, rider, ledger_mode):
+    db.cursor.execute("SELECT COUNT(*) AS snapshots FROM wallet_snapshots")
+    assert db.cursor.fetchone()['snapshots'] == 0
+    
+    assert db.get_wallet_balance(rider) == 1000.0
+    assert db.deduct_wallet_funds(rider, 27.5) == 972.5
+    assert db.get_wallet_balance(rider) == 972.5
+
+def test_snapshot_of_wallet_without_snapshot_keeps_its_balance(db, rider, ledger_mode):
+    db.deduct_wallet_funds(rider, 27.5)
+    
+    assert db.snapshot_wallet(rider) == 972.5
+    db.cursor.execute("SELECT balance FROM wallet_snapshots")
+    assert float(db.cursor.fetchone()['balance']) == 972.5
+    
+    assert db.add_wallet_funds(rider, 100) == 1072.5
+    assert db.get_wallet_balance(rider) == 1072.5
+
+def test_postings_after_a_snapshot_are_added_to_it(db, rider, ledger_mode):
+    db.add_wallet_funds(rider, 50)
+    db.snapshot_wallet(rider)
+    db.deduct_wallet_funds(rider, 20)
+    
+    assert db.get_wallet_balance(rider) == 1030.0
+
+def test_reconcile_reports_a_balance_without_postings(db, rider):
+    assert db.create_user("Empty Wallet", "empty@example.com", "Quickcab2026!", username="empty")
+    empty = db.authenticate_user("empty", "Quickcab2026!")['user_id']
+    db.cursor.execute("INSERT INTO wallet (user_id, balance) VALUES (%s, %s)", (empty, 0))
+    db.connection.commit()
+    found = []
+    
+    assert Reconciler(db, on_discrepancy=found.append).run() == 1
+    assert [(row['user_id'], row['check'], row['expected'], row['actual']) for row in found] == [
+        (rider, 'final', 0.0, 1000.0)
+    ]
@@ -0,0 +1,249 @@
+# tile_cache.py - Disk Cache of Map Tiles
+#
+# Map tiles are kept in a local SQLite file (TILE_CACHE_PATH) keyed by tile
+# server, zoom, x and y. Each tile records when it was last shown; once the
+# file holds more than TILE_CACHE_MAX_MB of images the least recently shown
+# tiles are dropped down to 90% of the cap. The map reads through the cache,
+# so tiles seen once (or prefetched) render from disk and work offline.
+#
+#     python tile_cache.py --prefetch                          # the Davao service area, TILE_PREFETCH_ZOOMS
+#     python tile_cache.py --prefetch --zooms 12 17 --bbox 7.03 125.55 7.13 125.65
+#     python tile_cache.py --stats
+#
+# Prefetching follows the tile server's usage policy: a User-Agent, few
+# connections and a limit on the number of tiles per run (--max-tiles).
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import config
+
+# A tile shown again within this many seconds is not re-stamped
+TOUCH_INTERVAL = 300
+
+def tile_of(latitude, longitude, zoom):
+    """(x, y) of the slippy map tile containing a point"""
+    n = 2 ** zoom
+    x = int((longitude + 180.0) / 360.0 * n)
+    lat = math.radians(latitude)
+    y = int((1.0 - math.asinh(math.tan(lat)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tiles_in(bbox, zoom):
+    """Every (x, y) at zoom covering bbox = (south, west, north, east)"""
+    south, west, north, east = bbox
+    left, top = tile_of(north, west, zoom)
+    right, bottom = tile_of(south, east, zoom)
+    return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
+
+class TileCache:
+    """Size-capped, least recently used store of tile images in a local SQLite file"""
+    
+    def __init__(self, path=None, max_bytes=None, server=None):
+        self.path = path or config.TILE_CACHE_PATH
+        self.max_bytes = max_bytes or config.TILE_CACHE_MAX_MB * 1024 * 1024
+        self.server = server or config.TILE_SERVER
+        self.connection = None
+        self.total_bytes = None
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "QuickCab/1.0"
+    
+    def _connect(self):
+        if self.connection is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS tiles (
+                    server TEXT NOT NULL,
+                    zoom INTEGER NOT NULL,
+                    x INTEGER NOT NULL,
+                    y INTEGER NOT NULL,
+                    image BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (server, zoom, x, y)
+                ) WITHOUT ROWID
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_tiles_last_used ON tiles (last_used)")
+            self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM tiles").fetchone()[0]
+        return self.connection
+    
+    def get(self, zoom, x, y):
+        """Cached image bytes of a tile, or None"""
+        try:
+            with self.lock:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT image, last_used FROM tiles WHERE server = ? AND zoom = ? AND x = ? AND y = ?",
+                    (self.server, zoom, x, y)
+                ).fetchone()
+                if row is None:
+                    return None
+                
+                now = time.time()
+                if now - row[1] > TOUCH_INTERVAL:
+                    connection.execute(
+                        "UPDATE tiles SET last_used = ? WHERE server = ? AND zoom = ? AND x = ? AND y = ?",
+                        (now, self.server, zoom, x, y)
+                    )
+                    connection.commit()
+            return row[0]
+        
+        except sqlite3.Error:
+            return None
+    
+    def contains(self, zoom, x, y):
+        try:
+            with self.lock:
+                return self._connect().execute(
+                    "SELECT 1 FROM tiles WHERE server = ? AND zoom = ? AND x = ? AND y = ?",
+                    (self.server, zoom, x, y)
+                ).fetchone() is not None
+        
+        except sqlite3.Error:
+            return False
+    
+    def put(self, zoom, x, y, image):
+        """Store a tile, evicting the least recently used ones past the size cap"""
+        try:
+            with self.lock:
+                connection = self._connect()
+                old = connection.execute(
+                    "SELECT size FROM tiles WHERE server = ? AND zoom = ? AND x = ? AND y = ?",
+                    (self.server, zoom, x, y)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO tiles (server, zoom, x, y, image, size, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.server, zoom, x, y, image, len(image), time.time())
+                )
+                self.total_bytes += len(image) - (old[0] if old else 0)
+                
+                if self.total_bytes > self.max_bytes:
+                    self._evict(connection, int(self.max_bytes * 0.9))
+                connection.commit()
+        
+        except sqlite3.Error:
+            pass
+    
+    def _evict(self, connection, target_bytes):
+        """Drop the least recently used tiles until the cache holds target_bytes; the caller holds self.lock"""
+        rows = connection.execute("SELECT server, zoom, x, y, size FROM tiles ORDER BY last_used")
+        doomed = []
+        for server, zoom, x, y, size in rows:
+            if self.total_bytes <= target_bytes:
+                break
+            doomed.append((server, zoom, x, y))
+            self.total_bytes -= size
+        rows.close()
+        
+        connection.executemany("DELETE FROM tiles WHERE server = ? AND zoom = ? AND x = ? AND y = ?", doomed)
+    
+    def download(self, zoom, x, y):
+        """Fetch a tile from the server and store it, returns its bytes or None"""
+        url = self.server.replace("{z}", str(zoom)).replace("{x}", str(x)).replace("{y}", str(y))
+        try:
+            response = self.session.get(url, timeout=10)
+        except requests.RequestException:
+            return None
+        
+        if response.status_code != 200 or not response.content:
+            return None
+        
+        self.put(zoom, x, y, response.content)
+        return response.content
+    
+    def fetch(self, zoom, x, y):
+        """A tile from disk, downloading it on a miss; None when offline and not cached"""
+        image = self.get(zoom, x, y)
+        if image is None:
+            image = self.download(zoom, x, y)
+        return image
+    
+    def prefetch(self, bbox, zooms, threads=None, on_progress=None):
+        """Download every missing tile of bbox at each zoom, returns (already cached, downloaded, failed)"""
+        missing = []
+        cached = 0
+        for zoom in zooms:
+            for x, y in tiles_in(bbox, zoom):
+                if self.contains(zoom, x, y):
+                    cached += 1
+                else:
+                    missing.append((zoom, x, y))
+        
+        downloaded = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=threads or config.TILE_DOWNLOAD_THREADS) as pool:
+            for image in pool.map(lambda tile: self.download(*tile), missing):
+                if image is None:
+                    failed += 1
+                else:
+                    downloaded += 1
+                if on_progress:
+                    on_progress(downloaded + failed, len(missing))
+        
+        return cached, downloaded, failed
+    
+    def stats(self):
+        """(tiles, bytes) per zoom for the current server"""
+        with self.lock:
+            return self._connect().execute(
+                "SELECT zoom, COUNT(*), SUM(size) FROM tiles WHERE server = ? GROUP BY zoom ORDER BY zoom",
+                (self.server,)
+            ).fetchall()
+
+
+# Create global instance
+tile_cache = TileCache()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the offline map tile cache")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--prefetch', action='store_true', help="download the tiles of an area ahead of time")
+    action.add_argument('--stats', action='store_true', help="show the cached tiles per zoom level")
+    parser.add_argument('--bbox', type=float, nargs=4, metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'),
+                        default=config.TILE_PREFETCH_BBOX)
+    parser.add_argument('--zooms', type=int, nargs=2, metavar=('MIN', 'MAX'), default=config.TILE_PREFETCH_ZOOMS)
+    parser.add_argument('--threads', type=int, default=config.TILE_DOWNLOAD_THREADS)
+    parser.add_argument('--max-tiles', type=int, default=config.TILE_PREFETCH_MAX_TILES,
+                        help="refuse to prefetch areas with more tiles than this")
+    args = parser.parse_args(argv)
+    
+    if args.stats:
+        rows = tile_cache.stats()
+        for zoom, count, size in rows:
+            print(f"zoom {zoom:2d}: {count:6d} tiles, {size / 1024 / 1024:7.1f} MB")
+        total = sum(size for _, _, size in rows)
+        print(f"{sum(count for _, count, _ in rows)} tiles, {total / 1024 / 1024:.1f} MB "
+              f"of {config.TILE_CACHE_MAX_MB} MB in {tile_cache.path}")
+        return 0
+    
+    zooms = range(args.zooms[0], args.zooms[1] + 1)
+    planned = sum(len(tiles_in(args.bbox, zoom)) for zoom in zooms)
+    if planned > args.max_tiles:
+        print(f"The area has {planned} tiles at zoom {args.zooms[0]}-{args.zooms[1]}, more than --max-tiles "
+              f"{args.max_tiles}; use a smaller area or fewer zoom levels")
+        return 2
+    
+    def on_progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"  {done}/{total} tiles", end="\r" if done < total else "\n")
+    
+    started = time.perf_counter()
+    cached, downloaded, failed = tile_cache.prefetch(args.bbox, zooms, args.threads, on_progress)
+    print(f"{planned} tiles at zoom {args.zooms[0]}-{args.zooms[1]}: {cached} already cached, "
+          f"{downloaded} downloaded, {failed} failed in {time.perf_counter() - started:.1f} s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# user_places.py - Saved Places and Frequent Destinations
+#
+# saved_places holds the places a rider named (Home, Work, ...) and
+# frequent_places counts their destinations on a grid of 1/PLACE_CELL_SCALE
+# degree cells (about 110 m), added to by create_ride as rides are booked.
+# Both are read once per login into UserPlaces and kept up to date in memory
+# as the rider saves places and books rides, so the map screen and "Book
+# Again" can offer them with coordinates and address already known: choosing
+# one needs no search, reverse geocode or extra database read.
+
+import threading
+import config
+
+PLACE_CELL_SCALE = 1000
+
+def place_cell(coordinate):
+    """frequent_places grid index of a latitude or longitude"""
+    return round(float(coordinate) * PLACE_CELL_SCALE)
+
+def short_address(address, coords):
+    """First part of an address for a place button, or the coordinates"""
+    if address:
+        first = address.split(",")[0].strip()
+        return first if len(first) <= 24 else first[:23] + "…"
+    return f"{coords[0]:.4f}, {coords[1]:.4f}"
+
+class UserPlaces:
+    """Saved and frequent places of one user, read once per session"""
+    
+    def __init__(self):
+        self.user_id = None
+        # label -> place, in the order they were saved
+        self.saved = {}
+        # (cell_lat, cell_lon) -> place
+        self.frequent = {}
+        self.lock = threading.Lock()
+    
+    def loaded_for(self, user_id):
+        return user_id is not None and self.user_id == user_id
+    
+    def load(self, db, user_id):
+        """Read a user's places unless they are loaded already, returns False if reading failed"""
+        if self.loaded_for(user_id):
+            return True
+        
+        saved = db.get_saved_places(user_id)
+        frequent = db.get_frequent_places(user_id)
+        if saved is None or frequent is None:
+            return False
+        
+        with self.lock:
+            self.saved = {row['label']: self._place(row, row['label']) for row in saved}
+            self.frequent = {}
+            for row in frequent:
+                place = self._place(row, None, row['trips'])
+                self.frequent[(place_cell(place['latitude']), place_cell(place['longitude']))] = place
+            self.user_id = user_id
+        return True
+    
+    def _place(self, row, label, trips=0):
+        coords = (float(row['latitude']), float(row['longitude']))
+        return {
+            'label': label or short_address(row['address'], coords),
+            'address': row['address'],
+            'latitude': coords[0],
+            'longitude': coords[1],
+            'trips': trips,
+            'saved': label is not None
+        }
+    
+    def places(self, limit=None):
+        """Saved places, then the most booked destinations that are not a saved place's cell"""
+        limit = limit or config.USER_PLACES_SHOWN
+        with self.lock:
+            result = list(self.saved.values())
+            taken = {(place_cell(place['latitude']), place_cell(place['longitude'])) for place in result}
+            for cell, place in sorted(self.frequent.items(), key=lambda item: -item[1]['trips']):
+                if cell not in taken and place['trips'] >= config.FREQUENT_PLACES_MIN_TRIPS:
+                    result.append(place)
+        return result[:limit]
+    
+    def remember_saved(self, user_id, label, address, coords):
+        """Mirror a save_place that succeeded"""
+        if not self.loaded_for(user_id):
+            return
+        with self.lock:
+            self.saved.pop(label, None)
+            self.saved[label] = self._place({'address': address, 'latitude': coords[0], 'longitude': coords[1]}, label)
+    
+    def forget_saved(self, user_id, label):
+        """Mirror a delete_saved_place that succeeded"""
+        if self.loaded_for(user_id):
+            with self.lock:
+                self.saved.pop(label, None)
+    
+    def add_trip(self, user_id, coords, address):
+        """Mirror the frequent_places update of a booked ride"""
+        if not self.loaded_for(user_id):
+            return
+        cell = (place_cell(coords[0]), place_cell(coords[1]))
+        with self.lock:
+            old = self.frequent.get(cell)
+            place = self._place({'address': address or (old and old['address']), 'latitude': coords[0],
+                                 'longitude': coords[1]}, None, (old['trips'] if old else 0) + 1)
+            self.frequent[cell] = place
+    
+    def clear(self):
+        with self.lock:
+            self.user_id = None
+            self.saved = {}
+            self.frequent = {}
+
+
+# Create global instance
+user_places = UserPlaces()
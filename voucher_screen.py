@@ -3,6 +3,7 @@ from tkinter import Canvas, messagebox, Scrollbar
 from PIL import Image, ImageTk
 import os
 from functions import get_user_vouchers_db
+from screen_loader import ScreenDataLoader
 import config
 
 class VoucherScreen:
@@ -13,46 +14,7 @@ class VoucherScreen:
         self.window_width = 428
         self.window_height = 926
         
-        db_vouchers = get_user_vouchers_db()
-        
-        if db_vouchers:
-            self.vouchers = db_vouchers
-        else:
-            self.vouchers = [
-                {
-                    "code": "SAVE20",
-                    "title": "20% Off Your Ride",
-                    "description": "Get 20% discount on your next ride",
-                    "discount": "20%",
-                    "discount_value": 20,
-                    "min_fare": 100,
-                    "expiry": "31/12/2024",
-                    "status": "Active",
-                    "type": "percentage"
-                },
-                {
-                    "code": "FIRST50",
-                    "title": "₱50 Off First Ride",
-                    "description": "New user exclusive - ₱50 off",
-                    "discount": "₱50",
-                    "discount_value": 50,
-                    "min_fare": 150,
-                    "expiry": "31/01/2025",
-                    "status": "Active",
-                    "type": "fixed"
-                },
-                {
-                    "code": "HALFOFF",
-                    "title": "50% Discount",
-                    "description": "Half price on rides above ₱200",
-                    "discount": "50%",
-                    "discount_value": 50,
-                    "min_fare": 200,
-                    "expiry": "15/12/2024",
-                    "status": "Active",
-                    "type": "percentage"
-                }
-            ]
+        self.vouchers = []
         
         self.root = tk.Toplevel(parent_window)
         self.root.title("My Vouchers")
@@ -70,6 +32,25 @@ class VoucherScreen:
         self.setup_ui()
         
         self.root.protocol("WM_DELETE_WINDOW", self.go_back)
+        
+        self.loader = ScreenDataLoader(
+            self.scrollable_frame, get_user_vouchers_db, self.on_vouchers_loaded, cache_key="vouchers"
+        ).load()
+    
+    def on_vouchers_loaded(self, vouchers):
+        self.vouchers = vouchers
+        
+        for widget in self.scrollable_frame.winfo_children():
+            widget.destroy()
+        
+        if not self.vouchers:
+            tk.Label(
+                self.scrollable_frame, text="🎟️ No vouchers yet",
+                font=("Arial", 14), bg="#D2D2DF", fg="#999"
+            ).pack(padx=120, pady=100)
+            return
+        
+        self.populate_vouchers()
     
     def load_images(self):
         frames_folder = "Python Frames"
@@ -160,8 +141,6 @@ class VoucherScreen:
         list_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        self.populate_vouchers()
-        
         list_canvas.bind_all("<MouseWheel>", lambda e: list_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
     
     def populate_vouchers(self):
@@ -0,0 +1,229 @@
+# wallet_reconcile.py - Streaming Wallet Reconciliation
+#
+# Checks every wallet against its chain of wallet_transactions in one pass:
+#
+#     amount        balance_after = balance_before +/- amount
+#     continuity    balance_before = the previous posting's balance_after
+#     user          the posting's user_id is the wallet owner's
+#     final         wallet.balance = the last posting's balance_after, or 0
+#                   for a wallet without postings
+#     snapshot      (ledger mode) wallet_snapshots.balance = balance_after of
+#                   the posting it was taken at, or 0 without postings
+#
+# Wallets are read --wallets-per-chunk at a time in wallet_id order. Each
+# chunk's postings are then streamed through an unbuffered cursor in
+# idx_wallet_tx_wallet order, --fetch-size rows per fetch. Only the current
+# wallet's last posting is kept, so memory stays flat however large the
+# table is. Postings made after the run started are left out, and so are the
+# final and snapshot checks of wallets that received them.
+#
+#     python wallet_reconcile.py --report discrepancies.csv
+#
+# Exits 1 when a discrepancy is found.
+
+import argparse
+import csv
+import sys
+import time
+import config
+
+REPORT_FIELDS = ['wallet_id', 'user_id', 'transaction_id', 'check', 'expected', 'actual']
+
+# Amounts are DECIMAL(12, 2); anything below a cent is float noise (SQLite)
+TOLERANCE = 0.005
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile wallet balances against their transactions")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default=config.DB_BACKEND)
+    parser.add_argument('--wallets-per-chunk', type=int, default=1000)
+    parser.add_argument('--fetch-size', type=int, default=5000, help="posting rows per fetch from the stream")
+    parser.add_argument('--report', help="write every discrepancy to this CSV file")
+    parser.add_argument('--show', type=int, default=20, help="discrepancies to print")
+    return parser.parse_args(argv)
+
+class Reconciler:
+    """Walks wallets and their postings in order and records discrepancies"""
+    
+    def __init__(self, db, wallets_per_chunk=1000, fetch_size=5000, on_discrepancy=None):
+        self.db = db
+        self.wallets_per_chunk = wallets_per_chunk
+        self.fetch_size = fetch_size
+        self.on_discrepancy = on_discrepancy
+        self.ledger_mode = config.WALLET_LEDGER_MODE
+        
+        self.wallets = 0
+        self.transactions = 0
+        self.skipped = 0
+        self.discrepancies = {}
+    
+    def report(self, wallet, transaction_id, check, expected, actual):
+        self.discrepancies[check] = self.discrepancies.get(check, 0) + 1
+        if self.on_discrepancy:
+            self.on_discrepancy({
+                'wallet_id': wallet['wallet_id'], 'user_id': wallet['user_id'],
+                'transaction_id': transaction_id, 'check': check,
+                'expected': expected, 'actual': actual
+            })
+    
+    def run(self):
+        """Reconcile every wallet, returns the total number of discrepancies"""
+        cursor = self.db.cursor
+        cursor.execute("SELECT COALESCE(MAX(transaction_id), 0) AS last_id FROM wallet_transactions")
+        # Postings above this arrived during the run
+        high_water = cursor.fetchone()['last_id']
+        
+        wallet_query = """
+            SELECT w.wallet_id, w.user_id, w.balance,
+                   s.balance AS snapshot_balance, s.last_transaction_id AS snapshot_transaction_id,
+                   (SELECT MAX(t.transaction_id) FROM wallet_transactions t
+                    WHERE t.wallet_id = w.wallet_id) AS last_transaction_id
+            FROM wallet w
+            LEFT JOIN wallet_snapshots s ON s.wallet_id = w.wallet_id
+            WHERE w.wallet_id > %s
+            ORDER BY w.wallet_id
+            LIMIT %s
+        """
+        
+        last_wallet_id = 0
+        while True:
+            cursor.execute(wallet_query, (last_wallet_id, self.wallets_per_chunk))
+            wallets = cursor.fetchall()
+            if not wallets:
+                break
+            
+            self._reconcile_chunk(wallets, last_wallet_id, high_water)
+            last_wallet_id = wallets[-1]['wallet_id']
+            self.wallets += len(wallets)
+        
+        return sum(self.discrepancies.values())
+    
+    def _reconcile_chunk(self, wallets, after_wallet_id, high_water):
+        """Stream the chunk's postings and check them wallet by wallet"""
+        by_id = {wallet['wallet_id']: wallet for wallet in wallets}
+        stream = self.db.connection.cursor(dictionary=True)
+        stream.execute("""
+            SELECT transaction_id, wallet_id, user_id, transaction_type, amount, balance_before, balance_after
+            FROM wallet_transactions
+            WHERE wallet_id > %s AND wallet_id <= %s AND transaction_id <= %s
+            ORDER BY wallet_id, transaction_id
+        """, (after_wallet_id, wallets[-1]['wallet_id'], high_water))
+        
+        wallet = None
+        last = None
+        finished = set()
+        try:
+            while True:
+                rows = stream.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                
+                for row in rows:
+                    if wallet is None or row['wallet_id'] != wallet['wallet_id']:
+                        if wallet is not None:
+                            self._finish_wallet(wallet, last, high_water)
+                            finished.add(wallet['wallet_id'])
+                        wallet = by_id[row['wallet_id']]
+                        last = None
+                    
+                    self._check_posting(wallet, last, row)
+                    last = row
+                self.transactions += len(rows)
+        finally:
+            stream.close()
+        
+        if wallet is not None:
+            self._finish_wallet(wallet, last, high_water)
+            finished.add(wallet['wallet_id'])
+        
+        # Wallets the stream never reached have no postings up to high_water
+        for wallet in wallets:
+            if wallet['wallet_id'] not in finished:
+                self._finish_wallet(wallet, None, high_water)
+    
+    def _check_posting(self, wallet, previous, row):
+        before = float(row['balance_before'])
+        after = float(row['balance_after'])
+        amount = float(row['amount'])
+        expected = before + amount if row['transaction_type'] == 'deposit' else before - amount
+        
+        if abs(after - expected) > TOLERANCE:
+            self.report(wallet, row['transaction_id'], 'amount', round(expected, 2), after)
+        if previous is not None and abs(before - float(previous['balance_after'])) > TOLERANCE:
+            self.report(wallet, row['transaction_id'], 'continuity', float(previous['balance_after']), before)
+        if row['user_id'] != wallet['user_id']:
+            self.report(wallet, row['transaction_id'], 'user', wallet['user_id'], row['user_id'])
+        
+        if self.ledger_mode and row['transaction_id'] == wallet['snapshot_transaction_id']:
+            if abs(after - float(wallet['snapshot_balance'])) > TOLERANCE:
+                self.report(wallet, row['transaction_id'], 'snapshot', after, float(wallet['snapshot_balance']))
+    
+    def _finish_wallet(self, wallet, last, high_water):
+        """Final balance check once a wallet's last posting has been seen, last is None without postings"""
+        if (wallet['last_transaction_id'] or 0) > high_water:
+            self.skipped += 1
+            return
+        
+        if last is None:
+            # No postings, so nothing can have been paid in
+            if abs(float(wallet['balance'])) > TOLERANCE:
+                self.report(wallet, None, 'final', 0.0, float(wallet['balance']))
+            if wallet['snapshot_balance'] is not None and abs(float(wallet['snapshot_balance'])) > TOLERANCE:
+                self.report(wallet, None, 'snapshot', 0.0, float(wallet['snapshot_balance']))
+            return
+        
+        # Ledger mode never rewrites wallet.balance
+        if not self.ledger_mode and abs(float(wallet['balance']) - float(last['balance_after'])) > TOLERANCE:
+            self.report(wallet, last['transaction_id'], 'final', float(last['balance_after']), float(wallet['balance']))
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # The backend has to be chosen before database_manager creates db
+    config.DB_BACKEND = args.backend
+    from database_manager import create_database_manager
+    
+    db = create_database_manager()
+    if not db.connect():
+        print("Could not connect to the database")
+        return 2
+    
+    report_file = open(args.report, 'w', newline='', encoding='utf-8') if args.report else None
+    writer = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS) if report_file else None
+    if writer:
+        writer.writeheader()
+    shown = []
+    
+    def on_discrepancy(row):
+        if writer:
+            writer.writerow(row)
+        if len(shown) < args.show:
+            shown.append(row)
+    
+    reconciler = Reconciler(db, args.wallets_per_chunk, args.fetch_size, on_discrepancy)
+    start = time.perf_counter()
+    try:
+        total = reconciler.run()
+    finally:
+        db.disconnect()
+        if report_file:
+            report_file.close()
+    elapsed = time.perf_counter() - start
+    
+    print(f"Reconciled {reconciler.wallets} wallets and {reconciler.transactions} transactions in {elapsed:.1f} s "
+          f"({reconciler.transactions / elapsed if elapsed else 0:.0f} transactions/s)")
+    if reconciler.skipped:
+        print(f"Skipped the final check of {reconciler.skipped} wallets with postings made during the run")
+    
+    for row in shown:
+        print(f"  wallet {row['wallet_id']} (user {row['user_id']}) transaction {row['transaction_id']}: "
+              f"{row['check']} expected {row['expected']}, found {row['actual']}")
+    if total:
+        by_check = ", ".join(f"{check} {count}" for check, count in sorted(reconciler.discrepancies.items()))
+        print(f"{total} discrepancies ({by_check})" + (f", written to {args.report}" if args.report else ""))
+    else:
+        print("No discrepancies")
+    
+    return 1 if total else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
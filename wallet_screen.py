@@ -4,6 +4,7 @@ from PIL import Image, ImageTk
 import os
 from datetime import datetime
 from functions import get_wallet_data, add_wallet_funds_db
+from screen_loader import ScreenDataLoader
 import config
 
 class WalletScreen:
@@ -13,9 +14,8 @@ class WalletScreen:
         self.window_width = 428
         self.window_height = 926
         
-        wallet_data = get_wallet_data()
-        self.balance = wallet_data["balance"]
-        self.transaction_history = wallet_data["transactions"]
+        self.balance = 0
+        self.transaction_history = []
         
         self.root = tk.Toplevel(parent_window)
         self.root.title("Wallet")
@@ -33,6 +33,20 @@ class WalletScreen:
         self.setup_ui()
         
         self.root.protocol("WM_DELETE_WINDOW", self.go_back)
+        
+        self.loader = ScreenDataLoader(
+            self.scrollable_frame, get_wallet_data, self.on_wallet_loaded, cache_key="wallet"
+        ).load()
+    
+    def on_wallet_loaded(self, wallet_data):
+        self.balance = wallet_data["balance"]
+        self.transaction_history = wallet_data["transactions"]
+        
+        self.balance_label.config(text=f"₱{self.balance}")
+        
+        for widget in self.scrollable_frame.winfo_children():
+            widget.destroy()
+        self.populate_transactions()
     
     def load_images(self):
         frames_folder = "Python Frames"
@@ -113,7 +127,7 @@ class WalletScreen:
         ).pack(anchor="w", padx=15, pady=(12, 0))
         
         self.balance_label = tk.Label(
-            balance_frame, text=f"₱{self.balance}",
+            balance_frame, text="₱ ---",
             font=("Arial", 24, "bold"), bg="white", fg="#333"
         )
         self.balance_label.pack(anchor="w", padx=15, pady=(0, 10))
@@ -170,8 +184,6 @@ class WalletScreen:
         list_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
-        self.populate_transactions()
-        
         list_canvas.bind_all("<MouseWheel>", lambda e: list_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
     
     def populate_transactions(self):
@@ -0,0 +1,148 @@
+# wallet_snapshotter.py - Background Wallet Ledger Snapshotter
+#
+# In ledger mode (config.WALLET_LEDGER_MODE) a balance is the wallet's
+# snapshot plus the postings after it. This thread keeps that tail short: it
+# scans new wallet_transactions ids chunk by chunk, counts postings per user
+# and moves a wallet's snapshot up once it has WALLET_SNAPSHOT_MIN_POSTINGS
+# new postings or its oldest one has waited WALLET_SNAPSHOT_MAX_AGE seconds.
+#
+#     python wallet_snapshotter.py --rebase   # once, when switching ledger mode on
+#     python wallet_snapshotter.py            # run passes until interrupted
+#
+# Scanning starts at the newest posting when the snapshotter starts. Wallets
+# idle since then keep their older snapshot, which is still correct, just
+# further behind.
+
+import argparse
+import atexit
+import sys
+import threading
+import time
+import config
+from database_manager import create_database_manager
+
+class WalletSnapshotter:
+    """Moves wallet ledger snapshots forward in the background"""
+    
+    def __init__(self, interval=None, min_postings=None, max_age=None, chunk_size=None):
+        self.interval = interval or config.WALLET_SNAPSHOT_INTERVAL
+        self.min_postings = min_postings or config.WALLET_SNAPSHOT_MIN_POSTINGS
+        self.max_age = max_age or config.WALLET_SNAPSHOT_MAX_AGE
+        self.chunk_size = chunk_size or config.WALLET_SNAPSHOT_CHUNK_SIZE
+        
+        self.db = create_database_manager()
+        self.watermark = None  # highest transaction_id counted so far
+        self.pending = {}  # user_id -> [postings since snapshot, monotonic time of the first]
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """Start the background snapshot thread"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="wallet-snapshotter", daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self, timeout=5.0):
+        """Stop the snapshot thread after its current pass"""
+        if not self.thread:
+            return
+        
+        self.stopping.set()
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def _run(self):
+        while not self.stopping.is_set():
+            self.run_once()
+            self.stopping.wait(self.interval)
+    
+    def run_once(self):
+        """Count new postings and snapshot the wallets that are due, returns how many were"""
+        if not self.db.connect():
+            return 0
+        
+        try:
+            self._scan()
+            return self._snapshot_due()
+        finally:
+            self.db.disconnect()
+    
+    def _scan(self):
+        """Add postings after the watermark to the per-user counts"""
+        last_id = self.db.get_last_transaction_id()
+        if last_id is None:
+            return
+        
+        if self.watermark is None:
+            self.watermark = last_id
+            return
+        
+        while self.watermark < last_id and not self.stopping.is_set():
+            up_to = min(self.watermark + self.chunk_size, last_id)
+            activity = self.db.get_wallet_activity(self.watermark, up_to)
+            if activity is None:
+                return
+            
+            now = time.monotonic()
+            for row in activity:
+                entry = self.pending.setdefault(row['user_id'], [0, now])
+                entry[0] += row['postings']
+            self.watermark = up_to
+    
+    def _snapshot_due(self):
+        now = time.monotonic()
+        due = [user_id for user_id, (postings, first_seen) in self.pending.items()
+               if postings >= self.min_postings or now - first_seen >= self.max_age]
+        
+        done = 0
+        for user_id in due:
+            if self.stopping.is_set():
+                break
+            
+            # A failed wallet is counted again from its next posting
+            del self.pending[user_id]
+            if self.db.snapshot_wallet(user_id) is not None:
+                done += 1
+        
+        return done
+
+
+# Create global instance
+snapshotter = WalletSnapshotter()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move wallet ledger snapshots forward")
+    parser.add_argument('--rebase', action='store_true',
+                        help="snapshot every wallet at its wallet.balance (run once before enabling ledger mode)")
+    args = parser.parse_args(argv)
+    
+    worker = snapshotter
+    
+    if args.rebase:
+        if not worker.db.connect():
+            print("Could not connect to the database")
+            return 2
+        wallets = worker.db.rebase_wallet_snapshots()
+        worker.db.disconnect()
+        if wallets is None:
+            print("Rebase failed")
+            return 1
+        print(f"Rebased {wallets} wallet snapshots")
+        return 0
+    
+    worker.run_once()
+    try:
+        while True:
+            time.sleep(worker.interval)
+            print(f"Snapshotted {worker.run_once()} wallets")
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())